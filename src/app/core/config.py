@@ -24,6 +24,9 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8001
     LOG_LEVEL: str = "info"
+    # Logs JSON : fraction des logs sous WARNING conservés (par requête) et longueur maximale d'un champ
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_MAX_FIELD_LENGTH: int = 500
     WORKERS: int = 1
 
     # Configuration de LM Studio (serveur Chat local)
@@ -32,11 +35,122 @@ class Settings(BaseSettings):
     LLM_CHAT_TEMPERATURE: float = 0.3
     LLM_CHAT_API_KEY: str = "not-needed"
     LLM_CHAT_TIMEOUT: int = 60
+    # Relances automatiques d'un appel au LLM sur erreur transitoire (connexion, 429, 5xx)
+    LLM_CHAT_MAX_RETRIES: int = 2
+    # Budget de temps (secondes) des appels au LLM d'une analyse ; au-delà, les champs
+    # non terminés valent null avec une erreur GraphQL (0 pour désactiver)
+    LLM_REQUEST_BUDGET: float = 45.0
+    # Modèle d'embeddings local (vide pour désactiver) et serveur qui le sert (par défaut celui du chat)
+    LLM_EMBEDDING_MODEL: str = ""
+    LLM_EMBEDDING_BASE_URL: str = ""
+    # Choix du genre par embeddings : écart de similarité minimum entre les deux meilleurs genres
+    # pour se passer du LLM (en dessous, le LLM tranche), et vecteurs de synopsis gardés en mémoire
+    GENRE_CLASSIFIER_MIN_MARGIN: float = 0.05
+    GENRE_CLASSIFIER_MAX_CACHED_SYNOPSES: int = 4096
+    # Passerelle vers le LLM : appels simultanés maximum et taille de la file d'attente
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_MAX_QUEUE_SIZE: int = 100
+    # Regroupement des prompts : fenêtre de collecte (secondes, 0 pour désactiver), taille maximale
+    # d'un lot et jetons générés au plus par prompt. Un lot part en une seule requête /v1/completions
+    # multi-prompts (vLLM, llama.cpp server...) et n'occupe qu'une place de la passerelle ; les prompts
+    # y sont envoyés sans gabarit de chat. Désactivé de lui-même si le serveur refuse ces requêtes
+    LLM_BATCH_WINDOW: float = 0.0
+    LLM_BATCH_MAX_SIZE: int = 8
+    LLM_BATCH_MAX_TOKENS: int = 512
+    # Analyse par lot (analyzeMovies) : nombre maximum de films et d'analyses simultanées.
+    # Un lot complet (tous les champs IA, environ 36 par film) doit tenir dans QUERY_MAX_COST
+    ANALYZE_MOVIES_MAX_IDS: int = 50
+    ANALYZE_MOVIES_MAX_PARALLELISM: int = 4
+    # Coût maximum d'un document GraphQL (champs IA pondérés, alias, taille des lots), profondeur
+    # maximum et quota de coût par client et par minute (0 pour désactiver le quota)
+    QUERY_MAX_COST: int = 2000
+    QUERY_MAX_DEPTH: int = 10
+    QUERY_COST_QUOTA_PER_MINUTE: int = 10000
+    # Le quota est compté par adresse IP du client. Derrière ces proxys de confiance (adresses ou
+    # réseaux CIDR séparés par des virgules, ex. l'Ingress), l'adresse est lue dans X-Forwarded-For
+    QUERY_QUOTA_TRUSTED_PROXIES: str = ""
+    # Noms d'opération GraphQL repris tels quels dans les métriques (séparés par des virgules) ;
+    # les autres, choisis librement par les clients, sont regroupés sous "other"
+    GRAPHQL_METRICS_OPERATION_NAMES: str = ""
+    # Documents GraphQL analysés et validés gardés en cache (LRU)
+    GRAPHQL_DOCUMENT_CACHE_SIZE: int = 256
+    # Requêtes persistées : documents enregistrés (LRU) et manifeste de la liste blanche
+    # (fichier JSON {empreinte SHA-256: document} ; si renseigné, seuls ces documents sont acceptés)
+    PERSISTED_QUERIES_MAX_ENTRIES: int = 1000
+    PERSISTED_QUERIES_ALLOWLIST_PATH: str = ""
+    # Durée (secondes) de mise en cache des réponses aux requêtes GET par un CDN (0 pour désactiver)
+    GRAPHQL_GET_CACHE_MAX_AGE: int = 0
+    # Fichier SQLite des analyses précalculées par `python -m app.enrich` (désactivé si vide) et âge
+    # maximum (secondes) d'une analyse servie, 0 pour ne pas limiter ; au-delà, elle est recalculée
+    # à la demande (les avis ont pu changer). Relancer l'enrichissement plus souvent que cet âge
+    ANALYSIS_STORE_PATH: str = ""
+    ANALYSIS_STORE_MAX_AGE: int = 604800
+    # Mode d'analyse : "parallel" (un prompt par champ) ou "combined" (un seul prompt, réponse JSON)
+    LLM_ANALYSIS_MODE: str = "parallel"
+    # Résumé incrémental des avis : seuls les nouveaux avis sont soumis au LLM avec le résumé précédent.
+    # Recalcul complet si des avis ont disparu ou si la part d'avis ajoutés depuis le dernier
+    # recalcul complet dépasse OPINION_SUMMARY_MAX_DRIFT (entre 0 et 1 ; 0 pour toujours tout recalculer)
+    OPINION_SUMMARY_MAX_DRIFT: float = 0.3
+    OPINION_SUMMARY_STORE_MAX_ENTRIES: int = 1000
+    # Budget (jetons) d'un prompt, 0 pour ne pas limiter ; tokenizer tiktoken utilisé pour l'estimer,
+    # chargé au démarrage (vide ou indisponible : estimation à 4 caractères par jeton). À renseigner
+    # seulement si l'encodage correspond au modèle servi (ex. cl100k_base pour les modèles OpenAI)
+    LLM_PROMPT_MAX_TOKENS: int = 3000
+    LLM_TOKENIZER_ENCODING: str = ""
+    # Avis au-delà du budget : "truncate" (les premiers), "stratified" (échantillon respectant
+    # la répartition des notes) ou "map_reduce" (résumé par paquets puis résumé des résumés)
+    OPINION_FIT_STRATEGY: str = "stratified"
+    # Map-reduce : avis par paquet, résumés partiels fusionnés par prompt de réduction et prompts
+    # d'un même film envoyés simultanément (à garder bien en dessous de LLM_MAX_QUEUE_SIZE).
+    # Les résumés partiels inchangés sont servis par le cache des réponses du LLM
+    OPINION_SUMMARY_CHUNK_SIZE: int = 50
+    OPINION_SUMMARY_REDUCE_FANOUT: int = 8
+    OPINION_SUMMARY_MAX_PARALLEL_CHUNKS: int = 4
+
+    # Cache des réponses du LLM (clé : modèle, température, prompt)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL: int = 3600
+    # Fichier SQLite du cache partagé entre workers (désactivé si vide) et nombre maximum d'entrées
+    # (les entrées expirées et les plus anciennes sont purgées au fil des écritures ; 0 : pas de limite)
+    LLM_CACHE_SQLITE_PATH: str = ""
+    LLM_CACHE_SQLITE_MAX_ENTRIES: int = 100000
 
     # Configuration de l'API externe (Movie API)
     MOVIE_API_BASE_URL: str = "http://127.0.0.1:8000/api/v1"
     MOVIE_API_TIMEOUT: int = 30
+    # Pool de connexions vers l'API Movie (keep-alive, délais par phase en secondes, HTTP/2)
+    MOVIE_API_MAX_CONNECTIONS: int = 100
+    MOVIE_API_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    MOVIE_API_KEEPALIVE_EXPIRY: float = 30.0
+    MOVIE_API_CONNECT_TIMEOUT: float = 5.0
+    MOVIE_API_POOL_TIMEOUT: float = 10.0
+    MOVIE_API_HTTP2: bool = False
+    # Réponses GET gardées pour la revalidation conditionnelle (ETag / Last-Modified), 0 pour désactiver
+    MOVIE_API_HTTP_CACHE_MAX_ENTRIES: int = 1024
+    # Relances des GET sur erreur transitoire (backoff exponentiel avec gigue, en secondes)
+    MOVIE_API_MAX_RETRIES: int = 2
+    MOVIE_API_RETRY_BACKOFF_BASE: float = 0.1
+    MOVIE_API_RETRY_BACKOFF_MAX: float = 2.0
+    # Requêtes couvertes : second envoi si la réponse dépasse le p95 observé (délai minimum en secondes)
+    MOVIE_API_HEDGE_ENABLED: bool = False
+    MOVIE_API_HEDGE_MIN_DELAY: float = 0.05
+    # Disjoncteur : échecs consécutifs avant ouverture et délai (secondes) avant un appel d'essai
+    MOVIE_API_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    MOVIE_API_CIRCUIT_RESET_TIMEOUT: float = 30.0
+    # Chargement groupé des films : à partir de ce nombre d'IDs, on parcourt GET /movies/
+    # (0 pour toujours charger les films un par un). À n'activer que si les films demandés figurent
+    # en général dans les premières pages : chaque page rapatrie 100 films complets (avis compris)
+    # et les films hors de ces pages sont de toute façon chargés un par un ensuite.
+    MOVIE_BULK_LIST_THRESHOLD: int = 0
+    MOVIE_BULK_LIST_MAX_PAGES: int = 1
+    # Intervalle (secondes) de rafraîchissement du catalogue des genres gardé en mémoire (0 pour désactiver)
+    GENRE_CACHE_REFRESH_INTERVAL: int = 300
 
+    # Traces OpenTelemetry : "none", "console" (sortie standard) ou "otlp-file" (fichier OTLP/JSON)
+    TRACING_EXPORTER: str = "none"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_SERVICE_NAME: str = "movie-ai-graphql"
 
     # Configuration Health Check
     HEALTH_CHECK_PATH: str = "/health"
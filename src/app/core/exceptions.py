@@ -23,3 +23,31 @@ class NotFoundBLLException(BLLException):
 class ValidationBLLException(BLLException):
     """Levée pour les erreurs de validation des règles métier."""
     pass
+
+class LLMOverloadedBLLException(BLLException):
+    """Levée lorsque le LLM est saturé et que sa file d'attente est pleine."""
+    def __init__(self, queue_size: int):
+        message = f"Le service d'IA est saturé ({queue_size} demandes en attente), réessayez plus tard."
+        super().__init__(message)
+
+class LLMTimeoutBLLException(BLLException):
+    """Levée lorsqu'un champ IA n'a pas pu être calculé dans le budget de temps de la requête."""
+    def __init__(self, field_name: str, budget: float):
+        message = f"Le calcul de '{field_name}' a dépassé le budget de {budget:g}s alloué au LLM."
+        super().__init__(message)
+
+class LLMUnavailableBLLException(BLLException):
+    """Levée lorsque le LLM a échoué à calculer un champ IA (après ses relances)."""
+    def __init__(self, field_name: str):
+        message = f"Le service d'IA n'a pas pu calculer '{field_name}', réessayez plus tard."
+        super().__init__(message)
+
+class QueryTooExpensiveBLLException(BLLException):
+    """Levée lorsqu'un document GraphQL dépasse le coût ou la profondeur autorisés."""
+    pass
+
+class QueryQuotaExceededBLLException(BLLException):
+    """Levée lorsqu'un client a épuisé son quota de coût de requêtes."""
+    def __init__(self, retry_after: float):
+        message = f"Quota de requêtes dépassé, réessayez dans {retry_after:.0f}s."
+        super().__init__(message)
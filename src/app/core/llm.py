@@ -1,11 +1,77 @@
 from app.core.config import settings
-from langchain_openai import ChatOpenAI
+from app.core.llm_batcher import LLMBatcher, completions_batch
+from app.core.llm_cache import CachedChatModel, LLMResponseCache, SQLiteCacheTier
+from app.core.llm_gateway import LLMGateway
+from app.core.single_flight import CoalescedChatModel
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 # --- Initialisation du Modèle de Langage (LLM) ---
 # Cette instance unique sera créée au démarrage de l'application et partagée par toutes les requêtes.
-llm = ChatOpenAI(
+chat_model = ChatOpenAI(
     model=settings.LLM_CHAT_MODEL,
     base_url=settings.LLM_CHAT_SERVER_BASE_URL,
     temperature=settings.LLM_CHAT_TEMPERATURE,
-    api_key=settings.LLM_CHAT_API_KEY
+    api_key=settings.LLM_CHAT_API_KEY,
+    # Délai maximum d'un appel, relancé automatiquement (avec backoff) sur erreur transitoire
+    timeout=settings.LLM_CHAT_TIMEOUT,
+    max_retries=settings.LLM_CHAT_MAX_RETRIES,
 )
+
+# --- Modèle d'embeddings (optionnel) ---
+# Modèle local servi par un serveur compatible OpenAI (LM Studio...), utilisé pour choisir
+# le genre sans appel génératif. Les textes sont envoyés tels quels (pas de découpage tiktoken).
+embedding_model = OpenAIEmbeddings(
+    model=settings.LLM_EMBEDDING_MODEL,
+    base_url=settings.LLM_EMBEDDING_BASE_URL or settings.LLM_CHAT_SERVER_BASE_URL,
+    api_key=settings.LLM_CHAT_API_KEY,
+    check_embedding_ctx_length=False,
+    timeout=settings.LLM_CHAT_TIMEOUT,
+    max_retries=settings.LLM_CHAT_MAX_RETRIES,
+) if settings.LLM_EMBEDDING_MODEL else None
+
+# --- Passerelle ---
+# Limite le nombre d'appels simultanés au serveur LLM ; les autres attendent dans une file bornée.
+llm_gateway = LLMGateway(
+    chat_model,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_queue_size=settings.LLM_MAX_QUEUE_SIZE,
+)
+
+# --- Regroupement des prompts ---
+# Placé devant la passerelle : les prompts arrivés dans une même fenêtre partent en une seule
+# requête /v1/completions multi-prompts, qui n'occupe qu'une place de la passerelle.
+llm_batcher = LLMBatcher(
+    llm_gateway,
+    completions_batch(
+        chat_model.root_async_client,
+        model=settings.LLM_CHAT_MODEL,
+        temperature=settings.LLM_CHAT_TEMPERATURE,
+        max_tokens=settings.LLM_BATCH_MAX_TOKENS,
+    ),
+    window=settings.LLM_BATCH_WINDOW,
+    max_batch_size=settings.LLM_BATCH_MAX_SIZE,
+)
+
+# --- Cache des réponses ---
+# Un même prompt envoyé au même modèle (à température égale) n'est calculé qu'une seule fois.
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl=settings.LLM_CACHE_TTL,
+    shared=SQLiteCacheTier(
+        settings.LLM_CACHE_SQLITE_PATH, ttl=settings.LLM_CACHE_TTL, max_entries=settings.LLM_CACHE_SQLITE_MAX_ENTRIES
+    )
+    if settings.LLM_CACHE_SQLITE_PATH else None,
+)
+
+# Prompts identiques en cours regroupés devant la passerelle, que le cache soit activé ou non
+llm_coalescer = CoalescedChatModel(llm_batcher)
+
+# Le cache est placé devant la passerelle : une réponse déjà connue n'attend pas dans la file.
+llm = llm_coalescer
+if settings.LLM_CACHE_ENABLED:
+    llm = CachedChatModel(
+        llm_coalescer,
+        llm_cache,
+        model_name=settings.LLM_CHAT_MODEL,
+        temperature=settings.LLM_CHAT_TEMPERATURE,
+    )
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, List
+
+import openai
+from langchain_core.messages import AIMessage
+
+from app.core.metrics import llm_tokens
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Envoi d'un lot : prompts -> textes générés, dans le même ordre
+CompleteBatch = Callable[[List[str]], Awaitable[List[str]]]
+
+
+def completions_batch(client: openai.AsyncOpenAI, model: str, temperature: float, max_tokens: int) -> CompleteBatch:
+    """
+    Lot de prompts envoyé en une seule requête `/v1/completions` (champ `prompt` : liste),
+    accepté par les serveurs à batching continu (vLLM, llama.cpp server...). Les prompts sont
+    envoyés en texte brut, sans le gabarit de chat du modèle.
+    """
+    async def complete(prompts: List[str]) -> List[str]:
+        response = await client.completions.create(
+            model=model, prompt=prompts, temperature=temperature, max_tokens=max_tokens,
+        )
+        if response.usage is not None:
+            llm_tokens.labels(kind="prompt").inc(response.usage.prompt_tokens)
+            llm_tokens.labels(kind="completion").inc(response.usage.completion_tokens)
+        texts = [None] * len(prompts)
+        for choice in response.choices:
+            texts[choice.index] = choice.text.strip()
+        return texts
+    return complete
+
+
+class LLMBatcher:
+    """
+    Regroupe les prompts arrivés dans une courte fenêtre (`window` secondes), au plus
+    `max_batch_size` par lot, et les envoie en une seule requête multi-prompts (`complete_batch`).
+    Placé devant la passerelle LLM : un lot n'occupe qu'une place de la passerelle, quelle que
+    soit sa taille. Chaque appelant reçoit sa propre réponse ou sa propre exception.
+    Un lot d'un seul prompt, les appels avec options et les flux passent par la passerelle
+    (API de chat). Si le serveur refuse les requêtes multi-prompts, le regroupement est
+    désactivé et les prompts sont renvoyés un par un.
+    Désactivé (appel direct) si la fenêtre est nulle ou le lot limité à un prompt.
+    """
+
+    def __init__(self, gateway, complete_batch: CompleteBatch, window: float, max_batch_size: int):
+        self.gateway = gateway
+        self.complete_batch = complete_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.supported = True
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.prompts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.max_batch_size > 1 and self.supported
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        # Les appels avec options particulières ou les messages de chat ne peuvent pas partager un lot
+        if not self.enabled or args or kwargs or not isinstance(prompt, str):
+            return await self.gateway.ainvoke(prompt, *args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prompt, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        # Un appelant annulé avant l'envoi du lot en est retiré (son futur est annulé)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = [(prompt, future) for prompt, future in self._pending if not future.done()]
+        self._pending = []
+        if batch:
+            task = asyncio.create_task(self._submit(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _submit(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1 or not self.supported:
+                responses = await asyncio.gather(
+                    *[self.gateway.ainvoke(prompt) for prompt, _ in batch], return_exceptions=True
+                )
+            else:
+                responses = await self._submit_batch([prompt for prompt, _ in batch])
+            for (_, future), response in zip(batch, responses):
+                if future.done():
+                    continue
+                if isinstance(response, BaseException):
+                    future.set_exception(response)
+                else:
+                    future.set_result(response)
+        finally:
+            # Lot interrompu (arrêt de l'application) : aucun appelant ne doit rester bloqué
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _submit_batch(self, prompts: List[str]) -> list:
+        with tracer.start_as_current_span("llm.batch") as span:
+            span.set_attribute("llm.batch_size", len(prompts))
+            try:
+                # Une seule place de la passerelle pour tout le lot
+                async with self.gateway.slot():
+                    span.add_event("llm.slot_acquired")
+                    texts = await self.complete_batch(prompts)
+            except (openai.NotFoundError, openai.BadRequestError, openai.UnprocessableEntityError) as error:
+                # Serveur sans requêtes multi-prompts : on n'essaie plus, ces prompts partent un par un
+                logger.warning("Requêtes multi-prompts refusées par le serveur LLM, regroupement désactivé : %r", error)
+                self.supported = False
+                return await asyncio.gather(*[self.gateway.ainvoke(prompt) for prompt in prompts],
+                                            return_exceptions=True)
+            except Exception as error:
+                return [error] * len(prompts)
+        self.batches += 1
+        self.prompts += len(prompts)
+        return [
+            AIMessage(content=text) if text is not None else RuntimeError("Réponse absente du lot")
+            for text in texts
+        ]
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator:
+        async for chunk in self.gateway.astream(prompt, *args, **kwargs):
+            yield chunk
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "avg_batch_size": round(self.prompts / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def __getattr__(self, name: str):
+        return getattr(self.gateway, name)
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from app.core.single_flight import SingleFlight
+from app.core.tracing import tracer
+
+
+def make_cache_key(model: str, temperature: float, prompt: str) -> str:
+    """Calcule une clé de cache adressée par contenu (modèle, température, prompt rendu)."""
+    payload = json.dumps([model, temperature, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheTier:
+    """Niveau de cache en mémoire : LRU borné avec expiration (TTL)."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheTier:
+    """
+    Niveau de cache partagé, stocké dans un fichier SQLite.
+    Il est commun à tous les workers gunicorn d'une même machine et survit aux redémarrages.
+    Toutes les `purge_every` écritures, les entrées expirées sont supprimées et le fichier est
+    ramené à `max_entries` entrées (les plus anciennes partent en premier ; 0 : pas de limite).
+    """
+
+    def __init__(self, path: str, ttl: float, max_entries: int = 100_000, purge_every: int = 100):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)")
+            self._connection.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._purge()
+            self._connection.commit()
+
+    def _purge(self) -> None:
+        """Supprime les entrées expirées puis les plus anciennes au-delà de `max_entries` (verrou tenu)."""
+        self._connection.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+        if self.max_entries:
+            # Même TTL pour toutes les entrées : la date d'expiration ordonne aussi les écritures
+            self._connection.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+
+class LLMResponseCache:
+    """
+    Cache des réponses du LLM à deux niveaux :
+    - un LRU en mémoire (rapide, propre au processus) ;
+    - un niveau partagé optionnel (SQLite), consulté en cas d'absence en mémoire.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600, shared: Optional[SQLiteCacheTier] = None):
+        self.memory = MemoryCacheTier(max_entries=max_entries, ttl=ttl)
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                # On remonte l'entrée dans le niveau mémoire pour les prochains appels
+                self.memory.set(key, value)
+                self.hits += 1
+                self.shared_hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.hits = self.shared_hits = self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.memory),
+        }
+
+
+class CachedChatModel:
+    """
+    Enveloppe un modèle de chat LangChain et met en cache les réponses de `ainvoke` et `astream`.
+    Les appels `ainvoke` identiques encore en cours sont regroupés : un seul est envoyé au modèle.
+    Les autres attributs sont délégués au modèle sous-jacent.
+    """
+
+    def __init__(self, model, cache: LLMResponseCache, model_name: str, temperature: float):
+        self.model = model
+        self.cache = cache
+        self.model_name = model_name
+        self.temperature = temperature
+        self.in_flight = SingleFlight()
+
+    def cache_key(self, prompt: Any) -> str:
+        rendered = prompt if isinstance(prompt, str) else dumps(prompt)
+        return make_cache_key(self.model_name, self.temperature, rendered)
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> AIMessage:
+        with tracer.start_as_current_span("llm.ainvoke") as span:
+            key = self.cache_key(prompt)
+            content = await self.cache.get(key)
+            span.set_attribute("llm.cache_hit", content is not None)
+            if content is not None:
+                return AIMessage(content=content)
+            return await self.in_flight.do(key, lambda: self._invoke_and_store(key, prompt, *args, **kwargs))
+
+    async def _invoke_and_store(self, key: str, prompt: Any, *args, **kwargs) -> AIMessage:
+        response = await self.model.ainvoke(prompt, *args, **kwargs)
+        if isinstance(response.content, str):
+            await self.cache.set(key, response.content)
+        return response
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        key = self.cache_key(prompt)
+        content = await self.cache.get(key)
+        if content is not None:
+            yield AIMessageChunk(content=content)
+            return
+        chunks = []
+        async for chunk in self.model.astream(prompt, *args, **kwargs):
+            chunks.append(chunk.content)
+            yield chunk
+        # Seule une génération complète est mise en cache (pas un flux interrompu)
+        await self.cache.set(key, "".join(chunks))
+
+    def __getattr__(self, name: str):
+        return getattr(self.model, name)
@@ -0,0 +1,118 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator
+
+from app.core.exceptions import LLMOverloadedBLLException
+from app.core.metrics import llm_gateway_wait, record_llm_usage
+from app.core.tracing import tracer
+
+
+class LLMPriority(IntEnum):
+    """Classes de priorité : plus la valeur est petite, plus l'appel est servi tôt."""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+# Priorité des appels au LLM faits dans le contexte courant (requête GraphQL, traitement par lot...)
+llm_priority: ContextVar[LLMPriority] = ContextVar("llm_priority", default=LLMPriority.INTERACTIVE)
+
+
+class LLMGateway:
+    """
+    Point de passage unique vers le serveur LLM :
+    - au plus `max_concurrency` appels en cours ;
+    - une file d'attente bornée, servie par ordre de priorité puis d'arrivée ;
+    - rejet immédiat (LLMOverloadedBLLException) lorsque la file est pleine.
+    """
+
+    def __init__(self, model, max_concurrency: int, max_queue_size: int):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.served = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self) -> None:
+        started = time.monotonic()
+        if self.in_flight < self.max_concurrency and not self.queue_depth:
+            self.in_flight += 1
+        else:
+            if self.queue_depth >= self.max_queue_size:
+                self.rejected += 1
+                raise LLMOverloadedBLLException(queue_size=self.max_queue_size)
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (llm_priority.get(), next(self._sequence), future))
+            try:
+                # Le créneau est transmis directement par release() : in_flight est déjà compté
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Créneau obtenu au moment de l'annulation : on le rend
+                    self.release()
+                raise
+        waited = time.monotonic() - started
+        llm_gateway_wait.labels(priority=llm_priority.get().name.lower()).observe(waited)
+        self.served += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        with tracer.start_as_current_span("llm.gateway") as span:
+            async with self.slot():
+                # Fin de l'attente dans la file : le reste du span est le temps de génération
+                span.add_event("llm.slot_acquired")
+                response = await self.model.ainvoke(prompt, *args, **kwargs)
+            record_llm_usage(response)
+            return response
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator:
+        with tracer.start_as_current_span("llm.gateway.stream") as span:
+            async with self.slot():
+                span.add_event("llm.slot_acquired")
+                async for chunk in self.model.astream(prompt, *args, **kwargs):
+                    record_llm_usage(chunk)
+                    yield chunk
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "served": self.served,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.total_wait / self.served, 1) if self.served else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 1),
+        }
+
+    def __getattr__(self, name: str):
+        return getattr(self.model, name)
@@ -0,0 +1,125 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+import zlib
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from app.core.config import settings
+
+# Identifiant de la requête HTTP en cours, ajouté à chaque ligne de log
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributs standards d'un LogRecord : tout le reste provient de `extra=` et est sérialisé
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "request_id"}
+
+
+def truncate(value: Any, max_length: int) -> Any:
+    """Tronque récursivement les chaînes trop longues (réponses du LLM, payloads...)."""
+    if isinstance(value, str) and len(value) > max_length:
+        return f"{value[:max_length]}… (+{len(value) - max_length} caractères)"
+    if isinstance(value, dict):
+        return {key: truncate(item, max_length) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate(item, max_length) for item in value]
+    return value
+
+
+class RequestIdFilter(logging.Filter):
+    """Rattache l'identifiant de requête au moment de l'émission (dans le contexte de la requête)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ne garde qu'une fraction `rate` des logs sous le niveau WARNING.
+    L'échantillonnage se fait par requête : une requête retenue garde toutes ses lignes.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        key = getattr(record, "request_id", None) or f"{record.created}"
+        return zlib.crc32(key.encode()) % 10_000 < self.rate * 10_000
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par log ; les champs `extra=` sont inclus, tronqués à `max_length` caractères."""
+
+    def __init__(self, max_length: int):
+        super().__init__()
+        self.max_length = max_length
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage(), self.max_length),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = truncate(value, self.max_length)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Dépose les logs dans une file : la mise en forme et l'écriture sont faites par un thread dédié,
+    jamais sur la boucle d'événements. Seuls le message et la trace d'exception sont préparés ici.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging() -> None:
+    """Installe la journalisation JSON asynchrone sur le logger racine (niveau : LOG_LEVEL)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter(max_length=settings.LOG_MAX_FIELD_LENGTH))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(rate=settings.LOG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Vide la file de logs avant l'arrêt du processus."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
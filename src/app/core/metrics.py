@@ -0,0 +1,141 @@
+import functools
+import re
+import time
+from typing import Any, Callable, Iterable
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Bornes des histogrammes (secondes) : de quelques millisecondes (cache) à la minute (LLM)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+# --- GraphQL ---
+graphql_operation_duration = Histogram(
+    "graphql_operation_duration_seconds",
+    "Durée d'exécution des opérations GraphQL.",
+    ["operation_type", "operation_name"],
+    buckets=LATENCY_BUCKETS,
+)
+graphql_resolver_duration = Histogram(
+    "graphql_resolver_duration_seconds",
+    "Durée des resolvers asynchrones, par champ (Type.champ).",
+    ["field"],
+    buckets=LATENCY_BUCKETS,
+)
+graphql_operations_in_flight = Gauge(
+    "graphql_operations_in_flight",
+    "Opérations GraphQL en cours d'exécution.",
+)
+
+# --- LLM ---
+llm_task_duration = Histogram(
+    "llm_task_duration_seconds",
+    "Durée des tâches d'analyse IA (get_ai_summary, get_ai_tags...), cache compris.",
+    ["task", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+llm_prompt_tokens = Histogram(
+    "llm_prompt_tokens",
+    "Taille des prompts envoyés au LLM (jetons estimés), par tâche.",
+    ["task"],
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+)
+llm_gateway_wait = Histogram(
+    "llm_gateway_wait_seconds",
+    "Attente d'un créneau dans la passerelle LLM, par priorité.",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+llm_tokens = Counter(
+    "llm_tokens",
+    "Jetons consommés par les appels au LLM.",
+    ["kind"],
+)
+
+# --- API Movie ---
+movie_api_request_duration = Histogram(
+    "movie_api_request_duration_seconds",
+    "Durée des appels à l'API Movie (relances comprises), par route.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def route_template(url: str) -> str:
+    """Remplace les identifiants de l'URL par un gabarit (/movies/42 -> /movies/{id}) pour borner les libellés."""
+    return _ID_SEGMENT.sub("/{id}", url.split("?", 1)[0])
+
+
+def observe_llm_task(task: str) -> Callable:
+    """Décorateur : mesure la durée d'une tâche IA asynchrone et son issue (ok / error)."""
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await function(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                llm_task_duration.labels(task=task, outcome=outcome).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def record_llm_usage(message: Any) -> None:
+    """Comptabilise les jetons d'une réponse LangChain (usage_metadata), s'ils sont fournis par le serveur."""
+    usage = getattr(message, "usage_metadata", None)
+    if not isinstance(usage, dict):
+        return
+    llm_tokens.labels(kind="prompt").inc(usage.get("input_tokens", 0))
+    llm_tokens.labels(kind="completion").inc(usage.get("output_tokens", 0))
+
+
+class StatsCollector(Collector):
+    """
+    Expose, au moment de la collecte, les compteurs déjà tenus par les composants
+    (cache LLM, passerelle LLM, client de l'API Movie) sans instrumenter leur code.
+    """
+
+    def __init__(self, llm_cache, llm_gateway, api_client):
+        self.llm_cache = llm_cache
+        self.llm_gateway = llm_gateway
+        self.api_client = api_client
+
+    def collect(self) -> Iterable:
+        cache = self.llm_cache.stats()
+        lookups = CounterMetricFamily("llm_cache_lookups", "Consultations du cache LLM.", labels=["result"])
+        lookups.add_metric(["hit"], cache["hits"])
+        lookups.add_metric(["miss"], cache["misses"])
+        yield lookups
+        yield GaugeMetricFamily("llm_cache_hit_ratio", "Taux de succès du cache LLM.", value=cache["hit_ratio"])
+        yield GaugeMetricFamily("llm_cache_entries", "Entrées du cache LLM en mémoire.", value=cache["entries"])
+
+        gateway = self.llm_gateway.stats()
+        yield GaugeMetricFamily("llm_in_flight", "Appels au LLM en cours.", value=gateway["in_flight"])
+        yield GaugeMetricFamily("llm_queue_depth", "Appels au LLM en attente d'un créneau.", value=gateway["queue_depth"])
+        yield CounterMetricFamily("llm_rejected", "Appels au LLM rejetés (file pleine).", value=gateway["rejected"])
+
+        movie_api = self.api_client.stats()
+        http_cache = movie_api["http_cache"]
+        revalidations = CounterMetricFamily(
+            "movie_api_cache_lookups", "Requêtes GET conditionnelles vers l'API Movie.", labels=["result"]
+        )
+        revalidations.add_metric(["not_modified"], http_cache["revalidated"])
+        revalidations.add_metric(["miss"], http_cache["misses"])
+        yield revalidations
+        yield GaugeMetricFamily(
+            "movie_api_cache_hit_ratio", "Part des réponses revalidées (304).", value=http_cache["hit_ratio"]
+        )
+        yield CounterMetricFamily("movie_api_retries", "Relances des appels à l'API Movie.", value=movie_api["retries"])
+        yield CounterMetricFamily("movie_api_hedged", "Requêtes couvertes envoyées.", value=movie_api["hedged"])
+        circuit_open = GaugeMetricFamily(
+            "movie_api_circuit_open", "Disjoncteur ouvert (1) ou fermé (0), par hôte.", labels=["host"]
+        )
+        for host, circuit in movie_api["circuits"].items():
+            circuit_open.add_metric([host], 0 if circuit["state"] == "closed" else 1)
+        yield circuit_open
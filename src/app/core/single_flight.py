@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from langchain_core.load import dumps
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques simultanés : le premier appelant lance le calcul, les suivants
+    attendent le même résultat (ou la même exception) au lieu de le refaire.
+    Le calcul n'est annulé que lorsque tous les appelants qui l'attendent ont été annulés.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            # La tâche copie le contexte du premier appelant (priorité LLM, identifiant de requête, trace)
+            call = _Call(asyncio.ensure_future(factory()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+            self.started += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            # shield : l'annulation d'un appelant ne doit pas interrompre le calcul des autres
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Exception déjà transmise aux appelants (ou à personne s'ils ont tous été annulés)
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": len(self._calls), "started": self.started, "shared": self.shared}
+
+
+class CoalescedChatModel:
+    """
+    Enveloppe un modèle de chat : les appels `ainvoke` identiques (même prompt, sans option)
+    encore en cours sont regroupés, un seul est envoyé au modèle. Indépendant du cache des réponses.
+    Les autres attributs sont délégués au modèle sous-jacent.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.in_flight = SingleFlight()
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        if args or kwargs:
+            return await self.model.ainvoke(prompt, *args, **kwargs)
+        key = prompt if isinstance(prompt, str) else dumps(prompt)
+        return await self.in_flight.do(key, lambda: self.model.ainvoke(prompt))
+
+    def __getattr__(self, name: str):
+        return getattr(self.model, name)
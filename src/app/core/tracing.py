@@ -0,0 +1,87 @@
+import base64
+import functools
+import json
+import threading
+from typing import Callable, Optional, Sequence
+
+from google.protobuf.json_format import MessageToDict
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+
+from app.core.config import settings
+
+# Exporteurs disponibles (TRACING_EXPORTER)
+TRACING_EXPORTER_NONE = "none"
+TRACING_EXPORTER_CONSOLE = "console"
+TRACING_EXPORTER_OTLP_FILE = "otlp-file"
+
+tracer = trace.get_tracer("app")
+
+# Identifiants que l'OTLP/JSON écrit en hexadécimal (le mapping protobuf standard les écrit en base64)
+_OTLP_HEX_ID_FIELDS = {"traceId", "spanId", "parentSpanId"}
+
+
+def _hex_ids(value):
+    """Convertit récursivement les identifiants de trace et de span (base64) en hexadécimal."""
+    if isinstance(value, dict):
+        return {key: base64.b64decode(item).hex() if key in _OTLP_HEX_ID_FIELDS and item else _hex_ids(item)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [_hex_ids(item) for item in value]
+    return value
+
+
+class OTLPJsonFileSpanExporter(SpanExporter):
+    """
+    Écrit les spans dans un fichier au format OTLP/JSON (une requête d'export par ligne),
+    lisible hors ligne par un collecteur OpenTelemetry (récepteur "otlpjsonfile") ou Jaeger.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        # OTLP/JSON : identifiants en hexadécimal et énumérations (kind, status) en entiers
+        payload = MessageToDict(encode_spans(spans), use_integers_for_enums=True)
+        line = json.dumps(_hex_ids(payload), ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def configure_tracing() -> Optional[TracerProvider]:
+    """Installe le fournisseur de traces selon TRACING_EXPORTER ; rien n'est installé pour "none"."""
+    if settings.TRACING_EXPORTER == TRACING_EXPORTER_CONSOLE:
+        exporter = ConsoleSpanExporter()
+    elif settings.TRACING_EXPORTER == TRACING_EXPORTER_OTLP_FILE:
+        exporter = OTLPJsonFileSpanExporter(settings.TRACING_FILE_PATH)
+    else:
+        return None
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: settings.TRACING_SERVICE_NAME}))
+    # Export en tâche de fond, par lots : l'écriture ne ralentit pas les requêtes
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def traced(name: str) -> Callable:
+    """Décorateur : exécute une fonction asynchrone dans un span `name`."""
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return await function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,133 @@
+"""
+Traitement par lot : précalcule les analyses IA de tout le catalogue de films.
+
+Les films sont parcourus page par page via l'API Movie, analysés avec le service V2
+(concurrence bornée, priorité "lot" dans la passerelle LLM) puis enregistrés dans le
+stockage local lu par le resolver GraphQL. Une reprise retente d'abord les films en échec,
+puis repart de la dernière page terminée.
+
+Usage (depuis le répertoire src) :
+    uv run python -m app.enrich --store analyses.sqlite
+    uv run python -m app.enrich --store analyses.sqlite --restart
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.llm import llm
+from app.core.llm_gateway import LLMPriority, llm_priority
+from app.graphql.dataloaders import create_genre_loader, create_movie_loader
+from app.repositories._base_client import api_client
+from app.repositories.analysis_repository import AnalysisRepository
+from app.repositories.movie_repository import movie_repository
+from app.services import prompts
+from app.services.movie_analyzer_v2 import ANALYSIS_MODE_COMBINED, ANALYSIS_MODE_PARALLEL, analyze_movies
+
+CHECKPOINT_NAME = "enrich"
+
+
+async def _analyze_and_save(store: AnalysisRepository, movie_ids: list[str], movie_loader,
+                            concurrency: int, mode: str) -> tuple[int, int]:
+    """Analyse les films et enregistre les analyses complètes ; les échecs sont notés pour être retentés."""
+    results = await analyze_movies(
+        movie_ids=movie_ids,
+        ai_summary=True,
+        ai_opinion_summary=True,
+        ai_best_genre=True,
+        ai_tags=True,
+        llm=llm,
+        max_parallelism=concurrency,
+        movie_loader=movie_loader,
+        genre_loader=create_genre_loader(),
+        mode=mode,
+        use_precomputed=False
+    )
+    failed_ids, succeeded_ids = [], []
+    for movie_id, analysis_data, error in results:
+        # Une analyse incomplète (champ hors budget ou en échec) n'est pas enregistrée
+        if not error and analysis_data["errors"]:
+            error = next(iter(analysis_data["errors"].values()))
+        if error:
+            failed_ids.append(movie_id)
+            print(f"Film {movie_id} : échec de l'analyse ({error.__class__.__name__}: {error}).")
+        else:
+            succeeded_ids.append(movie_id)
+            await store.save(analysis_data)
+    await store.set_failed(CHECKPOINT_NAME, failed_ids, succeeded_ids)
+    return len(succeeded_ids), len(failed_ids)
+
+
+async def enrich(store: AnalysisRepository, page_size: int, concurrency: int, restart: bool, mode: str) -> None:
+    try:
+        await _enrich(store, page_size, concurrency, restart, mode)
+    finally:
+        # Connexions gardées ouvertes vers l'API Movie, fermées avant la fin de la boucle d'événements
+        await api_client.aclose()
+
+
+async def _enrich(store: AnalysisRepository, page_size: int, concurrency: int, restart: bool, mode: str) -> None:
+    llm_priority.set(LLMPriority.BATCH)
+    # Même tokenizer que le serveur : budgets de prompt et découpage des avis identiques
+    await asyncio.to_thread(prompts.load_tokenizer)
+    skip = 0 if restart else await store.get_checkpoint(CHECKPOINT_NAME)
+    analysed = failed = 0
+    if skip:
+        print(f"Reprise à partir du film n°{skip}.")
+        # Films en échec avant l'interruption : retentés avant de poursuivre le parcours
+        retry_ids = await store.get_failed(CHECKPOINT_NAME)
+        if retry_ids:
+            print(f"Nouvelle tentative pour {len(retry_ids)} films en échec.")
+            analysed, failed = await _analyze_and_save(store, retry_ids, create_movie_loader(), concurrency, mode)
+    else:
+        # Nouveau parcours complet : tous les films seront de toute façon analysés
+        await store.clear_failed(CHECKPOINT_NAME)
+
+    while True:
+        movies = await movie_repository.list(skip=skip, limit=page_size)
+        if not movies:
+            break
+
+        # Les films de la page sont déjà chargés : on les fournit au service sans nouvel appel à l'API
+        movie_loader = create_movie_loader()
+        movie_loader.prime_many({str(movie.id): movie for movie in movies})
+
+        page_analysed, page_failed = await _analyze_and_save(
+            store, [str(movie.id) for movie in movies], movie_loader, concurrency, mode
+        )
+        analysed += page_analysed
+        failed += page_failed
+
+        skip += len(movies)
+        await store.set_checkpoint(CHECKPOINT_NAME, skip)
+        print(f"{skip} films traités ({analysed} analysés, {failed} en échec).")
+        if len(movies) < page_size:
+            break
+
+    # Catalogue entièrement parcouru : la prochaine exécution recalculera tout
+    await store.set_checkpoint(CHECKPOINT_NAME, 0)
+    print(f"Terminé : {analysed} analyses enregistrées, {failed} échecs.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Précalcule les analyses IA de tous les films.")
+    parser.add_argument("--store", default=settings.ANALYSIS_STORE_PATH or "analyses.sqlite",
+                        help="Fichier SQLite de destination (défaut : ANALYSIS_STORE_PATH).")
+    parser.add_argument("--page-size", type=int, default=50, help="Nombre de films demandés par page.")
+    parser.add_argument("--concurrency", type=int, default=settings.ANALYZE_MOVIES_MAX_PARALLELISM,
+                        help="Nombre d'analyses simultanées.")
+    parser.add_argument("--mode", default=settings.LLM_ANALYSIS_MODE,
+                        choices=[ANALYSIS_MODE_PARALLEL, ANALYSIS_MODE_COMBINED], help="Mode d'appel au LLM.")
+    parser.add_argument("--restart", action="store_true", help="Ignore le point de reprise et repart du début.")
+    args = parser.parse_args()
+
+    asyncio.run(enrich(
+        store=AnalysisRepository(path=args.store),
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        restart=args.restart,
+        mode=args.mode,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
-from fastapi import Request
+from fastapi.requests import HTTPConnection
 from typing import Any, Dict
 from app.core.llm import llm
+from app.graphql.dataloaders import create_genre_loader, create_movie_loader
 
-async def get_context(request: Request) -> Dict[str, Any]:
+async def get_context(request: HTTPConnection) -> Dict[str, Any]:
     """
     Crée le contexte pour chaque requête GraphQL.
+    `request` est une requête HTTP ou une connexion WebSocket (abonnements).
     """
     return {
         "request": request,
-        "llm": llm  # on ajoute l'instance llm au dictionnaire du contexte
+        "llm": llm,  # on ajoute l'instance llm au dictionnaire du contexte
+        # DataLoaders propres à la requête (dédoublonnage des appels à l'API Movie)
+        "movie_loader": create_movie_loader(),
+        "genre_loader": create_genre_loader(),
     }
@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+from app.core.config import settings
+
+from strawberry.dataloader import DataLoader
+
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.repositories.genre_repository import genre_repository
+from app.repositories.movie_repository import movie_repository
+
+# Les DataLoaders sont créés pour chaque requête GraphQL (voir context.py) :
+# ils dédupliquent et regroupent les chargements déclenchés par les différents alias
+# d'un même document, sans partager de données entre deux requêtes.
+
+
+async def load_movies(movie_ids: List[str]) -> List[Optional[Movie] | BaseException]:
+    # Une exception dans la liste n'est levée que pour le film concerné (DataLoader)
+    return await movie_repository.find_by_ids(movie_ids)
+
+
+class GenreLoader(DataLoader[str, List[Genre]]):
+    """DataLoader à clé unique : tous les alias d'une requête partagent la même liste de genres."""
+
+    KEY = "all"
+
+    def __init__(self):
+        super().__init__(load_fn=self._load_genres)
+
+    @staticmethod
+    async def _load_genres(keys: List[str]) -> List[List[Genre]]:
+        genres = await genre_repository.list()
+        return [genres for _ in keys]
+
+    async def all(self) -> List[Genre]:
+        return await self.load(self.KEY)
+
+
+def create_movie_loader() -> DataLoader[str, Optional[Movie]]:
+    # Sans chargement groupé par GET /movies/, chaque film est chargé seul : un film lent
+    # ne retarde pas les autres (les alias d'un même film restent dédupliqués par le cache du loader)
+    max_batch_size = None if settings.MOVIE_BULK_LIST_THRESHOLD else 1
+    return DataLoader(load_fn=load_movies, max_batch_size=max_batch_size)
+
+
+def create_genre_loader() -> GenreLoader:
+    return GenreLoader()
@@ -1,5 +1,14 @@
-from strawberry.extensions import Extension
-from app.core.exceptions import BLLException
+import functools
+import inspect
+import ipaddress
+import time
+
+from graphql import GraphQLError
+from strawberry.extensions import Extension, SchemaExtension
+from app.core.config import settings
+from app.core.exceptions import BLLException, QueryQuotaExceededBLLException, QueryTooExpensiveBLLException
+from app.core.metrics import graphql_operation_duration, graphql_operations_in_flight, graphql_resolver_duration
+from app.graphql.query_cost import CostQuota, QueryCost
 
 class BusinessLogicErrorExtension(Extension):
     def on_request_end(self):
@@ -12,4 +21,116 @@ class BusinessLogicErrorExtension(Extension):
                 error.message = f"[Business Error] {original_error}"
                 if not error.extensions:
                     error.extensions = {}
-                error.extensions['code'] = original_error.__class__.__name__
\ No newline at end of file
+                error.extensions['code'] = original_error.__class__.__name__
+
+def _operation_label(operation_name) -> str:
+    """Libellé de l'opération : le nom, choisi par le client, n'est repris que s'il figure dans la liste autorisée."""
+    if not operation_name:
+        return "anonymous"
+    allowed = {name.strip() for name in settings.GRAPHQL_METRICS_OPERATION_NAMES.split(",") if name.strip()}
+    return operation_name if operation_name in allowed else "other"
+
+
+class MetricsExtension(SchemaExtension):
+    """Mesures Prometheus : durée des opérations GraphQL, des resolvers asynchrones et opérations en cours."""
+
+    def on_operation(self):
+        graphql_operations_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            graphql_operations_in_flight.dec()
+            context = self.execution_context
+            operation_type = context.operation_type.value if context.operation_type else "unknown"
+            graphql_operation_duration.labels(
+                operation_type=operation_type,
+                operation_name=_operation_label(context.operation_name),
+            ).observe(time.perf_counter() - started)
+
+    def resolve(self, _next, root, info, *args, **kwargs):
+        result = _next(root, info, *args, **kwargs)
+        # Les champs simples (lecture d'attribut) ne sont pas mesurés : seuls les resolvers asynchrones le sont
+        if not inspect.isawaitable(result):
+            return result
+        return self._observe(result, f"{info.parent_type.name}.{info.field_name}")
+
+    @staticmethod
+    async def _observe(result, field: str):
+        started = time.perf_counter()
+        try:
+            return await result
+        finally:
+            graphql_resolver_duration.labels(field=field).observe(time.perf_counter() - started)
+
+
+
+# Quotas de coût par client, partagés par toutes les requêtes du processus
+cost_quota = CostQuota(per_minute=settings.QUERY_COST_QUOTA_PER_MINUTE)
+
+
+@functools.lru_cache(maxsize=8)
+def _trusted_networks(trusted_proxies: str) -> tuple:
+    return tuple(ipaddress.ip_network(proxy.strip(), strict=False)
+                 for proxy in trusted_proxies.split(",") if proxy.strip())
+
+
+def _is_trusted(address: str, networks: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def _client_id(context) -> str:
+    """
+    Client du quota : l'adresse de la connexion ou, si elle vient d'un proxy de confiance
+    (QUERY_QUOTA_TRUSTED_PROXIES, ex. l'Ingress nginx), la première adresse non fiable de
+    X-Forwarded-For lue de droite à gauche. Les entrées plus à gauche, fournies par le client,
+    sont ignorées : il ne peut pas changer de quota en les modifiant.
+    """
+    request = context.get("request") if isinstance(context, dict) else None
+    if request is None or request.client is None:
+        return "anonymous"
+    host = request.client.host
+    networks = _trusted_networks(settings.QUERY_QUOTA_TRUSTED_PROXIES)
+    if not _is_trusted(host, networks):
+        return host
+    forwarded = [address.strip() for address in request.headers.get("X-Forwarded-For", "").split(",") if address.strip()]
+    for address in reversed(forwarded):
+        if not _is_trusted(address, networks):
+            return address
+    return forwarded[0] if forwarded else host
+
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Refuse, avant toute exécution, les documents trop coûteux pour le LLM :
+    coût (poids des champs IA, alias, taille des lots), profondeur et quota du client.
+    """
+
+    def on_validate(self):
+        context = self.execution_context
+        if context.graphql_document is not None and not context.pre_execution_errors:
+            error = self._check(context)
+            if error is not None:
+                # Renseigner les erreurs avant la validation l'interrompt : rien n'est exécuté
+                context.pre_execution_errors = [GraphQLError(str(error), original_error=error)]
+        yield
+
+    @staticmethod
+    def _check(context) -> BLLException | None:
+        query_cost = QueryCost(context.graphql_document, context.operation_name, context.variables)
+        if query_cost.depth > settings.QUERY_MAX_DEPTH:
+            return QueryTooExpensiveBLLException(
+                f"Requête trop profonde ({query_cost.depth} niveaux, maximum {settings.QUERY_MAX_DEPTH})."
+            )
+        if query_cost.cost > settings.QUERY_MAX_COST:
+            return QueryTooExpensiveBLLException(
+                f"Requête trop coûteuse (coût {query_cost.cost}, maximum {settings.QUERY_MAX_COST})."
+            )
+        retry_after = cost_quota.consume(_client_id(context.context), query_cost.cost)
+        if retry_after is not None:
+            return QueryQuotaExceededBLLException(retry_after=retry_after)
+        return None
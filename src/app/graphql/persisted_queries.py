@@ -0,0 +1,109 @@
+import dataclasses
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from graphql import GraphQLError
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.types import ExecutionResult
+
+from app.core.config import settings
+
+# Codes d'erreur du protocole "Automatic Persisted Queries" : les clients (Apollo, urql...)
+# renvoient le document complet lorsqu'ils reçoivent PERSISTED_QUERY_NOT_FOUND.
+PERSISTED_QUERY_NOT_FOUND = "PERSISTED_QUERY_NOT_FOUND"
+PERSISTED_QUERY_NOT_ALLOWED = "PERSISTED_QUERY_NOT_ALLOWED"
+PERSISTED_QUERY_HASH_MISMATCH = "PERSISTED_QUERY_HASH_MISMATCH"
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class PersistedQueryStore:
+    """
+    Documents GraphQL connus, indexés par leur empreinte SHA-256.
+    - mode automatique : les documents envoyés par les clients sont enregistrés (LRU borné) ;
+    - mode liste blanche : seuls les documents du manifeste (JSON {empreinte: document}) sont acceptés.
+    """
+
+    def __init__(self, max_entries: int, allowlist: Optional[Dict[str, str]] = None):
+        self.max_entries = max_entries
+        self.allowlist = allowlist
+        self._queries: OrderedDict[str, str] = OrderedDict()
+
+    @classmethod
+    def from_settings(cls) -> "PersistedQueryStore":
+        allowlist = None
+        if settings.PERSISTED_QUERIES_ALLOWLIST_PATH:
+            with open(settings.PERSISTED_QUERIES_ALLOWLIST_PATH, encoding="utf-8") as file:
+                allowlist = json.load(file)
+        return cls(max_entries=settings.PERSISTED_QUERIES_MAX_ENTRIES, allowlist=allowlist)
+
+    def get(self, sha256_hash: str) -> Optional[str]:
+        if self.allowlist is not None:
+            return self.allowlist.get(sha256_hash)
+        query = self._queries.get(sha256_hash)
+        if query is not None:
+            self._queries.move_to_end(sha256_hash)
+        return query
+
+    def is_allowed(self, query: str) -> bool:
+        return self.allowlist is None or query_hash(query) in self.allowlist
+
+    def register(self, sha256_hash: str, query: str) -> None:
+        if self.allowlist is not None or not self.max_entries:
+            return
+        self._queries[sha256_hash] = query
+        self._queries.move_to_end(sha256_hash)
+        while len(self._queries) > self.max_entries:
+            self._queries.popitem(last=False)
+
+
+def _error(message: str, code: str) -> ExecutionResult:
+    return ExecutionResult(data=None, errors=[GraphQLError(message, extensions={"code": code})])
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """
+    Routeur GraphQL acceptant les requêtes persistées (extension `persistedQuery` : empreinte
+    du document au lieu du document complet), en POST comme en GET. Les réponses réussies
+    aux requêtes GET peuvent être mises en cache par un CDN (Cache-Control).
+    """
+
+    def __init__(self, *args, store: PersistedQueryStore, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+
+    def should_render_graphql_ide(self, request) -> bool:
+        # Un GET sans document mais avec une empreinte est une requête persistée, pas l'IDE
+        return super().should_render_graphql_ide(request) and request.query_params.get("extensions") is None
+
+    async def execute_single(self, request, request_adapter, sub_response, context, root_value, request_data):
+        persisted = (request_data.extensions or {}).get("persistedQuery")
+        query = request_data.query
+
+        if isinstance(persisted, dict) and persisted.get("sha256Hash"):
+            sha256_hash = persisted["sha256Hash"]
+            if query is None:
+                query = self.store.get(sha256_hash)
+                if query is None:
+                    return _error("PersistedQueryNotFound", PERSISTED_QUERY_NOT_FOUND)
+            elif query_hash(query) != sha256_hash:
+                return _error("L'empreinte fournie ne correspond pas au document.", PERSISTED_QUERY_HASH_MISMATCH)
+            else:
+                self.store.register(sha256_hash, query)
+
+        if query is not None and not self.store.is_allowed(query):
+            return _error("Ce document GraphQL n'est pas autorisé.", PERSISTED_QUERY_NOT_ALLOWED)
+
+        request_data: GraphQLRequestData = dataclasses.replace(request_data, query=query)
+        result = await super().execute_single(
+            request, request_adapter, sub_response, context, root_value, request_data
+        )
+
+        if request_adapter.method == "GET" and settings.GRAPHQL_GET_CACHE_MAX_AGE and not result.errors:
+            sub_response.headers["Cache-Control"] = f"public, max-age={settings.GRAPHQL_GET_CACHE_MAX_AGE}"
+        return result
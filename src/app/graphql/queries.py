@@ -1,9 +1,13 @@
+from typing import List
+
 import strawberry
 
 # Note : l'énoncé demande d'importer la V1 à l'étape 3, puis la V2 à l'étape 6
 # L'import ci-dessous correspond à l'étape 6.
 from app.graphql.resolvers.analyze_movie_v2 import analyze_movie_by_id
+from app.graphql.resolvers.analyze_movies import analyze_movies_by_ids
 from app.graphql.types.movie_analysis import MovieAnalysis
+from app.graphql.types.movie_analysis_result import MovieAnalysisResult
 
 
 @strawberry.type
@@ -16,3 +20,8 @@ class Query:
         resolver=analyze_movie_by_id,
         description="Analyse un film en utilisant l'IA."
     )
+
+    analyzeMovies: List[MovieAnalysisResult] = strawberry.field(
+        resolver=analyze_movies_by_ids,
+        description="Analyse un lot de films côté serveur ; chaque film renvoie son analyse ou son erreur."
+    )
@@ -0,0 +1,144 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    ListValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    VariableNode,
+)
+
+# Coût d'un champ IA : un appel au LLM (les résumés, plus longs, pèsent davantage)
+AI_FIELD_WEIGHTS = {
+    "aiSummary": 10,
+    "aiOpinionSummary": 10,
+    "aiBestGenre": 5,
+    "aiTags": 5,
+}
+# Coût de tout autre champ
+DEFAULT_FIELD_COST = 1
+# Champs renvoyant une liste dont la taille est donnée par un argument : (champ, argument)
+LIST_SIZE_ARGUMENTS = {"analyzeMovies": "ids"}
+
+
+def _directive_skips(node, variables: Dict[str, Any]) -> bool:
+    """Évalue @skip / @include : True si la sélection est exclue de la réponse."""
+    for directive in node.directives or ():
+        if directive.name.value not in ("skip", "include"):
+            continue
+        condition = None
+        for argument in directive.arguments:
+            if argument.name.value == "if":
+                value = argument.value
+                condition = variables.get(value.name.value) if isinstance(value, VariableNode) \
+                    else getattr(value, "value", None)
+        if directive.name.value == "skip" and condition is True:
+            return True
+        if directive.name.value == "include" and condition is False:
+            return True
+    return False
+
+
+def _list_size(field: FieldNode, variables: Dict[str, Any]) -> int:
+    argument_name = LIST_SIZE_ARGUMENTS.get(field.name.value)
+    if argument_name is None:
+        return 1
+    for argument in field.arguments:
+        if argument.name.value == argument_name:
+            value = argument.value
+            if isinstance(value, VariableNode):
+                items = variables.get(value.name.value)
+                return len(items) if isinstance(items, (list, tuple)) else 1
+            if isinstance(value, ListValueNode):
+                return len(value.values)
+            return 1
+    return 1
+
+
+class QueryCost:
+    """Coût et profondeur d'une opération GraphQL, calculés avant son exécution."""
+
+    def __init__(self, document: DocumentNode, operation_name: Optional[str], variables: Optional[Dict[str, Any]]):
+        self.variables = variables or {}
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        operations = [
+            definition for definition in document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+            and (operation_name is None or (definition.name and definition.name.value == operation_name))
+        ]
+        self.cost = 0
+        self.depth = 0
+        if operations:
+            self.cost, self.depth = self._measure(operations[0].selection_set, depth=1, visited=frozenset())
+
+    def _measure(self, selection_set: Optional[SelectionSetNode], depth: int, visited: frozenset) -> tuple[int, int]:
+        """Retourne (coût, profondeur) d'une sélection, fragments développés."""
+        if selection_set is None:
+            return 0, depth - 1
+        cost, max_depth = 0, depth
+        for selection in selection_set.selections:
+            if _directive_skips(selection, self.variables):
+                continue
+            if isinstance(selection, FieldNode):
+                child_cost, child_depth = self._measure(selection.selection_set, depth + 1, visited)
+                field_cost = AI_FIELD_WEIGHTS.get(selection.name.value, DEFAULT_FIELD_COST)
+                cost += (field_cost + child_cost) * _list_size(selection, self.variables)
+                max_depth = max(max_depth, child_depth)
+                continue
+            if isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                # Un fragment qui s'inclut lui-même est refusé par la validation : on ne le suit pas
+                if name in visited or name not in self.fragments:
+                    continue
+                fragment_set, visited_now = self.fragments[name].selection_set, visited | {name}
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_set, visited_now = selection.selection_set, visited
+            else:
+                continue
+            fragment_cost, fragment_depth = self._measure(fragment_set, depth, visited_now)
+            cost += fragment_cost
+            max_depth = max(max_depth, fragment_depth)
+        return cost, max_depth
+
+
+class CostQuota:
+    """
+    Quota de coût par client (seau à jetons) : `per_minute` points par minute,
+    consommables en rafale jusqu'à `per_minute`. Les clients les moins récents sont oubliés.
+    """
+
+    def __init__(self, per_minute: int, max_clients: int = 10_000):
+        self.per_minute = per_minute
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def consume(self, client: str, cost: int) -> Optional[float]:
+        """Débite `cost` points ; retourne None si accepté, sinon le délai (secondes) avant de pouvoir réessayer."""
+        if not self.per_minute:
+            return None
+        now = time.monotonic()
+        rate = self.per_minute / 60
+        tokens, updated_at = self._buckets.get(client, (self.per_minute, now))
+        tokens = min(self.per_minute, tokens + (now - updated_at) * rate)
+        if cost > tokens:
+            self._buckets[client] = (tokens, now)
+            self._buckets.move_to_end(client)
+            return (cost - tokens) / rate
+        self._buckets[client] = (tokens - cost, now)
+        self._buckets.move_to_end(client)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return None
+
+    def clear(self) -> None:
+        self._buckets.clear()
@@ -0,0 +1,30 @@
+from typing import AsyncGenerator
+
+import strawberry
+from strawberry import Info
+
+from app.graphql.resolvers.helper import requested_fields
+from app.graphql.types.movie_analysis import MovieAnalysis
+from app.services.movie_analyzer_v2 import analyze_movie_stream
+
+
+async def analyze_movie_stream_by_id(
+        movie_id: strawberry.ID,
+        info: Info,
+        stream_tokens: bool = False,
+) -> AsyncGenerator[MovieAnalysis, None]:
+    llm = info.context["llm"]
+    requested = requested_fields(info)
+
+    async for analysis_data in analyze_movie_stream(
+        movie_id=movie_id,
+        ai_summary="aiSummary" in requested,
+        ai_opinion_summary="aiOpinionSummary" in requested,
+        ai_best_genre="aiBestGenre" in requested,
+        ai_tags="aiTags" in requested,
+        llm=llm,
+        stream_tokens=stream_tokens,
+        movie_loader=info.context.get("movie_loader"),
+        genre_loader=info.context.get("genre_loader")
+    ):
+        yield MovieAnalysis.from_analysis(analysis_data)
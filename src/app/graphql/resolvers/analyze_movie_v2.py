@@ -1,7 +1,10 @@
+from typing import Optional
+
 import strawberry
 from strawberry import Info
 
-from app.graphql.resolvers.helper import is_field_requested
+from app.graphql.resolvers.helper import requested_fields
+from app.graphql.types.analysis_mode import AnalysisMode
 from app.graphql.types.movie_analysis import MovieAnalysis
 from app.services.movie_analyzer_v2 import analyze_movie
 
@@ -9,16 +12,21 @@ from app.services.movie_analyzer_v2 import analyze_movie
 async def analyze_movie_by_id(
         movie_id: strawberry.ID,
         info: Info,
+        mode: Optional[AnalysisMode] = None,
 ) -> MovieAnalysis:
     llm = info.context["llm"]
+    requested = requested_fields(info)
 
     analysis_data = await analyze_movie(
         movie_id=movie_id,
-        ai_summary=is_field_requested(info, "aiSummary"),
-        ai_opinion_summary=is_field_requested(info, "aiOpinionSummary"),
-        ai_best_genre=is_field_requested(info, "aiBestGenre"),
-        ai_tags=is_field_requested(info, "aiTags"),
-        llm=llm
+        ai_summary="aiSummary" in requested,
+        ai_opinion_summary="aiOpinionSummary" in requested,
+        ai_best_genre="aiBestGenre" in requested,
+        ai_tags="aiTags" in requested,
+        llm=llm,
+        movie_loader=info.context.get("movie_loader"),
+        genre_loader=info.context.get("genre_loader"),
+        mode=mode.value if mode else None
     )
 
-    return MovieAnalysis(**analysis_data)
+    return MovieAnalysis.from_analysis(analysis_data)
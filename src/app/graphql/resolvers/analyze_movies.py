@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+import strawberry
+from strawberry import Info
+
+from app.core.config import settings
+from app.core.exceptions import BaseAppException, ValidationBLLException
+from app.core.llm_gateway import LLMPriority, llm_priority
+from app.graphql.resolvers.helper import requested_fields
+from app.graphql.types.analysis_mode import AnalysisMode
+from app.graphql.types.movie_analysis import MovieAnalysis
+from app.graphql.types.movie_analysis_result import AnalysisError, MovieAnalysisResult
+from app.services.movie_analyzer_v2 import analyze_movies
+
+
+def _to_analysis_error(error: Exception) -> AnalysisError:
+    if isinstance(error, BaseAppException):
+        return AnalysisError(code=error.__class__.__name__, message=str(error))
+    return AnalysisError(code="InternalError", message="Erreur inattendue lors de l'analyse du film.")
+
+
+async def analyze_movies_by_ids(
+        ids: List[strawberry.ID],
+        info: Info,
+        mode: Optional[AnalysisMode] = None,
+) -> List[MovieAnalysisResult]:
+    if len(ids) > settings.ANALYZE_MOVIES_MAX_IDS:
+        raise ValidationBLLException(
+            f"Un lot ne peut pas dépasser {settings.ANALYZE_MOVIES_MAX_IDS} films ({len(ids)} demandés)."
+        )
+
+    llm = info.context["llm"]
+    requested = requested_fields(info, parent="analysis")
+
+    # Les analyses par lot passent après les requêtes interactives dans la file du LLM
+    token = llm_priority.set(LLMPriority.BATCH)
+    try:
+        results = await analyze_movies(
+            movie_ids=ids,
+            ai_summary="aiSummary" in requested,
+            ai_opinion_summary="aiOpinionSummary" in requested,
+            ai_best_genre="aiBestGenre" in requested,
+            ai_tags="aiTags" in requested,
+            llm=llm,
+            max_parallelism=settings.ANALYZE_MOVIES_MAX_PARALLELISM,
+            movie_loader=info.context.get("movie_loader"),
+            genre_loader=info.context.get("genre_loader"),
+            mode=mode.value if mode else None
+        )
+    finally:
+        llm_priority.reset(token)
+
+    return [
+        MovieAnalysisResult(
+            movieId=strawberry.ID(movie_id),
+            analysis=MovieAnalysis.from_analysis(analysis_data) if analysis_data else None,
+            error=_to_analysis_error(error) if error else None,
+        )
+        for movie_id, analysis_data, error in results
+    ]
@@ -1,11 +1,44 @@
+from typing import Optional, Set
+
+from graphql import GraphQLObjectType, get_named_type
+# API interne de graphql-core (modifiée en 3.3) : version bornée dans pyproject.toml,
+# tests/test_requested_fields.py échoue si elle change
+from graphql.execution.collect_fields import collect_sub_fields
 from strawberry import Info
 
 
-def is_field_requested(info: Info, field_name: str) -> bool:
-    for field_node in info.field_nodes:
-        if field_node.selection_set:
-            for selection in field_node.selection_set.selections:
-                if selection.name.value == field_name:
-                    return True
-    return False
+def requested_fields(info: Info, parent: Optional[str] = None) -> Set[str]:
+    """
+    Noms des champs demandés dans la sélection du champ courant ou, si `parent` est fourni,
+    dans la sélection de son sous-champ `parent`.
+    La sélection est développée comme le fait l'exécuteur GraphQL : fragments nommés et en ligne
+    (selon leur condition de type), alias, et directives @skip / @include évaluées avec les variables.
+    """
+    # Strawberry n'expose pas les nœuds de la sélection : on passe par le GraphQLResolveInfo d'origine
+    raw_info = info._raw_info
+    field_nodes = list(raw_info.field_nodes)
+    return_type = get_named_type(raw_info.return_type)
+
+    def collect(object_type, nodes):
+        if not isinstance(object_type, GraphQLObjectType):
+            return {}
+        return collect_sub_fields(raw_info.schema, raw_info.fragments, raw_info.variable_values, object_type, nodes)
+
+    fields = collect(return_type, field_nodes)
+    if parent is not None:
+        # Un même sous-champ peut être sélectionné sous plusieurs alias : on fusionne leurs sélections
+        parent_nodes = [node for nodes in fields.values() for node in nodes if node.name.value == parent]
+        if not parent_nodes:
+            return set()
+        fields = collect(get_named_type(return_type.fields[parent].type), parent_nodes)
+
+    return {node.name.value for nodes in fields.values() for node in nodes}
+
 
+def is_field_requested(info: Info, field_name: str, parent: Optional[str] = None) -> bool:
+    """
+    Indique si `field_name` est demandé dans la sélection du champ courant
+    ou, si `parent` est fourni, dans la sélection de son sous-champ `parent`.
+    Pour tester plusieurs champs, calculer `requested_fields` une seule fois.
+    """
+    return field_name in requested_fields(info, parent)
@@ -0,0 +1,18 @@
+from typing import AsyncGenerator
+
+import strawberry
+
+from app.graphql.resolvers.analyze_movie_stream import analyze_movie_stream_by_id
+from app.graphql.types.movie_analysis import MovieAnalysis
+
+
+@strawberry.type
+class Subscription:
+    """
+    Point d'entrée pour tous les abonnements GraphQL (WebSocket ou HTTP multipart).
+    """
+
+    analyzeMovie: AsyncGenerator[MovieAnalysis, None] = strawberry.subscription(
+        resolver=analyze_movie_stream_by_id,
+        description="Analyse un film en envoyant chaque champ IA dès qu'il est prêt."
+    )
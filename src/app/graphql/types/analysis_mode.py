@@ -0,0 +1,10 @@
+from enum import Enum
+import strawberry
+
+from app.services.movie_analyzer_v2 import ANALYSIS_MODE_COMBINED, ANALYSIS_MODE_PARALLEL
+
+
+@strawberry.enum(description="Stratégie d'appel au LLM pour calculer les champs IA.")
+class AnalysisMode(Enum):
+    PARALLEL = ANALYSIS_MODE_PARALLEL
+    COMBINED = ANALYSIS_MODE_COMBINED
@@ -1,4 +1,3 @@
-
 from typing import List, Optional
 import strawberry
 
@@ -10,3 +9,13 @@ class MovieAnalysis:
     aiBestGenre: Optional[str]
     aiTags: Optional[List[str]]
 
+    @classmethod
+    def from_analysis(cls, analysis_data: dict) -> "MovieAnalysis":
+        """
+        Construit le type GraphQL à partir du résultat du service V2.
+        Un champ en échec reçoit son exception comme valeur : graphql-core le résout alors
+        à null et ajoute une erreur GraphQL localisée sur ce champ, les autres restant renvoyés.
+        """
+        values = {key: analysis_data.get(key) for key in ("id", "aiSummary", "aiOpinionSummary", "aiBestGenre", "aiTags")}
+        values.update(analysis_data.get("errors") or {})
+        return cls(**values)
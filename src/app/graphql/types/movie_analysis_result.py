@@ -0,0 +1,18 @@
+from typing import Optional
+import strawberry
+
+from app.graphql.types.movie_analysis import MovieAnalysis
+
+
+@strawberry.type
+class AnalysisError:
+    code: str
+    message: str
+
+
+@strawberry.type
+class MovieAnalysisResult:
+    """Résultat de l'analyse d'un film dans un lot : l'analyse ou l'erreur rencontrée."""
+    movieId: strawberry.ID
+    analysis: Optional[MovieAnalysis]
+    error: Optional[AnalysisError]
@@ -1,13 +1,59 @@
-from fastapi import FastAPI
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from app.core.config import settings
-from strawberry.fastapi import GraphQLRouter
+from app.core.llm import llm_batcher, llm_cache, llm_coalescer, llm_gateway
+from app.core.logging_config import configure_logging, request_id, shutdown_logging
+from app.core.metrics import StatsCollector
+from app.core.tracing import configure_tracing
 import strawberry
+from strawberry.extensions import ParserCache, ValidationCache
+from strawberry.extensions.tracing import OpenTelemetryExtension
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 from app.graphql.context import get_context
-from app.graphql.extensions import BusinessLogicErrorExtension
+from app.graphql.extensions import BusinessLogicErrorExtension, MetricsExtension, QueryCostLimiter
 from app.graphql.mutations import Mutation
+from app.graphql.persisted_queries import PersistedQueryRouter, PersistedQueryStore
 from app.graphql.queries import Query
+from app.graphql.subscriptions import Subscription
+from app.repositories._base_client import api_client
+from app.repositories.genre_repository import genre_repository
+from app.services import prompts
+from app.services.genre_classifier import genre_classifier
+from app.services.movie_analyzer_v2 import analysis_flights
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarrage et arrêt des ressources partagées par toutes les requêtes."""
+    # Pool de connexions vers l'API Movie, réutilisé par toutes les requêtes
+    api_client.start()
+    # Catalogue des genres chargé au démarrage puis rafraîchi en tâche de fond
+    await genre_repository.start_background_refresh()
+    # Tokenizer chargé dans un thread : son chargement (voire téléchargement) ne bloque pas la boucle
+    await asyncio.to_thread(prompts.load_tokenizer)
+    yield
+    await genre_repository.stop_background_refresh()
+    await api_client.aclose()
+    if tracer_provider:
+        # Exporte les derniers spans avant l'arrêt
+        tracer_provider.shutdown()
+    shutdown_logging()
+
+
+# Logs JSON écrits par un thread dédié (niveau : LOG_LEVEL)
+configure_logging()
+
+
+# Traces OpenTelemetry (désactivées si TRACING_EXPORTER vaut "none")
+tracer_provider = configure_tracing()
+
+# Compteurs déjà tenus par le cache, la passerelle LLM et le client de l'API Movie, lus à chaque collecte
+REGISTRY.register(StatsCollector(llm_cache, llm_gateway, api_client))
+
 
 # Crée l'application FastAPI
 app = FastAPI(
@@ -15,6 +61,7 @@ app = FastAPI(
     description="API GraphQL pour l'analyse de films par IA",
     version="1.0.0",
     debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
 # CORS middleware - configured for production
@@ -32,15 +79,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Crée le schéma GraphQL avec les types de requêtes et de mutations
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Identifiant de requête (repris de X-Request-ID s'il est fourni) présent dans tous les logs."""
+    token = request_id.set(request.headers.get("X-Request-ID") or uuid.uuid4().hex)
+    try:
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id.get()
+        return response
+    finally:
+        request_id.reset(token)
+
+# Crée le schéma GraphQL avec les types de requêtes, de mutations et d'abonnements
 schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
-    extensions=[BusinessLogicErrorExtension]
+    subscription=Subscription,
+    extensions=[
+        BusinessLogicErrorExtension,
+        MetricsExtension,
+        # Documents déjà analysés et validés réutilisés tels quels (LRU)
+        ParserCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+        ValidationCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+        # Après ValidationCache, qui remplace les erreurs de validation
+        QueryCostLimiter,
+    ]
+    # Spans de l'opération et des resolvers, seulement si un exporteur est configuré
+    + ([OpenTelemetryExtension] if tracer_provider else [])
 )
 
 # Crée le routeur GraphQL et l'ajoute à l'application
-graphql_app = GraphQLRouter(schema, context_getter=get_context)
+graphql_app = PersistedQueryRouter(schema, context_getter=get_context, store=PersistedQueryStore.from_settings())
 app.include_router(graphql_app, prefix="/graphql")
 
 
@@ -55,9 +125,22 @@ def health_check():
     return {
         "status": "healthy",
         "service": settings.PROJECT_NAME,
+        "llm_cache": llm_cache.stats(),
+        "llm_gateway": llm_gateway.stats(),
+        "llm_batcher": llm_batcher.stats(),
+        "movie_api": api_client.stats(),
+        "analysis_coalescing": analysis_flights.stats(),
+        "prompt_coalescing": llm_coalescer.in_flight.stats(),
+        "genre_classifier": genre_classifier.stats() if genre_classifier else None,
     }
 
 
+@app.get("/metrics", tags=["Health"])
+def metrics():
+    """Métriques au format Prometheus (latences, jetons LLM, caches, appels en cours)."""
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     uvicorn.run(
         app,
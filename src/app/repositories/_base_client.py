@@ -1,21 +1,197 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Optional, TypeVar
+
 import httpx
 from app.core.config import settings
 from app.core.exceptions import DALException
+from app.core.metrics import movie_api_request_duration, route_template
+from app.core.tracing import tracer
+from opentelemetry.propagate import inject
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from app.repositories._resilience import CircuitBreaker, LatencyTracker, backoff_delay
+
+T = TypeVar("T")
+
+# Statuts transitoires pour lesquels un GET est relancé
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+# Résultats déjà désérialisés, par réponse HTTP : une réponse revalidée (304) n'est pas re-validée
+_parsed_responses: "weakref.WeakKeyDictionary[Any, dict]" = weakref.WeakKeyDictionary()
+
+
+def parse_response(response: httpx.Response, parser: Callable[[Any], T]) -> T:
+    """
+    Applique `parser` au JSON de la réponse, une seule fois par réponse.
+    Les réponses servies depuis le cache HTTP de BaseClient étant les mêmes objets,
+    le modèle pydantic construit au premier appel est réutilisé tel quel.
+    """
+    parsed = _parsed_responses.setdefault(response, {})
+    if parser not in parsed:
+        parsed[parser] = parser(response.json())
+    return parsed[parser]
+
+
+class HTTPResponseCache:
+    """
+    Réponses GET conservées avec leurs validateurs (ETag / Last-Modified), pour les
+    requêtes conditionnelles. LRU borné ; 0 entrée désactive le cache.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, httpx.Response] = OrderedDict()
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[httpx.Response]:
+        response = self._entries.get(key)
+        if response is not None:
+            self._entries.move_to_end(key)
+        return response
+
+    def set(self, key: str, response: httpx.Response) -> None:
+        if not self.max_entries:
+            return
+        if "etag" not in response.headers and "last-modified" not in response.headers:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def conditional_headers(self, response: httpx.Response) -> dict[str, str]:
+        headers = {}
+        if "etag" in response.headers:
+            headers["If-None-Match"] = response.headers["etag"]
+        if "last-modified" in response.headers:
+            headers["If-Modified-Since"] = response.headers["last-modified"]
+        return headers
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.revalidated = self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.revalidated + self.misses
+        return {
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_ratio": round(self.revalidated / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
 
 class BaseClient:
-    """Client de base pour gérer les appels HTTP et les erreurs."""
+    """
+    Client de base pour gérer les appels HTTP et les erreurs.
+    Le client httpx (pool de connexions) est ouvert au démarrage de l'application
+    et fermé à son arrêt (voir le lifespan de app/main.py).
+    """
 
     def __init__(self, base_url: str):
-        self.client = httpx.AsyncClient(base_url=base_url)
+        self.base_url = base_url
+        self._client: Optional[httpx.AsyncClient] = None
+        self.http_cache = HTTPResponseCache(max_entries=settings.MOVIE_API_HTTP_CACHE_MAX_ENTRIES)
+        self.latency = LatencyTracker()
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.retries = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=settings.MOVIE_API_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.MOVIE_API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.MOVIE_API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.MOVIE_API_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.MOVIE_API_TIMEOUT,
+                connect=settings.MOVIE_API_CONNECT_TIMEOUT,
+                pool=settings.MOVIE_API_POOL_TIMEOUT,
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Création à la demande (scripts, tests) si le lifespan ne l'a pas déjà fait
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def start(self) -> None:
+        """Ouvre le pool de connexions."""
+        _ = self.client
+
+    async def aclose(self) -> None:
+        """Ferme les connexions gardées ouvertes (keep-alive)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(
+                failure_threshold=settings.MOVIE_API_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.MOVIE_API_CIRCUIT_RESET_TIMEOUT,
+            )
+        return breaker
 
     async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
         """Effectue une requête et gère les exceptions communes."""
+        route = route_template(url)
+        started = time.perf_counter()
+        status = "error"
+        with tracer.start_as_current_span(f"Movie API {method} {route}", kind=SpanKind.CLIENT) as span:
+            span.set_attribute("http.request.method", method)
+            span.set_attribute("http.route", route)
+            # Propagation du contexte de trace (en-tête traceparent) vers l'API Movie
+            headers = dict(kwargs.pop("headers", None) or {})
+            inject(headers)
+            if headers:
+                kwargs["headers"] = headers
+            try:
+                response = await self._send(method, url, **kwargs)
+                status = str(response.status_code)
+                return response
+            except DALException as e:
+                status = str(getattr(e, "status_code", "error"))
+                span.set_status(Status(StatusCode.ERROR, e.message))
+                raise
+            finally:
+                span.set_attribute("http.response.status_code", status)
+                movie_api_request_duration.labels(method=method, route=route, status=status) \
+                    .observe(time.perf_counter() - started)
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        host = httpx.URL(self.base_url).join(url).host
+        breaker = self._breaker(host)
+        if not breaker.allow():
+            # Hôte jugé défaillant : on échoue tout de suite au lieu d'attendre un timeout
+            dal_exception = DALException(message=f"Circuit ouvert pour {host} : l'API Movie est indisponible")
+            dal_exception.status_code = 503
+            raise dal_exception
         try:
-            response = await self.client.request(method, url, **kwargs)
-            response.raise_for_status()
+            if method.upper() == "GET":
+                response = await self._get_with_retries(url, **kwargs)
+            else:
+                response = await self.client.request(method, url, **kwargs)
+                response.raise_for_status()
+            breaker.record_success()
             return response
         except httpx.HTTPStatusError as e:
-            # Erreur HTTP (4xx, 5xx)
+            # Erreur HTTP (4xx, 5xx) : seules les erreurs serveur comptent contre le circuit
+            if e.response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
             dal_exception = DALException(
                 message=f"Erreur API: {e.response.status_code} pour {e.request.url}. Réponse: {e.response.text}",
                 original_exception=e
@@ -24,10 +200,98 @@ class BaseClient:
             raise dal_exception from e
         except httpx.RequestError as e:
             # Erreur réseau (timeout, connexion impossible...)
+            breaker.record_failure()
             raise DALException(
                 message=f"Erreur réseau pour {e.request.url}",
                 original_exception=e
             ) from e
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
 
-api_client = BaseClient(base_url=settings.MOVIE_API_BASE_URL)
+    async def _get_with_retries(self, url: str, **kwargs) -> httpx.Response:
+        """GET (idempotent) relancé sur erreur réseau ou 502/503/504, avec backoff et gigue."""
+        max_retries = settings.MOVIE_API_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            try:
+                return await self._hedged_get(url, **kwargs)
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                retryable = isinstance(e, httpx.RequestError) or e.response.status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt == max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(
+                    attempt, settings.MOVIE_API_RETRY_BACKOFF_BASE, settings.MOVIE_API_RETRY_BACKOFF_MAX
+                ))
 
+    async def _hedged_get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        Requête couverte (hedged request) : si la réponse tarde au-delà du p95 observé,
+        une seconde requête identique est envoyée et la première réponse valide l'emporte.
+        """
+        delay = self.latency.percentile(95) if settings.MOVIE_API_HEDGE_ENABLED else None
+        if delay is None:
+            return await self._timed_get(url, **kwargs)
+
+        primary = asyncio.create_task(self._timed_get(url, **kwargs))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(delay, settings.MOVIE_API_HEDGE_MIN_DELAY))
+            if not done:
+                self.hedged += 1
+                tasks.add(asyncio.create_task(self._timed_get(url, **kwargs)))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _timed_get(self, url: str, **kwargs) -> httpx.Response:
+        started = time.monotonic()
+        if self.http_cache.max_entries:
+            response = await self._conditional_get(url, **kwargs)
+        else:
+            response = await self.client.request("GET", url, **kwargs)
+            response.raise_for_status()
+        self.latency.record(time.monotonic() - started)
+        return response
+
+    def stats(self) -> dict[str, Any]:
+        p95 = self.latency.percentile(95)
+        return {
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "p95_ms": round(1000 * p95, 1) if p95 is not None else None,
+            "circuits": {host: breaker.stats() for host, breaker in self.breakers.items()},
+            "http_cache": self.http_cache.stats(),
+        }
+
+    async def _conditional_get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET avec revalidation : si une réponse est en cache, on envoie ses validateurs
+        (If-None-Match / If-Modified-Since) et, sur un 304, on renvoie la réponse déjà connue.
+        """
+        request = self.client.build_request("GET", url, **kwargs)
+        key = str(request.url)
+        cached = self.http_cache.get(key)
+        if cached is not None:
+            request.headers.update(self.http_cache.conditional_headers(cached))
+        response = await self.client.send(request)
+        if cached is not None and response.status_code == httpx.codes.NOT_MODIFIED:
+            self.http_cache.revalidated += 1
+            return cached
+        self.http_cache.misses += 1
+        response.raise_for_status()
+        self.http_cache.set(key, response)
+        return response
+
+api_client = BaseClient(base_url=settings.MOVIE_API_BASE_URL)
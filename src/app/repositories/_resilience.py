@@ -0,0 +1,88 @@
+import random
+import time
+from collections import deque
+from typing import Any, Optional
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Délai avant la tentative suivante : backoff exponentiel avec gigue complète (full jitter)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Fenêtre glissante des dernières durées de réponse, pour estimer leurs percentiles."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, duration: float) -> None:
+        self._samples.append(duration)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentile `q` (0-100) des durées, ou None tant que l'échantillon est trop petit."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un hôte amont :
+    - fermé : les appels passent, les échecs consécutifs sont comptés ;
+    - ouvert : après `failure_threshold` échecs, les appels échouent immédiatement ;
+    - semi-ouvert : après `reset_timeout` secondes, un seul appel d'essai est autorisé,
+      qui referme le circuit s'il réussit et le rouvre sinon.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.failure_threshold and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def abandon(self) -> None:
+        """L'appel autorisé a été annulé sans résultat : un autre appel d'essai pourra passer."""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+        }
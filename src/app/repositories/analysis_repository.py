@@ -0,0 +1,151 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+
+class AnalysisRepository:
+    """
+    Stockage local (SQLite) des analyses précalculées par le traitement par lot (app/enrich.py).
+    Le resolver GraphQL y lit directement les analyses disponibles, sans appeler le LLM.
+    Une analyse plus ancienne que `max_age` secondes (0 : pas de limite) n'est plus servie :
+    elle est recalculée à la demande, le temps que le prochain traitement par lot la remplace.
+    Désactivé si aucun chemin n'est configuré.
+    """
+
+    def __init__(self, path: str, max_age: float = 0):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS movie_analysis ("
+                "movie_id TEXT PRIMARY KEY, ai_summary TEXT, ai_opinion_summary TEXT, "
+                "ai_best_genre TEXT, ai_tags TEXT, computed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint (name TEXT PRIMARY KEY, next_skip INTEGER NOT NULL)"
+            )
+            # Films en échec lors d'un parcours, à retenter à la reprise
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS failed_movie (name TEXT NOT NULL, movie_id TEXT NOT NULL, "
+                "PRIMARY KEY (name, movie_id))"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _get(self, movie_id: str) -> Optional[dict]:
+        # Au-delà de max_age, les avis du film ont pu changer : l'analyse stockée est ignorée
+        computed_after = time.time() - self.max_age if self.max_age else 0
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT ai_summary, ai_opinion_summary, ai_best_genre, ai_tags FROM movie_analysis "
+                "WHERE movie_id = ? AND computed_at >= ?",
+                (movie_id, computed_after),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": movie_id,
+            "aiSummary": row[0],
+            "aiOpinionSummary": row[1],
+            "aiBestGenre": row[2],
+            "aiTags": json.loads(row[3]) if row[3] is not None else None,
+        }
+
+    def _save(self, analysis: dict) -> None:
+        tags = analysis.get("aiTags")
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO movie_analysis "
+                "(movie_id, ai_summary, ai_opinion_summary, ai_best_genre, ai_tags, computed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    str(analysis["id"]),
+                    analysis.get("aiSummary"),
+                    analysis.get("aiOpinionSummary"),
+                    analysis.get("aiBestGenre"),
+                    json.dumps(tags, ensure_ascii=False) if tags is not None else None,
+                    time.time(),
+                ),
+            )
+            connection.commit()
+
+    def _get_checkpoint(self, name: str) -> int:
+        with self._lock:
+            row = self._connect().execute("SELECT next_skip FROM checkpoint WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_checkpoint(self, name: str, next_skip: int) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("INSERT OR REPLACE INTO checkpoint (name, next_skip) VALUES (?, ?)", (name, next_skip))
+            connection.commit()
+
+    def _get_failed(self, name: str) -> list[str]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT movie_id FROM failed_movie WHERE name = ? ORDER BY movie_id", (name,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _set_failed(self, name: str, failed_ids: list[str], succeeded_ids: list[str]) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                "INSERT OR IGNORE INTO failed_movie (name, movie_id) VALUES (?, ?)",
+                [(name, movie_id) for movie_id in failed_ids],
+            )
+            connection.executemany(
+                "DELETE FROM failed_movie WHERE name = ? AND movie_id = ?",
+                [(name, movie_id) for movie_id in succeeded_ids],
+            )
+            connection.commit()
+
+    def _clear_failed(self, name: str) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM failed_movie WHERE name = ?", (name,))
+            connection.commit()
+
+    async def get(self, movie_id: int | str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._get, str(movie_id))
+
+    async def save(self, analysis: dict) -> None:
+        await asyncio.to_thread(self._save, analysis)
+
+    async def get_checkpoint(self, name: str) -> int:
+        return await asyncio.to_thread(self._get_checkpoint, name)
+
+    async def set_checkpoint(self, name: str, next_skip: int) -> None:
+        await asyncio.to_thread(self._set_checkpoint, name, next_skip)
+
+    async def get_failed(self, name: str) -> list[str]:
+        return await asyncio.to_thread(self._get_failed, name)
+
+    async def set_failed(self, name: str, failed_ids: list[str], succeeded_ids: list[str] = ()) -> None:
+        """Ajoute les films en échec et retire ceux analysés depuis avec succès."""
+        await asyncio.to_thread(self._set_failed, name, list(failed_ids), list(succeeded_ids))
+
+    async def clear_failed(self, name: str) -> None:
+        await asyncio.to_thread(self._clear_failed, name)
+
+
+analysis_repository = AnalysisRepository(path=settings.ANALYSIS_STORE_PATH, max_age=settings.ANALYSIS_STORE_MAX_AGE)
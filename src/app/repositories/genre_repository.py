@@ -1,13 +1,96 @@
-from typing import List
+import asyncio
+import logging
+import time
+from typing import List, Optional
 
+from app.core.config import settings
 from app.models.genre import Genre
 from app.repositories._base_client import api_client
 
+logger = logging.getLogger(__name__)
+
 
 class GenreRepository:
-    async def list(self) -> List[Genre]:
+    """
+    Le catalogue des genres change très rarement : le repository en garde une copie en mémoire,
+    chargée au démarrage de l'application puis rafraîchie périodiquement en tâche de fond.
+    Une copie périmée reste servie pendant sa revalidation (stale-while-revalidate).
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[List[Genre]] = None
+        self._loaded_at = 0.0
+        self._revalidation: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def fetch(self) -> List[Genre]:
+        """Interroge directement l'API Movie, sans passer par la copie en mémoire."""
         response = await api_client._request("GET", "/genres/")
         return [Genre.model_validate(g) for g in response.json()]
 
+    async def list(self) -> List[Genre]:
+        if not self.refresh_interval:
+            return await self.fetch()
+        if self._snapshot is None:
+            return await self.refresh()
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            self._revalidate_in_background()
+        return self._snapshot
+
+    async def refresh(self) -> List[Genre]:
+        """Recharge la copie en mémoire (les appels concurrents partagent le même chargement)."""
+        if self._revalidation is None or self._revalidation.done():
+            self._revalidation = asyncio.create_task(self._load())
+        return await asyncio.shield(self._revalidation)
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._revalidation = None
+
+    async def _load(self) -> List[Genre]:
+        genres = await self.fetch()
+        self._snapshot = genres
+        self._loaded_at = time.monotonic()
+        return genres
+
+    def _revalidate_in_background(self) -> None:
+        if self._revalidation is not None and not self._revalidation.done():
+            return
+        self._revalidation = asyncio.create_task(self._load())
+        self._revalidation.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Rafraîchissement des genres impossible : %s", task.exception())
+
+    async def start_background_refresh(self) -> None:
+        """Charge le catalogue au démarrage puis le rafraîchit à intervalle régulier."""
+        if not self.refresh_interval or self._refresher is not None:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            # L'API Movie peut être indisponible au démarrage : le chargement se fera à la première requête
+            logger.warning("Chargement initial des genres impossible : %s", e)
+        self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def stop_background_refresh(self) -> None:
+        for task in (self._refresher, self._revalidation):
+            if task is not None and not task.done():
+                task.cancel()
+        self._refresher = None
+        self._revalidation = None
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Rafraîchissement des genres impossible : %s", e)
+
 
-genre_repository = GenreRepository()
\ No newline at end of file
+genre_repository = GenreRepository(refresh_interval=settings.GENRE_CACHE_REFRESH_INTERVAL)
@@ -1,22 +1,59 @@
-from typing import List, Optional
+import asyncio
+from typing import Dict, List, Optional, Sequence
 import httpx
+from app.core.config import settings
 from app.core.exceptions import DALException
 from app.models.movie import Movie
-from app.repositories._base_client import api_client
+from app.repositories._base_client import api_client, parse_response
+
+
+def _parse_movies(payload: list) -> List[Movie]:
+    return [Movie.model_validate(m) for m in payload]
 
 
 class MovieRepository:
 
     async def list(self, skip: int = 0, limit: int = 100) -> List[Movie]:
         response = await api_client._request("GET", "/movies/", params={"skip": skip, "limit": limit})
-        return [Movie.model_validate(m) for m in response.json()]
+        return parse_response(response, _parse_movies)
 
     async def find_by_id(self, movie_id: int) -> Optional[Movie]:
         try:
             response = await api_client._request("GET", f"/movies/{movie_id}")
-            return Movie.model_validate(response.json())
+            return parse_response(response, Movie.model_validate)
         except DALException as e:
             if e.status_code == 404:
                 return None
             raise
-movie_repository = MovieRepository()
\ No newline at end of file
+
+    async def find_by_ids(self, movie_ids: Sequence[int | str]) -> List[Movie | BaseException | None]:
+        """
+        Récupère plusieurs films en limitant le nombre d'appels à l'API.
+        L'API n'exposant pas d'endpoint de récupération par lot, on parcourt `list`
+        lorsque le lot est assez grand, puis on complète film par film.
+        Le résultat respecte l'ordre de `movie_ids` : le film, None s'il est introuvable,
+        ou l'exception de son chargement (l'échec d'un film n'empêche pas de renvoyer les autres).
+        """
+        wanted = list(dict.fromkeys(str(movie_id) for movie_id in movie_ids))
+        found: Dict[str, Movie | BaseException] = {}
+
+        threshold = settings.MOVIE_BULK_LIST_THRESHOLD
+        if threshold and len(wanted) >= threshold:
+            page_size = 100
+            for page in range(settings.MOVIE_BULK_LIST_MAX_PAGES):
+                movies = await self.list(skip=page * page_size, limit=page_size)
+                for movie in movies:
+                    if str(movie.id) in wanted:
+                        found[str(movie.id)] = movie
+                if len(found) == len(wanted) or len(movies) < page_size:
+                    break
+
+        missing = [movie_id for movie_id in wanted if movie_id not in found]
+        if missing:
+            movies = await asyncio.gather(*(self.find_by_id(movie_id) for movie_id in missing), return_exceptions=True)
+            found.update({movie_id: movie for movie_id, movie in zip(missing, movies) if movie})
+
+        return [found.get(str(movie_id)) for movie_id in movie_ids]
+
+
+movie_repository = MovieRepository()
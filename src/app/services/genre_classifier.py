@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import re
+import unicodedata
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.llm import embedding_model, llm_gateway
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_label(text: str) -> str:
+    """Forme comparable d'un libellé : sans accents, ponctuation ni casse."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def match_genre_label(text: str, genres: Iterable) -> Optional[str]:
+    """
+    Ramène la réponse libre du LLM à un libellé de genre existant :
+    correspondance exacte, puis sans accents ni casse, puis libellé cité dans la réponse
+    (le plus long en cas de libellés imbriqués). None si aucun genre ne correspond.
+    """
+    labels = [genre.label for genre in genres]
+    text = text.strip()
+    if text in labels:
+        return text
+    answer = _normalize_label(text)
+    by_form = {_normalize_label(label): label for label in labels}
+    if answer in by_form:
+        return by_form[answer]
+    cited = [form for form in by_form if form and re.search(rf"\b{re.escape(form)}\b", answer)]
+    return by_form[max(cited, key=len)] if cited else None
+
+
+class GenreClassifier:
+    """
+    Choix du genre par similarité d'embeddings, avant tout appel génératif au LLM :
+    le synopsis et les libellés de genre (vecteurs gardés en mémoire par libellé) sont comparés
+    par produit scalaire de vecteurs normalisés (similarité cosinus).
+    Le résultat n'est retenu que si l'écart entre les deux meilleurs genres atteint `min_margin`.
+    Les vecteurs des synopsis sont gardés en mémoire (LRU de `max_queries`, clé : empreinte du
+    synopsis) ; les appels au serveur d'embeddings prennent une place de la passerelle LLM
+    (`gateway`), qui sert aussi le modèle de chat.
+    """
+
+    def __init__(self, embeddings, min_margin: float, gateway=None, max_queries: int = 4096):
+        self.embeddings = embeddings
+        self.min_margin = min_margin
+        self.gateway = gateway
+        self.max_queries = max_queries
+        self._query_vectors: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._label_vectors: dict[str, np.ndarray] = {}
+        self._matrix: Tuple[Tuple[str, ...], Optional[np.ndarray]] = ((), None)
+        self.confident = 0
+        self.ambiguous = 0
+
+    @staticmethod
+    def _unit(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    async def _embed(self, function, argument):
+        """Appel au serveur d'embeddings, borné par la passerelle LLM lorsqu'elle est fournie."""
+        if self.gateway is None:
+            return await function(argument)
+        async with self.gateway.slot():
+            return await function(argument)
+
+    async def _query_vector(self, synopsis: str) -> np.ndarray:
+        key = hashlib.sha256(synopsis.encode("utf-8")).hexdigest()
+        vector = self._query_vectors.get(key)
+        if vector is None:
+            vector = self._unit(await self._embed(self.embeddings.aembed_query, synopsis))
+            self._query_vectors[key] = vector
+            while len(self._query_vectors) > self.max_queries:
+                self._query_vectors.popitem(last=False)
+        self._query_vectors.move_to_end(key)
+        return vector
+
+    async def _genre_matrix(self, labels: Tuple[str, ...]) -> np.ndarray:
+        if self._matrix[0] == labels:
+            return self._matrix[1]
+        missing = [label for label in labels if label not in self._label_vectors]
+        if missing:
+            vectors = await self._embed(self.embeddings.aembed_documents,
+                                        [f"Film de genre : {label}" for label in missing])
+            for label, vector in zip(missing, self._unit(vectors)):
+                self._label_vectors[label] = vector
+        matrix = np.stack([self._label_vectors[label] for label in labels])
+        self._matrix = (labels, matrix)
+        return matrix
+
+    async def classify(self, synopsis: str, genres: Iterable) -> Tuple[Optional[str], bool]:
+        """Retourne (genre le plus proche, True si l'écart avec le suivant est suffisant)."""
+        labels: List[str] = list(dict.fromkeys(genre.label for genre in genres))
+        if not labels:
+            return None, False
+        matrix = await self._genre_matrix(tuple(labels))
+        query = await self._query_vector(synopsis)
+        scores = matrix @ query
+        order = np.argsort(scores)[::-1]
+        best = labels[order[0]]
+        margin = float(scores[order[0]] - scores[order[1]]) if len(labels) > 1 else 1.0
+        confident = margin >= self.min_margin
+        if confident:
+            self.confident += 1
+        else:
+            self.ambiguous += 1
+        logger.debug("Genre le plus proche : %s (écart %.3f)", best, margin)
+        return best, confident
+
+    def clear(self) -> None:
+        self._query_vectors.clear()
+        self._label_vectors.clear()
+        self._matrix = ((), None)
+
+    def stats(self) -> dict:
+        decided = self.confident + self.ambiguous
+        return {
+            "confident": self.confident,
+            "ambiguous": self.ambiguous,
+            "fast_path_ratio": round(self.confident / decided, 4) if decided else 0.0,
+            "cached_genres": len(self._label_vectors),
+            "cached_synopses": len(self._query_vectors),
+        }
+
+
+# Désactivé (None) si aucun modèle d'embeddings n'est configuré : le LLM choisit seul le genre
+genre_classifier = GenreClassifier(
+    embedding_model,
+    min_margin=settings.GENRE_CLASSIFIER_MIN_MARGIN,
+    gateway=llm_gateway,
+    max_queries=settings.GENRE_CLASSIFIER_MAX_CACHED_SYNOPSES,
+) if embedding_model is not None else None
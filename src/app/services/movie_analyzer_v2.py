@@ -1,85 +1,310 @@
 import asyncio
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
 import strawberry
 from langchain_core.language_models import BaseChatModel
-from app.core.exceptions import NotFoundBLLException
+from pydantic import BaseModel, ValidationError
+from app.core.config import settings
+from app.core.metrics import observe_llm_task
+from app.core.single_flight import SingleFlight
+from app.core.tracing import traced
+from opentelemetry import trace
+from app.core.exceptions import (
+    BaseAppException,
+    LLMTimeoutBLLException,
+    LLMUnavailableBLLException,
+    NotFoundBLLException,
+)
+from app.repositories.analysis_repository import analysis_repository
 from app.repositories.movie_repository import movie_repository
 from app.repositories.genre_repository import genre_repository
+from app.services import prompts
+from app.services.genre_classifier import genre_classifier, match_genre_label
+from app.services.opinion_summary_store import (
+    opinion_fingerprint,
+    opinion_fingerprints,
+    opinion_summary_store,
+)
 
+logger = logging.getLogger(__name__)
+
+# Modes d'exécution des appels au LLM
+ANALYSIS_MODE_PARALLEL = "parallel"  # un prompt par champ, exécutés en parallèle
+ANALYSIS_MODE_COMBINED = "combined"  # un seul prompt pour tous les champs, réponse JSON
+
+@observe_llm_task("get_ai_summary")
 async def get_ai_summary(llm, synopsis):
     if not synopsis:
         return None
-    prompt = f"""
-        Français uniquement.
-        Fais un résumé très court (une à deux phrases maximum) du synopsis suivant.
-        Ne retourne que le résumé, sans aucune phrase d'introduction comme "Voici le résumé :".
+    prompt = prompts.summary_prompt(synopsis)
+    prompts.report_prompt("get_ai_summary", prompt)
+    response = await llm.ainvoke(prompt)
+    return response.content.strip()
 
-        Synopsis : {synopsis}
-        """
+async def _invoke_text(llm, task, prompt):
+    prompts.report_prompt(task, prompt)
     response = await llm.ainvoke(prompt)
     return response.content.strip()
 
+def _opinion_lines(title, opinions):
+    """Avis à envoyer en un seul prompt (map-reduce impossible : on se rabat sur l'échantillonnage par note)."""
+    strategy = settings.OPINION_FIT_STRATEGY
+    if strategy == prompts.OPINION_FIT_MAP_REDUCE:
+        strategy = prompts.OPINION_FIT_STRATIFIED
+    return prompts.select_opinions(opinions, prompts.opinion_summary_budget(title), strategy)
+
+async def _summarize_all(llm, task, prompts_to_send):
+    """
+    Envoie les prompts du map-reduce au plus OPINION_SUMMARY_MAX_PARALLEL_CHUNKS à la fois : un film
+    très commenté n'occupe pas à lui seul la file bornée de la passerelle LLM (rejets pour tous).
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.OPINION_SUMMARY_MAX_PARALLEL_CHUNKS))
+
+    async def summarize(prompt):
+        async with semaphore:
+            return await _invoke_text(llm, task, prompt)
+
+    return await asyncio.gather(*[summarize(prompt) for prompt in prompts_to_send])
+
+async def _map_reduce_opinions(llm, title, opinions, budget):
+    """
+    Résumé hiérarchique des avis trop nombreux pour un seul prompt :
+    - map : paquets de OPINION_SUMMARY_CHUNK_SIZE avis, résumés en parallèle (au plus
+      OPINION_SUMMARY_MAX_PARALLEL_CHUNKS à la fois). Les avis sont triés par ID : un nouvel avis
+      ne modifie que le dernier paquet, les autres prompts sont inchangés et servis par le cache
+      des réponses du LLM ;
+    - reduce : les résumés partiels sont fusionnés par groupes de OPINION_SUMMARY_REDUCE_FANOUT,
+      jusqu'à n'en garder qu'un.
+    """
+    ordered = sorted(opinions, key=lambda opinion: opinion.id)
+    size = max(1, settings.OPINION_SUMMARY_CHUNK_SIZE)
+    # Un paquet trop long pour le budget est redécoupé (de façon déterministe, d'après son seul contenu)
+    chunks = [
+        lines
+        for start in range(0, len(ordered), size)
+        for lines in prompts.chunk_opinions(ordered[start:start + size], budget)
+    ]
+    summaries = await _summarize_all(llm, "get_ai_opinion_summary.map", [
+        prompts.opinion_summary_prompt(title, chunk) for chunk in chunks
+    ])
+
+    fanout = max(2, settings.OPINION_SUMMARY_REDUCE_FANOUT)
+    while len(summaries) > fanout:
+        groups = [summaries[start:start + fanout] for start in range(0, len(summaries), fanout)]
+        reduced = await _summarize_all(llm, "get_ai_opinion_summary.reduce", [
+            prompts.opinion_summary_reduce_prompt(title, group) for group in groups if len(group) > 1
+        ])
+        # Seul le dernier groupe peut ne compter qu'un résumé : il passe tel quel au niveau suivant
+        summaries = list(reduced) + [group[0] for group in groups if len(group) == 1]
+    if len(summaries) == 1:
+        return summaries[0]
+    return await _invoke_text(llm, "get_ai_opinion_summary.reduce", prompts.opinion_summary_reduce_prompt(title, summaries))
+
+async def _summarize_opinions(llm, title, opinions):
+    """Résumé complet des avis, en respectant le budget de jetons du prompt."""
+    budget = prompts.opinion_summary_budget(title)
+    lines = [prompts.format_opinion(opinion) for opinion in opinions]
+    if settings.OPINION_FIT_STRATEGY == prompts.OPINION_FIT_MAP_REDUCE and not prompts.opinions_fit(lines, budget):
+        return await _map_reduce_opinions(llm, title, opinions, budget)
+    return await _invoke_text(llm, "get_ai_opinion_summary", prompts.opinion_summary_prompt(title, _opinion_lines(title, opinions)))
+
+@observe_llm_task("get_ai_opinion_summary")
 async def get_ai_opinion_summary(llm, title, opinions):
     if not opinions:
         return None
-    opinions_text = "\n".join([f"ID Opinion = {opinion.id}; Note : {opinion.note}/5; Commentaire : {opinion.comment}" for opinion in opinions])
-    prompt = f"""
-        Français uniquement.
-        Fais un résumé très court (une à deux phrases maximum) des opinions suivantes. Les opinions portent sur un même et unique film, dont le titre est : {title}. 
-        Ne fais pas une liste d'items. Ne fais pas un résumé de chaque opinion individuellement, mais un résumé global.
-        Ne retourne que le résumé, sans aucune phrase d'introduction comme "Voici le résumé :".
-        Opinions :
-        {opinions_text}
-    """
-    response = await llm.ainvoke(prompt)
-    return response.content.strip()
+    movie_id = opinions[0].movie_id
+    fingerprints = opinion_fingerprints(opinions)
 
-async def get_ai_best_genre(llm, synopsis, all_genres):
-    if not synopsis or not all_genres:
-        return None
+    # Mode incrémental : on repart du dernier résumé et on ne soumet que les nouveaux avis
+    previous = opinion_summary_store.get(movie_id)
+    if previous is not None:
+        summary, covered, base = previous
+        if covered == fingerprints:
+            return summary
+        # Part des avis que le dernier recalcul complet n'a pas vus : au-delà du seuil,
+        # les mises à jour successives risquent de trop s'éloigner d'un résumé complet
+        drift = len(fingerprints - base) / len(fingerprints)
+        # Avis retiré ou modifié (empreinte couverte absente) : il ne peut pas être retiré du résumé
+        if covered <= fingerprints and drift <= settings.OPINION_SUMMARY_MAX_DRIFT:
+            new_opinions = [opinion for opinion in opinions if opinion_fingerprint(opinion) not in covered]
+            # None : trop de nouveaux avis pour le budget du prompt, on recalcule tout
+            prompt = prompts.opinion_summary_update_prompt(title, summary, new_opinions)
+            if prompt is not None:
+                summary = await _invoke_text(llm, "get_ai_opinion_summary.update", prompt)
+                opinion_summary_store.set(movie_id, (summary, fingerprints, base))
+                return summary
+
+    summary = await _summarize_opinions(llm, title, opinions)
+    opinion_summary_store.set(movie_id, (summary, fingerprints, fingerprints))
+    return summary
 
-    # Préparation de la liste des genres pour le prompt
-    genres_list = ", ".join([genre.label for genre in all_genres])
+async def _stream_text(llm, prompt):
+    # Renvoie le texte accumulé à chaque nouveau fragment produit par le LLM
+    text = ""
+    async for chunk in llm.astream(prompt):
+        text += chunk.content
+        if text.strip():
+            yield text.strip()
 
-    # Prompt pour choisir le genre le plus pertinent
-    prompt = f"""
-        Français uniquement.
-        Choisis le genre le plus pertinent pour le film parmi la liste fournie.
-        Tu dois choisir EXCLUSIVEMENT un genre de la liste fournie.
-        Ne retourne QUE le nom du genre, sans aucune phrase d'introduction.
+async def stream_ai_summary(llm, synopsis):
+    """Variante de get_ai_summary qui produit le résumé au fil de sa génération."""
+    if not synopsis:
+        yield None
+        return
+    async for text in _stream_text(llm, prompts.summary_prompt(synopsis)):
+        yield text
 
-        Voici le synopsis :
-        {synopsis}
+async def stream_ai_opinion_summary(llm, title, opinions):
+    """Variante de get_ai_opinion_summary qui produit le résumé au fil de sa génération."""
+    if not opinions:
+        yield None
+        return
+    async for text in _stream_text(llm, prompts.opinion_summary_prompt(title, _opinion_lines(title, opinions))):
+        yield text
 
-        Voici la liste des genres autorisés :
-        {genres_list}
+@observe_llm_task("get_ai_best_genre")
+async def get_ai_best_genre(llm, synopsis, all_genres):
+    if not synopsis or not all_genres:
+        return None
+
+    # Voie rapide : similarité d'embeddings, le LLM ne tranche que les cas ambigus
+    closest = None
+    if genre_classifier is not None:
+        try:
+            closest, confident = await genre_classifier.classify(synopsis, all_genres)
+            if confident:
+                return closest
+        except Exception as error:
+            logger.warning("Classement du genre par embeddings indisponible : %r", error)
 
-        Genre le plus pertinent :
-        """
+    prompt = prompts.best_genre_prompt(synopsis, all_genres)
+    prompts.report_prompt("get_ai_best_genre", prompt)
 
     # Appel asynchrone au modèle de langage
     response = await llm.ainvoke(prompt)
-    return response.content.strip()
+    # La réponse libre est ramenée à un genre existant ; à défaut, le genre le plus proche par embeddings
+    return match_genre_label(response.content, all_genres) or closest
 
 
+@observe_llm_task("get_ai_tags")
 async def get_ai_tags(llm, title, synopsis):
     if not title or not synopsis:
         return None
 
-    prompt = f"""
-        Français uniquement.
-        Génère 5 tags pertinents pour le film.
-        Retourne une liste de tags séparés par des virgules.
-        Ne retourne que les tags, sans aucune phrase d'introduction.
+    prompt = prompts.tags_prompt(title, synopsis)
+    prompts.report_prompt("get_ai_tags", prompt)
+    response = await llm.ainvoke(prompt)
+    tags = [tag.strip() for tag in response.content.split(',') if tag.strip()]
+    return tags
+
 
-        Titre du film : {title}
-        Synopsis : {synopsis}
+class _CombinedAnalysis(BaseModel):
+    """Réponse JSON attendue du LLM en mode "combined"."""
+    aiSummary: Optional[str] = None
+    aiOpinionSummary: Optional[str] = None
+    aiBestGenre: Optional[str] = None
+    aiTags: Optional[List[str]] = None
 
-        Génère 5 tags pertinents, séparés par des virgules :
-        """
+
+def _parse_json_object(text):
+    # Les modèles entourent parfois le JSON de texte ou de balises ```json
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("Aucun objet JSON dans la réponse du LLM")
+    return json.loads(text[start:end + 1])
+
+
+@observe_llm_task("get_ai_combined_analysis")
+async def get_ai_combined_analysis(llm, movie, all_genres, fields):
+    """
+    Demande tous les champs `fields` en un seul prompt (le synopsis n'est envoyé qu'une fois).
+    Retourne les champs obtenus et validés ; les champs absents du résultat
+    (réponse invalide, genre hors liste...) sont à recalculer individuellement.
+    """
+    # Mêmes règles que les fonctions individuelles : sans données, pas d'appel au LLM
+    available = {
+        "aiSummary": bool(movie.synopsis),
+        "aiOpinionSummary": bool(movie.opinions),
+        "aiBestGenre": bool(movie.synopsis and all_genres),
+        "aiTags": bool(movie.title and movie.synopsis),
+    }
+    result_map = {field: None for field in fields if not available[field]}
+    wanted = [field for field in fields if available[field]]
+    if not wanted:
+        return result_map
+
+    prompt = prompts.combined_prompt(movie, all_genres, wanted)
+    prompts.report_prompt("get_ai_combined_analysis", prompt)
 
     response = await llm.ainvoke(prompt)
-    tags = [tag.strip() for tag in response.content.split(',') if tag.strip()]
-    return tags
+    try:
+        analysis = _CombinedAnalysis.model_validate(_parse_json_object(response.content))
+    except (ValueError, ValidationError):
+        # Réponse inexploitable : tous les champs seront recalculés individuellement
+        return result_map
+
+    labels = {genre.label for genre in all_genres}
+    for field in wanted:
+        value = getattr(analysis, field)
+        if isinstance(value, str):
+            value = value.strip()
+        if field == "aiTags" and value:
+            value = [tag.strip() for tag in value if tag.strip()]
+        if not value or (field == "aiBestGenre" and value not in labels):
+            continue
+        result_map[field] = value
+    return result_map
+
+
+async def _load_movie(movie_id, movie_loader):
+    # Via le DataLoader de la requête GraphQL s'il est fourni, pour partager l'appel entre les alias.
+    # Le futur du DataLoader est partagé : shield évite qu'une annulation ici ne l'annule pour tous.
+    if movie_loader:
+        return await asyncio.shield(movie_loader.load(movie_id))
+    return await movie_repository.find_by_id(movie_id)
+
+
+async def _load_genres(genre_loader):
+    if genre_loader:
+        return await asyncio.shield(genre_loader.all())
+    return await genre_repository.list()
+
+
+async def _best_genre_when_ready(llm, synopsis, genres_task):
+    # Le choix du genre dépend aussi de la liste des genres : on attend son chargement
+    all_genres = await genres_task
+    return await get_ai_best_genre(llm, synopsis, all_genres)
+
+
+def _discard(task):
+    """Annule une tâche devenue inutile sans laisser d'exception non récupérée."""
+    if task.done():
+        if not task.cancelled():
+            task.exception()
+    else:
+        task.cancel()
+
+
+async def _fetch_inputs(movie_id, ai_best_genre, movie_loader, genre_loader):
+    """Charge le film et, si besoin, lance le chargement des genres en parallèle."""
+    # Le film et les genres sont indépendants : on lance les deux chargements en même temps
+    movie_task = asyncio.create_task(_load_movie(movie_id, movie_loader))
+    genres_task = asyncio.create_task(_load_genres(genre_loader)) if ai_best_genre else None
+
+    try:
+        movie_data = await movie_task
+        if not movie_data:
+            raise NotFoundBLLException(resource_name="Movie", resource_id=movie_id)
+    except BaseException:
+        if genres_task:
+            _discard(genres_task)
+        raise
+    return movie_data, genres_task
+
+
+# Analyses identiques en cours (même film, mêmes champs, même mode) : calculées une seule fois
+analysis_flights = SingleFlight()
 
 
 async def analyze_movie(
@@ -88,52 +313,277 @@ async def analyze_movie(
         ai_opinion_summary : bool,
         ai_best_genre : bool,
         ai_tags : bool,
-        llm: BaseChatModel
+        llm: BaseChatModel,
+        movie_loader=None,
+        genre_loader=None,
+        mode: Optional[str] = None,
+        use_precomputed: bool = True
+) -> dict:
+    """
+    Analyse un film. Les requêtes simultanées pour la même analyse (film populaire)
+    attendent le calcul déjà lancé au lieu de renvoyer les mêmes prompts au LLM.
+    """
+    key = (
+        str(movie_id), ai_summary, ai_opinion_summary, ai_best_genre, ai_tags,
+        mode or settings.LLM_ANALYSIS_MODE, use_precomputed, id(llm),
+    )
+    analysis = await analysis_flights.do(key, lambda: _analyze_movie(
+        movie_id, ai_summary, ai_opinion_summary, ai_best_genre, ai_tags, llm,
+        movie_loader=movie_loader, genre_loader=genre_loader, mode=mode, use_precomputed=use_precomputed,
+    ))
+    # Chaque appelant reçoit sa propre copie du résultat partagé
+    return {**analysis, 'errors': dict(analysis['errors'])}
+
+
+@traced("analyze_movie")
+async def _analyze_movie(
+        movie_id : str,
+        ai_summary: bool,
+        ai_opinion_summary : bool,
+        ai_best_genre : bool,
+        ai_tags : bool,
+        llm: BaseChatModel,
+        movie_loader=None,
+        genre_loader=None,
+        mode: Optional[str] = None,
+        use_precomputed: bool = True
 ) -> dict:
+    trace.get_current_span().set_attribute("movie.id", str(movie_id))
 
-    # Récupération des genres
-    all_genres = []
-    if ai_best_genre:
-        all_genres = await genre_repository.list()
+    # Analyse précalculée par le traitement par lot (app/enrich.py) : ni API Movie, ni LLM
+    if use_precomputed:
+        stored = await analysis_repository.get(movie_id)
+        if stored:
+            return {
+                'id': strawberry.ID(movie_id),
+                'aiSummary': stored["aiSummary"] if ai_summary else None,
+                'aiOpinionSummary': stored["aiOpinionSummary"] if ai_opinion_summary else None,
+                'aiBestGenre': stored["aiBestGenre"] if ai_best_genre else None,
+                'aiTags': stored["aiTags"] if ai_tags else None,
+                'errors': {}
+            }
+
+    # Budget de temps des appels au LLM pour cette analyse (None : pas de limite)
+    loop = asyncio.get_running_loop()
+    budget = settings.LLM_REQUEST_BUDGET
+    deadline = loop.time() + budget if budget else None
+
+    def remaining():
+        return max(0.0, deadline - loop.time()) if deadline is not None else None
 
-    # Récupération des données du film
-    movie_data = await movie_repository.find_by_id(movie_id)
-    if not movie_data:
-        raise NotFoundBLLException(resource_name="Movie", resource_id=movie_id)
+    movie_data, genres_task = await _fetch_inputs(movie_id, ai_best_genre, movie_loader, genre_loader)
 
-    # Tâches à effectuer
+    result_map = {}
+    errors = {}
+
+    # Mode "combined" : un seul appel au LLM pour tous les champs demandés (réponse JSON)
+    requested = [field for field, flag in (
+        ("aiSummary", ai_summary),
+        ("aiOpinionSummary", ai_opinion_summary),
+        ("aiBestGenre", ai_best_genre),
+        ("aiTags", ai_tags),
+    ) if flag]
+    if (mode or settings.LLM_ANALYSIS_MODE) == ANALYSIS_MODE_COMBINED and len(requested) > 1:
+        try:
+            all_genres = await genres_task if genres_task else []
+            # Au plus la moitié du budget : le reste sert à recalculer les champs un par un si besoin
+            timeout = remaining() / 2 if deadline is not None else None
+            result_map = await asyncio.wait_for(get_ai_combined_analysis(llm, movie_data, all_genres, requested), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Analyse combinée du film %s hors budget, calcul champ par champ.", movie_id)
+        except Exception as error:
+            # LLM saturé, genres indisponibles... : le calcul champ par champ isole l'échec
+            # sur les seuls champs concernés
+            logger.warning("Échec de l'analyse combinée du film %s, calcul champ par champ : %r", movie_id, error)
+
+    # Tâches à effectuer : chacune démarre dès que ses propres données sont prêtes
+    # (le résumé, les avis et les tags n'ont besoin que du film).
+    # En mode "combined", seuls les champs que la réponse JSON n'a pas fournis sont recalculés.
     tasks = {}
 
-    if ai_summary:
+    if ai_summary and "aiSummary" not in result_map:
         tasks["aiSummary"] = get_ai_summary(llm, movie_data.synopsis)
 
-    if ai_opinion_summary:
+    if ai_opinion_summary and "aiOpinionSummary" not in result_map:
         tasks["aiOpinionSummary"] = get_ai_opinion_summary(llm, movie_data.title, movie_data.opinions)
 
-    if ai_best_genre:
-        tasks["aiBestGenre"] = get_ai_best_genre(llm, movie_data.synopsis, all_genres)
+    if ai_best_genre and "aiBestGenre" not in result_map:
+        tasks["aiBestGenre"] = _best_genre_when_ready(llm, movie_data.synopsis, genres_task)
 
-    if ai_tags:
+    if ai_tags and "aiTags" not in result_map:
         tasks["aiTags"] = get_ai_tags(llm, movie_data.title, movie_data.synopsis)
 
     if tasks:
-        # On récupère les coroutines (les fonctions async prêtes à être lancées)
-        coroutines = tasks.values()
-        # On les exécute toutes en parallèle et on attend les résultats
-        results = await asyncio.gather(*coroutines)
-        # On associe les résultats aux clés que nous avons définies
-        result_map = dict(zip(tasks.keys(), results))
-    else:
-        result_map = {}  # Aucune tâche n'a été demandée
+        # Les appels s'exécutent en parallèle et partagent le budget restant.
+        # Un champ en échec ou hors délai n'empêche pas de renvoyer les autres.
+        running = {field: asyncio.create_task(coroutine) for field, coroutine in tasks.items()}
+        try:
+            _, pending = await asyncio.wait(running.values(), timeout=remaining())
+        except BaseException:
+            for task in running.values():
+                task.cancel()
+            raise
+        # Budget épuisé : on abandonne les appels encore en cours
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+        for field, task in running.items():
+            if task in pending:
+                errors[field] = LLMTimeoutBLLException(field_name=field, budget=budget)
+            elif task.exception() is not None:
+                error = task.exception()
+                logger.warning("Échec du calcul de %s pour le film %s : %r", field, movie_id, error)
+                errors[field] = error if isinstance(error, BaseAppException) \
+                    else LLMUnavailableBLLException(field_name=field)
+            else:
+                result_map[field] = task.result()
 
     output = {
         'id': strawberry.ID(movie_id),
         'aiSummary': result_map.get("aiSummary"),
         'aiOpinionSummary': result_map.get("aiOpinionSummary"),
         'aiBestGenre': result_map.get("aiBestGenre"),
-        'aiTags': result_map.get("aiTags")
+        'aiTags': result_map.get("aiTags"),
+        # Champs non calculés (valeur None ci-dessus) et l'erreur correspondante
+        'errors': errors
     }
 
-    print(output)
+    logger.debug(
+        "Analyse du film %s terminée", movie_id,
+        extra={"analysis": {field: value for field, value in output.items() if field != "errors"},
+               "failed_fields": list(errors)},
+    )
 
     return output
+
+
+
+async def analyze_movies(
+        movie_ids: List[str],
+        ai_summary: bool,
+        ai_opinion_summary : bool,
+        ai_best_genre : bool,
+        ai_tags : bool,
+        llm: BaseChatModel,
+        max_parallelism: int,
+        movie_loader=None,
+        genre_loader=None,
+        mode: Optional[str] = None,
+        use_precomputed: bool = True
+) -> List[Tuple[str, Optional[dict], Optional[Exception]]]:
+    """
+    Analyse un lot de films avec au plus `max_parallelism` analyses simultanées.
+    Chaque film produit (id, analyse, None) ou (id, None, erreur) : un film introuvable
+    ou en échec n'interrompt pas le reste du lot.
+    """
+    semaphore = asyncio.Semaphore(max_parallelism)
+
+    async def analyze_one(movie_id):
+        async with semaphore:
+            try:
+                analysis_data = await analyze_movie(
+                    movie_id=movie_id,
+                    ai_summary=ai_summary,
+                    ai_opinion_summary=ai_opinion_summary,
+                    ai_best_genre=ai_best_genre,
+                    ai_tags=ai_tags,
+                    llm=llm,
+                    movie_loader=movie_loader,
+                    genre_loader=genre_loader,
+                    mode=mode,
+                    use_precomputed=use_precomputed
+                )
+                return movie_id, analysis_data, None
+            except Exception as e:
+                return movie_id, None, e
+
+    return await asyncio.gather(*(analyze_one(movie_id) for movie_id in movie_ids))
+
+async def _single(coroutine):
+    yield await coroutine
+
+
+_DONE = object()
+
+
+async def analyze_movie_stream(
+        movie_id : str,
+        ai_summary: bool,
+        ai_opinion_summary : bool,
+        ai_best_genre : bool,
+        ai_tags : bool,
+        llm: BaseChatModel,
+        stream_tokens: bool = False,
+        movie_loader=None,
+        genre_loader=None
+) -> AsyncIterator[dict]:
+    """
+    Variante incrémentale de analyze_movie : produit une nouvelle version de l'analyse
+    dès qu'un champ est prêt, au lieu d'attendre le plus lent des appels au LLM.
+    Avec `stream_tokens`, les résumés sont en plus transmis au fil de leur génération.
+    """
+    movie_data, genres_task = await _fetch_inputs(movie_id, ai_best_genre, movie_loader, genre_loader)
+
+    # Sources de mises à jour : chaque champ produit une ou plusieurs valeurs successives
+    sources = {}
+
+    if ai_summary:
+        sources["aiSummary"] = stream_ai_summary(llm, movie_data.synopsis) if stream_tokens \
+            else _single(get_ai_summary(llm, movie_data.synopsis))
+
+    if ai_opinion_summary:
+        sources["aiOpinionSummary"] = stream_ai_opinion_summary(llm, movie_data.title, movie_data.opinions) if stream_tokens \
+            else _single(get_ai_opinion_summary(llm, movie_data.title, movie_data.opinions))
+
+    if ai_best_genre:
+        sources["aiBestGenre"] = _single(_best_genre_when_ready(llm, movie_data.synopsis, genres_task))
+
+    if ai_tags:
+        sources["aiTags"] = _single(get_ai_tags(llm, movie_data.title, movie_data.synopsis))
+
+    output = {
+        'id': strawberry.ID(movie_id),
+        'aiSummary': None,
+        'aiOpinionSummary': None,
+        'aiBestGenre': None,
+        'aiTags': None,
+        'errors': {}
+    }
+    # Première réponse immédiate : le film existe, les champs IA arrivent ensuite
+    yield {**output, 'errors': {}}
+
+    updates = asyncio.Queue()
+
+    async def produce(field, values):
+        try:
+            async for value in values:
+                updates.put_nowait((field, value))
+        except Exception as e:
+            updates.put_nowait((field, e))
+        finally:
+            updates.put_nowait((field, _DONE))
+
+    producers = [asyncio.create_task(produce(field, values)) for field, values in sources.items()]
+    remaining = len(producers)
+    try:
+        while remaining:
+            field, value = await updates.get()
+            if value is _DONE:
+                remaining -= 1
+                continue
+            if isinstance(value, Exception):
+                # Champ en échec : null avec une erreur GraphQL, les autres champs continuent d'arriver
+                logger.warning("Échec du calcul de %s pour le film %s : %r", field, movie_id, value)
+                output['errors'][field] = value if isinstance(value, BaseAppException) \
+                    else LLMUnavailableBLLException(field_name=field)
+                output[field] = None
+            else:
+                output[field] = value
+            yield {**output, 'errors': dict(output['errors'])}
+    finally:
+        # Le client peut se désabonner avant la fin : on arrête les appels en cours
+        for producer in producers:
+            producer.cancel()
+        if genres_task:
+            _discard(genres_task)
@@ -0,0 +1,52 @@
+import hashlib
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+# (résumé, empreintes des avis couverts, empreintes des avis couverts par le dernier recalcul complet)
+OpinionSummaryEntry = Tuple[str, FrozenSet[str], FrozenSet[str]]
+
+
+def opinion_fingerprint(opinion) -> str:
+    """Empreinte d'un avis (ID, note, commentaire) : un avis modifié compte comme un avis différent."""
+    return hashlib.sha256(f"{opinion.id}\x1f{opinion.note}\x1f{opinion.comment}".encode("utf-8")).hexdigest()
+
+
+def opinion_fingerprints(opinions: Iterable) -> FrozenSet[str]:
+    return frozenset(opinion_fingerprint(opinion) for opinion in opinions)
+
+
+class OpinionSummaryStore:
+    """
+    Dernier résumé des avis de chaque film (LRU en mémoire), avec les empreintes des avis qu'il couvre.
+    Permet de ne soumettre au LLM que les nouveaux avis pour mettre à jour le résumé ; un avis
+    modifié change d'empreinte, le résumé est alors recalculé.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, OpinionSummaryEntry] = OrderedDict()
+
+    def get(self, movie_id: int) -> Optional[OpinionSummaryEntry]:
+        entry = self._entries.get(movie_id)
+        if entry is not None:
+            self._entries.move_to_end(movie_id)
+        return entry
+
+    def set(self, movie_id: int, entry: OpinionSummaryEntry) -> None:
+        if not self.max_entries:
+            return
+        self._entries[movie_id] = entry
+        self._entries.move_to_end(movie_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+opinion_summary_store = OpinionSummaryStore(max_entries=settings.OPINION_SUMMARY_STORE_MAX_ENTRIES)
@@ -0,0 +1,297 @@
+import functools
+import logging
+import textwrap
+from string import Formatter
+from typing import Iterable, List, Optional
+
+from opentelemetry import trace
+
+from app.core.config import settings
+from app.core.metrics import llm_prompt_tokens
+
+logger = logging.getLogger(__name__)
+
+# Stratégies pour faire tenir les avis dans le budget de jetons du prompt
+OPINION_FIT_TRUNCATE = "truncate"      # les premiers avis, jusqu'à épuisement du budget
+OPINION_FIT_STRATIFIED = "stratified"  # échantillon respectant la répartition des notes
+OPINION_FIT_MAP_REDUCE = "map_reduce"  # résumé par paquets d'avis, puis résumé des résumés
+
+# Estimation grossière (un jeton ~ 4 caractères) lorsque le tokenizer n'est pas disponible
+_CHARS_PER_TOKEN = 4
+
+
+# Tokenizer chargé au démarrage (hors boucle d'événements) par load_tokenizer ; None : estimation approchée
+_tokenizer = None
+
+
+def load_tokenizer():
+    """
+    Charge le tokenizer tiktoken configuré. Appel bloquant (lecture voire téléchargement du fichier
+    d'encodage) : à exécuter dans un thread au démarrage, jamais pendant le traitement d'une requête.
+    """
+    global _tokenizer
+    _tokenizer = None
+    if not settings.LLM_TOKENIZER_ENCODING:
+        return None
+    try:
+        import tiktoken
+        _tokenizer = tiktoken.get_encoding(settings.LLM_TOKENIZER_ENCODING)
+    except Exception as error:
+        logger.warning("Tokenizer %s indisponible, estimation approchée des jetons : %r",
+                       settings.LLM_TOKENIZER_ENCODING, error)
+    return _tokenizer
+
+
+def _encoding():
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * _CHARS_PER_TOKEN].rstrip() + "…"
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]).rstrip() + "…"
+
+
+class PromptTemplate:
+    """
+    Gabarit de prompt analysé une seule fois au chargement du module :
+    le rendu ne fait plus que concaténer les parties fixes et les valeurs.
+    """
+
+    def __init__(self, text: str):
+        self._parts = [(literal, field) for literal, field, _, _ in Formatter().parse(textwrap.dedent(text).strip())]
+
+    @functools.cached_property
+    def base_tokens(self) -> int:
+        """Jetons des parties fixes : le reste du budget revient aux valeurs."""
+        return count_tokens("".join(literal for literal, _ in self._parts))
+
+    def render(self, **values) -> str:
+        return "".join(literal + (str(values[field]) if field else "") for literal, field in self._parts)
+
+
+SUMMARY = PromptTemplate("""
+    Français uniquement.
+    Fais un résumé très court (une à deux phrases maximum) du synopsis suivant.
+    Ne retourne que le résumé, sans aucune phrase d'introduction comme "Voici le résumé :".
+
+    Synopsis : {synopsis}
+    """)
+
+OPINION_SUMMARY = PromptTemplate("""
+    Français uniquement.
+    Fais un résumé très court (une à deux phrases maximum) des opinions suivantes. Les opinions portent sur un même et unique film, dont le titre est : {title}.
+    Ne fais pas une liste d'items. Ne fais pas un résumé de chaque opinion individuellement, mais un résumé global.
+    Ne retourne que le résumé, sans aucune phrase d'introduction comme "Voici le résumé :".
+    Opinions :
+    {opinions}
+    """)
+
+OPINION_SUMMARY_UPDATE = PromptTemplate("""
+    Français uniquement.
+    Voici le résumé actuel des opinions sur le film dont le titre est : {title}.
+    Résumé actuel : {summary}
+    Mets à jour ce résumé pour tenir compte des nouvelles opinions ci-dessous, sans perdre ce qu'il dit déjà.
+    Le résultat reste un résumé global très court (une à deux phrases maximum), pas une liste d'items.
+    Ne retourne que le résumé mis à jour, sans aucune phrase d'introduction comme "Voici le résumé :".
+    Nouvelles opinions :
+    {opinions}
+    """)
+
+OPINION_SUMMARY_REDUCE = PromptTemplate("""
+    Français uniquement.
+    Voici des résumés partiels des opinions sur le film dont le titre est : {title}. Chacun couvre une partie des opinions.
+    Fais-en un résumé global très court (une à deux phrases maximum), pas une liste d'items.
+    Ne retourne que le résumé, sans aucune phrase d'introduction comme "Voici le résumé :".
+    Résumés partiels :
+    {summaries}
+    """)
+
+BEST_GENRE = PromptTemplate("""
+    Français uniquement.
+    Choisis le genre le plus pertinent pour le film parmi la liste fournie.
+    Tu dois choisir EXCLUSIVEMENT un genre de la liste fournie.
+    Ne retourne QUE le nom du genre, sans aucune phrase d'introduction.
+
+    Voici le synopsis :
+    {synopsis}
+
+    Voici la liste des genres autorisés :
+    {genres}
+
+    Genre le plus pertinent :
+    """)
+
+TAGS = PromptTemplate("""
+    Français uniquement.
+    Génère 5 tags pertinents pour le film.
+    Retourne une liste de tags séparés par des virgules.
+    Ne retourne que les tags, sans aucune phrase d'introduction.
+
+    Titre du film : {title}
+    Synopsis : {synopsis}
+
+    Génère 5 tags pertinents, séparés par des virgules :
+    """)
+
+COMBINED = PromptTemplate("""
+    Français uniquement.
+    Analyse le film suivant et réponds UNIQUEMENT avec un objet JSON valide, sans aucun texte autour.
+    L'objet JSON contient exactement les clés suivantes :
+    {keys}
+
+    Titre du film : {title}
+    Synopsis : {synopsis}
+    Genres autorisés : {genres}
+    Opinions :
+    {opinions}
+    """)
+
+COMBINED_INSTRUCTIONS = {
+    "aiSummary": "un résumé très court (une à deux phrases maximum) du synopsis",
+    "aiOpinionSummary": "un résumé global très court (une à deux phrases maximum) des opinions, sans liste d'items",
+    "aiBestGenre": "le genre le plus pertinent, choisi EXCLUSIVEMENT dans la liste des genres autorisés",
+    "aiTags": "une liste JSON de 5 tags pertinents",
+}
+
+
+def _budget(template: PromptTemplate, *fixed: str) -> Optional[int]:
+    """Jetons disponibles pour la partie variable d'un prompt (None : pas de limite)."""
+    if not settings.LLM_PROMPT_MAX_TOKENS:
+        return None
+    return max(0, settings.LLM_PROMPT_MAX_TOKENS - template.base_tokens - sum(count_tokens(text) for text in fixed))
+
+
+def _fit(text: str, budget: Optional[int]) -> str:
+    return text if budget is None else truncate_to_tokens(text, budget)
+
+
+def format_opinion(opinion) -> str:
+    return f"ID Opinion = {opinion.id}; Note : {opinion.note}/5; Commentaire : {opinion.comment}"
+
+
+def _stratified_order(opinions: list) -> list:
+    """
+    Ordonne les avis pour qu'un préfixe quelconque respecte la répartition des notes
+    (échantillonnage systématique par note) ; l'ordre est déterministe, donc le prompt reste cacheable.
+    """
+    by_note: dict[int, list] = {}
+    for opinion in opinions:
+        by_note.setdefault(opinion.note, []).append(opinion)
+    return [opinion for _, _, opinion in sorted(
+        ((index + 0.5) / len(group), note, opinion)
+        for note, group in by_note.items()
+        for index, opinion in enumerate(group)
+    )]
+
+
+def select_opinions(opinions: Iterable, budget: Optional[int], strategy: str) -> List[str]:
+    """Lignes d'avis tenant dans `budget` jetons, choisies selon la stratégie."""
+    opinions = list(opinions)
+    lines = [format_opinion(opinion) for opinion in opinions]
+    if budget is None or opinions_fit(lines, budget):
+        return lines
+    if strategy == OPINION_FIT_STRATIFIED:
+        lines = [format_opinion(opinion) for opinion in _stratified_order(opinions)]
+    selected, used = [], 0
+    for line in lines:
+        # +1 : le saut de ligne entre deux avis
+        tokens = count_tokens(line) + 1
+        if used + tokens > budget:
+            break
+        selected.append(line)
+        used += tokens
+    # Un seul avis plus long que tout le budget : on le tronque plutôt que de ne rien envoyer
+    return selected or [truncate_to_tokens(lines[0], budget)]
+
+
+def opinions_fit(lines: List[str], budget: Optional[int]) -> bool:
+    return budget is None or sum(count_tokens(line) + 1 for line in lines) <= budget
+
+
+def chunk_opinions(opinions: Iterable, budget: int) -> List[List[str]]:
+    """Découpe les avis en paquets de lignes tenant chacun dans `budget` jetons."""
+    chunks, current, used = [], [], 0
+    for opinion in opinions:
+        line = truncate_to_tokens(format_opinion(opinion), budget - 1)
+        tokens = count_tokens(line) + 1
+        if current and used + tokens > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def summary_prompt(synopsis: str) -> str:
+    return SUMMARY.render(synopsis=_fit(synopsis, _budget(SUMMARY)))
+
+
+def opinion_summary_budget(title: str) -> Optional[int]:
+    return _budget(OPINION_SUMMARY, title)
+
+
+def opinion_summary_prompt(title: str, lines: List[str]) -> str:
+    return OPINION_SUMMARY.render(title=title, opinions="\n".join(lines))
+
+
+def opinion_summary_update_prompt(title: str, summary: str, opinions: Iterable) -> Optional[str]:
+    """Prompt de mise à jour d'un résumé ; None si les nouveaux avis ne tiennent pas dans le budget."""
+    lines = [format_opinion(opinion) for opinion in opinions]
+    if not opinions_fit(lines, _budget(OPINION_SUMMARY_UPDATE, title, summary)):
+        return None
+    return OPINION_SUMMARY_UPDATE.render(title=title, summary=summary, opinions="\n".join(lines))
+
+
+def opinion_summary_reduce_prompt(title: str, summaries: List[str]) -> str:
+    return OPINION_SUMMARY_REDUCE.render(
+        title=title, summaries=_fit("\n".join(summaries), _budget(OPINION_SUMMARY_REDUCE, title))
+    )
+
+
+def best_genre_prompt(synopsis: str, genres: Iterable) -> str:
+    genres_list = ", ".join(genre.label for genre in genres)
+    return BEST_GENRE.render(synopsis=_fit(synopsis, _budget(BEST_GENRE, genres_list)), genres=genres_list)
+
+
+def tags_prompt(title: str, synopsis: str) -> str:
+    return TAGS.render(title=title, synopsis=_fit(synopsis, _budget(TAGS, title)))
+
+
+def combined_prompt(movie, genres: Iterable, fields: List[str]) -> str:
+    keys = "\n".join(f'- "{field}" : {COMBINED_INSTRUCTIONS[field]} ;' for field in fields)
+    genres_list = ", ".join(genre.label for genre in genres) if "aiBestGenre" in fields else ""
+    budget = _budget(COMBINED, keys, movie.title, genres_list)
+    opinions = movie.opinions if "aiOpinionSummary" in fields else []
+    # Le synopsis et les avis se partagent le budget restant
+    synopsis = _fit(movie.synopsis, budget // 2 if budget is not None and opinions else budget)
+    if budget is not None:
+        budget -= count_tokens(synopsis)
+    # Un seul prompt : pas de map-reduce possible, on se rabat sur l'échantillonnage par note
+    strategy = OPINION_FIT_STRATIFIED if settings.OPINION_FIT_STRATEGY == OPINION_FIT_MAP_REDUCE \
+        else settings.OPINION_FIT_STRATEGY
+    lines = select_opinions(opinions, budget, strategy) if opinions else []
+    return COMBINED.render(keys=keys, title=movie.title, synopsis=synopsis, genres=genres_list, opinions="\n".join(lines))
+
+
+def report_prompt(task: str, prompt: str) -> int:
+    """Mesure la taille d'un prompt (jetons) : histogramme par tâche et événement sur le span courant."""
+    tokens = count_tokens(prompt)
+    llm_prompt_tokens.labels(task=task).observe(tokens)
+    trace.get_current_span().add_event("llm.prompt", {"llm.task": task, "llm.prompt_tokens": tokens})
+    logger.debug("Prompt %s : %d jetons", task, tokens)
+    return tokens
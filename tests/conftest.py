@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def reset_genre_catalogue():
+    """Le catalogue des genres est gardé en mémoire : on le vide entre deux tests."""
+    from app.repositories.genre_repository import genre_repository
+    genre_repository.invalidate()
+    yield
+    genre_repository.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_cost_quota():
+    """Les quotas de coût sont partagés par le processus : chaque test repart d'un quota plein."""
+    from app.graphql.extensions import cost_quota
+    cost_quota.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_opinion_summaries():
+    """Les derniers résumés des avis sont gardés en mémoire : chaque test repart sans historique."""
+    from app.services.opinion_summary_store import opinion_summary_store
+    opinion_summary_store.clear()
+    yield
@@ -0,0 +1,147 @@
+"""
+Tests de la requête par lot `analyzeMovies`
+
+Objectif :
+1. Vérifier que chaque film renvoie son analyse ou son erreur, sans faire échouer le lot.
+2. Vérifier que le parallélisme est borné et que les appels au LLM sont en priorité "lot".
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core.llm_gateway import LLMPriority, llm_priority
+from app.models.movie import Movie
+from app.models.genre import Genre
+from app.models.person import Person
+
+
+def make_movie(movie_id):
+    return Movie(
+        id=movie_id,
+        title=f"Film {movie_id}",
+        year=2010,
+        synopsis="Un voleur...",
+        genre=Genre(id=1, label="Drame"),
+        director=Person(id=1, last_name="Nolan"),
+        actors=[],
+        opinions=[]
+    )
+
+
+@pytest.fixture
+def mock_repositories(mocker):
+    async def find_by_ids(movie_ids):
+        return [None if movie_id == "404" else make_movie(int(movie_id)) for movie_id in movie_ids]
+
+    movie_repo = MagicMock()
+    movie_repo.find_by_ids = AsyncMock(side_effect=find_by_ids)
+    mocker.patch('app.graphql.dataloaders.movie_repository', movie_repo)
+    genre_repo = AsyncMock()
+    genre_repo.list.return_value = [Genre(id=1, label="Drame")]
+    mocker.patch('app.graphql.dataloaders.genre_repository', genre_repo)
+    return movie_repo, genre_repo
+
+
+@pytest.mark.asyncio
+async def test_analyze_movies_returns_partial_results(mock_repositories):
+    from app.main import schema
+    from app.graphql.dataloaders import create_genre_loader, create_movie_loader
+    movie_repo, genre_repo = mock_repositories
+
+    priorities = []
+    in_flight = 0
+    max_in_flight = 0
+
+    async def ainvoke(prompt):
+        nonlocal in_flight, max_in_flight
+        priorities.append(llm_priority.get())
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return MagicMock(content="Drame")
+
+    llm = MagicMock()
+    llm.ainvoke = ainvoke
+
+    result = await schema.execute(
+        """
+        query {
+          analyzeMovies(ids: ["1", "404", "2", "3", "4", "5", "6"]) {
+            movieId
+            analysis { id aiBestGenre }
+            error { code message }
+          }
+        }
+        """,
+        context_value={
+            "llm": llm,
+            "movie_loader": create_movie_loader(),
+            "genre_loader": create_genre_loader(),
+        },
+    )
+
+    assert result.errors is None
+    items = result.data["analyzeMovies"]
+    assert items[0] == {"movieId": "1", "analysis": {"id": "1", "aiBestGenre": "Drame"}, "error": None}
+    assert items[1]["analysis"] is None
+    assert items[1]["error"]["code"] == "NotFoundBLLException"
+    assert all(item["analysis"] for item in items[2:])
+
+    # Chaque film est chargé seul : un film lent ou en échec ne bloque pas les autres
+    assert movie_repo.find_by_ids.call_count == 7
+    genre_repo.list.assert_called_once()
+    assert set(priorities) == {LLMPriority.BATCH}
+    assert max_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_analyze_movies_rejects_oversized_batches(mocker):
+    from app.main import schema
+    mocker.patch('app.graphql.resolvers.analyze_movies.settings.ANALYZE_MOVIES_MAX_IDS', 2)
+
+    result = await schema.execute(
+        'query { analyzeMovies(ids: ["1", "2", "3"]) { movieId } }',
+        context_value={"llm": MagicMock()},
+    )
+
+    assert result.errors[0].extensions["code"] == "ValidationBLLException"
+
+
+@pytest.mark.asyncio
+async def test_failed_or_slow_movie_does_not_block_the_others(mocker):
+    from app.main import schema
+    from app.core.exceptions import DALException
+    from app.graphql.dataloaders import create_movie_loader
+    from app.repositories.movie_repository import movie_repository
+
+    async def find_by_id(movie_id):
+        if movie_id == "500":
+            raise DALException("Erreur de l'API Movie")
+        if movie_id == "2":
+            await asyncio.sleep(0.5)
+        return make_movie(int(movie_id))
+
+    mocker.patch.object(movie_repository, "find_by_id", AsyncMock(side_effect=find_by_id))
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    llm_calls = []
+
+    async def ainvoke(prompt):
+        llm_calls.append(loop.time() - started)
+        return MagicMock(content="Résumé")
+
+    llm = MagicMock()
+    llm.ainvoke = ainvoke
+
+    result = await schema.execute(
+        'query { analyzeMovies(ids: ["1", "500", "2"]) { movieId analysis { aiSummary } error { code } } }',
+        context_value={"llm": llm, "movie_loader": create_movie_loader()},
+    )
+
+    items = result.data["analyzeMovies"]
+    assert items[0] == {"movieId": "1", "analysis": {"aiSummary": "Résumé"}, "error": None}
+    assert items[1]["error"]["code"] == "DALException"
+    assert items[2]["analysis"] == {"aiSummary": "Résumé"}
+    # Le film 1 est analysé sans attendre le chargement du film 2
+    assert min(llm_calls) < 0.25 < max(llm_calls)
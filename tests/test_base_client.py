@@ -0,0 +1,108 @@
+"""
+Tests du client HTTP partagé vers l'API Movie (app/repositories/_base_client.py)
+
+Objectif :
+1. Vérifier que le pool et les délais configurés sont appliqués au client httpx.
+2. Vérifier l'ouverture et la fermeture du client (lifespan FastAPI).
+"""
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.repositories._base_client import BaseClient
+
+
+def test_client_uses_configured_pool_and_timeouts():
+    client = BaseClient(base_url="http://movie-api/api/v1").client
+
+    pool = client._transport._pool
+    assert pool._max_connections == settings.MOVIE_API_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == settings.MOVIE_API_MAX_KEEPALIVE_CONNECTIONS
+    assert pool._keepalive_expiry == settings.MOVIE_API_KEEPALIVE_EXPIRY
+    assert client.timeout.read == settings.MOVIE_API_TIMEOUT
+    assert client.timeout.connect == settings.MOVIE_API_CONNECT_TIMEOUT
+    assert client.timeout.pool == settings.MOVIE_API_POOL_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_start_and_aclose_manage_a_single_client():
+    base_client = BaseClient(base_url="http://movie-api/api/v1")
+
+    base_client.start()
+    client = base_client.client
+    assert base_client.client is client
+
+    await base_client.aclose()
+    assert client.is_closed
+    # Un appel après l'arrêt rouvre un nouveau pool plutôt que d'échouer
+    assert not base_client.client.is_closed
+    await base_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_request_reuses_pooled_client(mocker):
+    base_client = BaseClient(base_url="http://movie-api/api/v1")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"path": request.url.path}))
+    mocker.patch.object(
+        base_client, "_create_client",
+        return_value=httpx.AsyncClient(base_url=base_client.base_url, transport=transport),
+    )
+
+    first = await base_client._request("GET", "/movies/1")
+    second = await base_client._request("GET", "/movies/2")
+
+    assert first.json() == {"path": "/api/v1/movies/1"}
+    assert second.json() == {"path": "/api/v1/movies/2"}
+    base_client._create_client.assert_called_once()
+    await base_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_reuses_cached_response_and_parsed_movie(mocker):
+    from app.models.movie import Movie
+    from app.repositories._base_client import parse_response
+
+    payload = {
+        "id": 1, "title": "Inception", "year": 2010, "synopsis": "Un voleur...",
+        "genre": {"id": 1, "label": "Science-Fiction"},
+        "director": {"id": 1, "last_name": "Nolan", "first_name": "Christopher"},
+        "actors": [], "opinions": [],
+    }
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=payload, headers={"ETag": '"v1"'})
+
+    base_client = BaseClient(base_url="http://movie-api/api/v1")
+    mocker.patch.object(
+        base_client, "_create_client",
+        return_value=httpx.AsyncClient(base_url=base_client.base_url, transport=httpx.MockTransport(handler)),
+    )
+
+    first = await base_client._request("GET", "/movies/1")
+    second = await base_client._request("GET", "/movies/1")
+
+    assert seen_headers == [None, '"v1"']
+    assert second is first
+    assert parse_response(second, Movie.model_validate) is parse_response(first, Movie.model_validate)
+    assert base_client.http_cache.stats()["revalidated"] == 1
+    await base_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_responses_without_validators_are_not_cached(mocker):
+    base_client = BaseClient(base_url="http://movie-api/api/v1")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[]))
+    mocker.patch.object(
+        base_client, "_create_client",
+        return_value=httpx.AsyncClient(base_url=base_client.base_url, transport=transport),
+    )
+
+    await base_client._request("GET", "/genres/")
+
+    assert base_client.http_cache.stats()["entries"] == 0
+    await base_client.aclose()
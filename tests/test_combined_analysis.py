@@ -0,0 +1,132 @@
+"""
+Tests du mode d'analyse "combined" (un seul prompt, réponse JSON)
+
+Objectif :
+1. Vérifier qu'un seul appel au LLM suffit pour tous les champs demandés.
+2. Vérifier le repli sur les appels individuels si la réponse JSON est invalide
+   ou si un champ ne respecte pas les règles (genre hors liste).
+"""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.models.movie import Movie
+from app.models.genre import Genre
+from app.models.person import Person
+from app.models.opinion import Opinion
+from app.models.member import Member
+
+
+@pytest.fixture
+def mock_movie():
+    return Movie(
+        id=1,
+        title="Inception",
+        year=2010,
+        synopsis="Un voleur qui vole des secrets...",
+        genre=Genre(id=1, label="Science-Fiction"),
+        director=Person(id=1, last_name="Nolan", first_name="Christopher"),
+        actors=[],
+        opinions=[Opinion(id=1, note=5, comment="Génial!", movie_id=1, member=Member(id=1, login="user1"))]
+    )
+
+
+@pytest.fixture
+def mock_repositories(mocker, mock_movie):
+    movie_repo = AsyncMock()
+    movie_repo.find_by_id.return_value = mock_movie
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', movie_repo)
+    genre_repo = AsyncMock()
+    genre_repo.list.return_value = [Genre(id=1, label="Science-Fiction"), Genre(id=2, label="Drame")]
+    mocker.patch('app.services.movie_analyzer_v2.genre_repository', genre_repo)
+
+
+def llm_answering(content):
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content=content))
+    return llm
+
+
+async def analyze(llm):
+    from app.services.movie_analyzer_v2 import analyze_movie
+    return await analyze_movie(
+        movie_id="1",
+        ai_summary=True,
+        ai_opinion_summary=True,
+        ai_best_genre=True,
+        ai_tags=True,
+        llm=llm,
+        mode="combined"
+    )
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_uses_a_single_prompt(mock_repositories):
+    llm = llm_answering("```json\n" + json.dumps({
+        "aiSummary": "Un voleur de rêves.",
+        "aiOpinionSummary": "Le public adore.",
+        "aiBestGenre": "Science-Fiction",
+        "aiTags": ["rêve", "casse"],
+    }) + "\n```")
+
+    result = await analyze(llm)
+
+    llm.ainvoke.assert_called_once()
+    assert result["aiSummary"] == "Un voleur de rêves."
+    assert result["aiOpinionSummary"] == "Le public adore."
+    assert result["aiBestGenre"] == "Science-Fiction"
+    assert result["aiTags"] == ["rêve", "casse"]
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_falls_back_on_invalid_json(mocker, mock_repositories):
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', AsyncMock(return_value="Résumé IA"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_opinion_summary', AsyncMock(return_value="Opinion IA"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_best_genre', AsyncMock(return_value="Drame"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_tags', AsyncMock(return_value=["tag1"]))
+
+    result = await analyze(llm_answering("Désolé, je ne peux pas répondre en JSON."))
+
+    assert result["aiSummary"] == "Résumé IA"
+    assert result["aiOpinionSummary"] == "Opinion IA"
+    assert result["aiBestGenre"] == "Drame"
+    assert result["aiTags"] == ["tag1"]
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_recomputes_invalid_genre_only(mocker, mock_repositories):
+    mock_best_genre = AsyncMock(return_value="Drame")
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_best_genre', mock_best_genre)
+    mock_summary = AsyncMock()
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', mock_summary)
+    llm = llm_answering(json.dumps({
+        "aiSummary": "Un voleur de rêves.",
+        "aiOpinionSummary": "Le public adore.",
+        "aiBestGenre": "Western",
+        "aiTags": ["rêve"],
+    }))
+
+    result = await analyze(llm)
+
+    assert result["aiSummary"] == "Un voleur de rêves."
+    assert result["aiBestGenre"] == "Drame"
+    mock_best_genre.assert_called_once()
+    mock_summary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_combined_call_failure_degrades_field_by_field(mocker, mock_repositories):
+    from app.core.exceptions import LLMOverloadedBLLException
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_combined_analysis',
+                 AsyncMock(side_effect=LLMOverloadedBLLException(queue_size=100)))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', AsyncMock(return_value="Résumé IA"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_opinion_summary', AsyncMock(return_value="Opinion IA"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_best_genre',
+                 AsyncMock(side_effect=LLMOverloadedBLLException(queue_size=100)))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_tags', AsyncMock(return_value=["tag1"]))
+
+    result = await analyze(MagicMock())
+
+    assert result["aiSummary"] == "Résumé IA"
+    assert result["aiBestGenre"] is None
+    assert list(result["errors"]) == ["aiBestGenre"]
@@ -0,0 +1,105 @@
+"""
+Tests du regroupement des appels à l'API Movie (app/graphql/dataloaders.py)
+
+Objectif :
+1. Vérifier qu'un document GraphQL avec plusieurs alias `analyzeMovie`
+   ne déclenche qu'un seul appel à GET /genres/.
+2. Vérifier que les films sont chargés par lot (GET /movies/) lorsque le chargement groupé est activé.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def movie_payload(movie_id):
+    return {
+        "id": movie_id,
+        "title": f"Film {movie_id}",
+        "year": 2010,
+        "synopsis": "Un voleur...",
+        "genre": {"id": 1, "label": "Science-Fiction"},
+        "director": {"id": 1, "last_name": "Nolan", "first_name": "Christopher"},
+        "actors": [],
+        "opinions": []
+    }
+
+
+@pytest.fixture
+def mock_api_client(mocker):
+    """Simule l'API Movie : 20 films et 2 genres."""
+    async def request(method, url, **kwargs):
+        response = MagicMock()
+        if url == "/genres/":
+            response.json.return_value = [{"id": 1, "label": "Science-Fiction"}, {"id": 2, "label": "Drame"}]
+        elif url == "/movies/":
+            response.json.return_value = [movie_payload(i) for i in range(1, 21)]
+        else:
+            response.json.return_value = movie_payload(int(url.rsplit("/", 1)[-1]))
+        return response
+
+    client = AsyncMock()
+    client._request.side_effect = request
+    mocker.patch('app.repositories.movie_repository.api_client', client)
+    mocker.patch('app.repositories.genre_repository.api_client', client)
+    return client
+
+
+@pytest.fixture
+def mock_llm():
+    llm = MagicMock()
+    mock_response = MagicMock()
+    mock_response.content = "Drame"
+    llm.ainvoke = AsyncMock(return_value=mock_response)
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_aliased_query_batches_upstream_calls(mocker, mock_api_client, mock_llm):
+    from app.main import schema
+    from app.core.config import settings
+    mocker.patch.object(settings, "MOVIE_BULK_LIST_THRESHOLD", 5)
+    from app.graphql.dataloaders import create_genre_loader, create_movie_loader
+
+    aliases = "\n".join(f'm{i}: analyzeMovie(movieId: "{i}") {{ id aiBestGenre }}' for i in range(1, 21))
+    result = await schema.execute(
+        f"query {{ {aliases} }}",
+        context_value={
+            "llm": mock_llm,
+            "movie_loader": create_movie_loader(),
+            "genre_loader": create_genre_loader(),
+        },
+    )
+
+    assert result.errors is None
+    assert result.data["m20"] == {"id": "20", "aiBestGenre": "Drame"}
+    called_urls = [call.args[1] for call in mock_api_client._request.call_args_list]
+    assert sorted(called_urls) == ["/genres/", "/movies/"]
+
+
+@pytest.mark.asyncio
+async def test_find_by_ids_keeps_order_and_missing_movies(mocker):
+    from app.repositories.movie_repository import movie_repository
+
+    mocker.patch.object(movie_repository, "list", AsyncMock(return_value=[]))
+    find_by_id = AsyncMock(side_effect=lambda movie_id: None if movie_id == "404" else MagicMock(id=int(movie_id)))
+    mocker.patch.object(movie_repository, "find_by_id", find_by_id)
+
+    movies = await movie_repository.find_by_ids(["2", "404", "1"])
+
+    assert movies[0].id == 2
+    assert movies[1] is None
+    assert movies[2].id == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_sweep_is_disabled_by_default(mocker):
+    from app.repositories.movie_repository import movie_repository
+
+    list_movies = AsyncMock(return_value=[])
+    mocker.patch.object(movie_repository, "list", list_movies)
+    mocker.patch.object(movie_repository, "find_by_id", AsyncMock(side_effect=lambda movie_id: MagicMock(id=int(movie_id))))
+
+    movies = await movie_repository.find_by_ids([str(i) for i in range(1, 11)])
+
+    assert [movie.id for movie in movies] == list(range(1, 11))
+    list_movies.assert_not_called()
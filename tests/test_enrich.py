@@ -0,0 +1,194 @@
+"""
+Tests du traitement par lot (app/enrich.py) et du stockage des analyses précalculées
+
+Objectif :
+1. Vérifier que le traitement parcourt le catalogue page par page et enregistre les analyses.
+2. Vérifier la reprise à partir du point de sauvegarde, films en échec retentés en premier.
+3. Vérifier que le service renvoie une analyse précalculée récente sans appeler l'API ni le LLM.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.models.movie import Movie
+from app.models.genre import Genre
+from app.models.person import Person
+from app.repositories.analysis_repository import AnalysisRepository
+
+
+def make_movie(movie_id):
+    return Movie(
+        id=movie_id,
+        title=f"Film {movie_id}",
+        year=2010,
+        synopsis="Un voleur...",
+        genre=Genre(id=1, label="Drame"),
+        director=Person(id=1, last_name="Nolan"),
+        actors=[],
+        opinions=[]
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalysisRepository(path=str(tmp_path / "analyses.sqlite"))
+
+
+@pytest.fixture
+def catalogue(mocker):
+    movies = [make_movie(i) for i in range(1, 6)]
+    movie_repo = MagicMock()
+    movie_repo.list = AsyncMock(side_effect=lambda skip, limit: movies[skip:skip + limit])
+    mocker.patch('app.enrich.movie_repository', movie_repo)
+    genre_repo = AsyncMock()
+    genre_repo.list.return_value = [Genre(id=1, label="Drame")]
+    mocker.patch('app.graphql.dataloaders.genre_repository', genre_repo)
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content="Drame"))
+    mocker.patch('app.enrich.llm', llm)
+    return movie_repo
+
+
+@pytest.mark.asyncio
+async def test_enrich_stores_every_movie(store, catalogue):
+    from app.enrich import enrich
+    await enrich(store, page_size=2, concurrency=2, restart=False, mode="parallel")
+
+    stored = await store.get(5)
+    assert stored["aiBestGenre"] == "Drame"
+    assert stored["aiTags"] == ["Drame"]
+    assert [call.kwargs["skip"] for call in catalogue.list.call_args_list] == [0, 2, 4]
+    assert await store.get_checkpoint("enrich") == 0
+
+
+@pytest.mark.asyncio
+async def test_enrich_closes_the_movie_api_client(mocker, store, catalogue):
+    from app.enrich import enrich
+    aclose = mocker.patch('app.enrich.api_client.aclose', AsyncMock())
+    catalogue.list.side_effect = RuntimeError("API Movie indisponible")
+
+    with pytest.raises(RuntimeError):
+        await enrich(store, page_size=2, concurrency=2, restart=False, mode="parallel")
+
+    aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_enrich_loads_the_tokenizer(mocker, store, catalogue):
+    from app.enrich import enrich
+    load_tokenizer = mocker.patch('app.enrich.prompts.load_tokenizer')
+
+    await enrich(store, page_size=2, concurrency=2, restart=False, mode="parallel")
+
+    load_tokenizer.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_enrich_resumes_from_checkpoint(store, catalogue):
+    from app.enrich import enrich
+    await store.set_checkpoint("enrich", 4)
+
+    await enrich(store, page_size=2, concurrency=2, restart=False, mode="parallel")
+
+    assert await store.get(1) is None
+    assert (await store.get(5))["aiSummary"] == "Drame"
+
+
+@pytest.mark.asyncio
+async def test_failed_movies_are_retried_on_resume(mocker, store, catalogue):
+    from app.enrich import enrich, llm
+    movies = [make_movie(i) for i in range(1, 6)]
+    llm_down = {"Film 3"}
+
+    async def ainvoke(prompt):
+        if any(title in prompt for title in llm_down):
+            raise RuntimeError("LLM indisponible")
+        return MagicMock(content="Drame")
+
+    llm.ainvoke = AsyncMock(side_effect=ainvoke)
+    # À la reprise, le film en échec est rechargé depuis l'API
+    movie_repo = AsyncMock()
+    movie_repo.find_by_ids.side_effect = lambda movie_ids: [movies[int(movie_id) - 1] for movie_id in movie_ids]
+    mocker.patch('app.graphql.dataloaders.movie_repository', movie_repo)
+
+    def interrupted_after_two_pages(skip, limit):
+        if skip >= 4:
+            raise KeyboardInterrupt
+        return movies[skip:skip + limit]
+
+    catalogue.list.side_effect = interrupted_after_two_pages
+    with pytest.raises(KeyboardInterrupt):
+        await enrich(store, page_size=2, concurrency=2, restart=False, mode="parallel")
+    assert await store.get_checkpoint("enrich") == 4
+    assert await store.get_failed("enrich") == ["3"]
+
+    llm_down.clear()
+    catalogue.list.side_effect = lambda skip, limit: movies[skip:skip + limit]
+    await enrich(store, page_size=2, concurrency=2, restart=False, mode="parallel")
+
+    assert (await store.get(3))["aiSummary"] == "Drame"
+    assert (await store.get(5))["aiSummary"] == "Drame"
+    assert await store.get_failed("enrich") == []
+
+
+@pytest.mark.asyncio
+async def test_service_serves_precomputed_analysis(mocker, store):
+    await store.save({"id": "1", "aiSummary": "Résumé stocké", "aiOpinionSummary": None,
+                      "aiBestGenre": "Drame", "aiTags": ["rêve"]})
+    mocker.patch('app.services.movie_analyzer_v2.analysis_repository', store)
+    mock_movie_repo = AsyncMock()
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', mock_movie_repo)
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock()
+
+    from app.services.movie_analyzer_v2 import analyze_movie
+    result = await analyze_movie(
+        movie_id="1",
+        ai_summary=True,
+        ai_opinion_summary=False,
+        ai_best_genre=False,
+        ai_tags=True,
+        llm=llm
+    )
+
+    assert result["aiSummary"] == "Résumé stocké"
+    assert result["aiBestGenre"] is None
+    assert result["aiTags"] == ["rêve"]
+    mock_movie_repo.find_by_id.assert_not_called()
+    llm.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_checks_precomputed_store_before_loading_movies(mocker, store):
+    await store.save({"id": "1", "aiSummary": "Résumé stocké", "aiOpinionSummary": None,
+                      "aiBestGenre": None, "aiTags": None})
+    mocker.patch('app.services.movie_analyzer_v2.analysis_repository', store)
+    movie_loader = MagicMock()
+    movie_loader.load = AsyncMock()
+
+    from app.services.movie_analyzer_v2 import analyze_movies
+    results = await analyze_movies(
+        movie_ids=["1"],
+        ai_summary=True,
+        ai_opinion_summary=False,
+        ai_best_genre=False,
+        ai_tags=False,
+        llm=MagicMock(),
+        max_parallelism=2,
+        movie_loader=movie_loader,
+        genre_loader=MagicMock()
+    )
+
+    assert results[0][1]["aiSummary"] == "Résumé stocké"
+    movie_loader.load.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stale_analysis_is_not_served(mocker, tmp_path):
+    store = AnalysisRepository(path=str(tmp_path / "analyses.sqlite"), max_age=3600)
+    clock = mocker.patch('app.repositories.analysis_repository.time.time', return_value=1000.0)
+    await store.save({"id": "1", "aiSummary": "Résumé stocké"})
+
+    clock.return_value = 1000.0 + 3000
+    assert (await store.get(1))["aiSummary"] == "Résumé stocké"
+    clock.return_value = 1000.0 + 4000
+    assert await store.get(1) is None
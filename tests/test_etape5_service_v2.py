@@ -185,4 +185,52 @@ async def test_service_v2_analyze_movie_full_request(mocker, mock_llm, mock_movi
     assert result['aiSummary'] == "Résumé IA"
     assert result['aiOpinionSummary'] == "Opinion IA"
     assert result['aiBestGenre'] == "Genre IA"
-    assert result['aiTags'] == ["tag1", "tag2"]
\ No newline at end of file
+    assert result['aiTags'] == ["tag1", "tag2"]
+
+@pytest.mark.asyncio
+async def test_service_v2_fetches_movie_and_genres_concurrently(mocker, mock_llm, mock_movie, mock_genres):
+    """
+    Vérifie que le film et les genres sont chargés en parallèle,
+    et que le résumé n'attend pas la liste des genres.
+    """
+    import asyncio
+    genres_released = asyncio.Event()
+    summary_started = asyncio.Event()
+
+    async def slow_genres():
+        await genres_released.wait()
+        return mock_genres
+
+    async def summary(llm, synopsis):
+        summary_started.set()
+        return "Résumé IA"
+
+    async def release_genres_after_summary():
+        await summary_started.wait()
+        genres_released.set()
+
+    mock_movie_repo = AsyncMock()
+    mock_movie_repo.find_by_id.return_value = mock_movie
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', mock_movie_repo)
+    mock_genre_repo = MagicMock()
+    mock_genre_repo.list = slow_genres
+    mocker.patch('app.services.movie_analyzer_v2.genre_repository', mock_genre_repo)
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', summary)
+    mock_best_genre = AsyncMock(return_value="Drame")
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_best_genre', mock_best_genre)
+
+    from app.services.movie_analyzer_v2 import analyze_movie
+    releaser = asyncio.create_task(release_genres_after_summary())
+    result = await asyncio.wait_for(analyze_movie(
+        movie_id="1",
+        ai_summary=True,
+        ai_opinion_summary=False,
+        ai_best_genre=True,
+        ai_tags=False,
+        llm=mock_llm
+    ), timeout=1)
+    await releaser
+
+    assert result['aiSummary'] == "Résumé IA"
+    assert result['aiBestGenre'] == "Drame"
+    mock_best_genre.assert_called_once_with(mock_llm, mock_movie.synopsis, mock_genres)
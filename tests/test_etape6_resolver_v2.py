@@ -3,7 +3,7 @@ Tests de validation pour l'Étape 6 : Optimisation du Resolver GraphQL (Version
 
 Objectif :
 1. Vérifier que le resolver V2 récupère bien le LLM du contexte.
-2. Vérifier que le resolver V2 utilise `is_field_requested` pour
+2. Vérifier que le resolver V2 utilise `requested_fields` pour
    passer les bons booléens au service V2.
 
 Prérequis :
@@ -21,7 +21,11 @@ def mock_info():
     """Fixture pour un objet Info de Strawberry."""
     mock_llm_instance = MagicMock(name="MockLLM")
     info = MagicMock()
-    info.context = {"llm": mock_llm_instance}
+    info.context = {
+        "llm": mock_llm_instance,
+        "movie_loader": MagicMock(name="MockMovieLoader"),
+        "genre_loader": MagicMock(name="MockGenreLoader"),
+    }
     return info
 
 @pytest.mark.asyncio
@@ -30,7 +34,7 @@ async def test_resolver_v2_partial_request(mocker, mock_info):
     Teste le resolver V2 avec une requête partielle.
     Vérifie qu'il passe les bons drapeaux au service.
     """
-    # 1. Mocker les dépendances (le service V2 et le helper is_field_requested)
+    # 1. Mocker les dépendances (le service V2 et le helper requested_fields)
 
     # On mock le service V2 pour espionner ses arguments
     mock_service = AsyncMock(return_value={
@@ -42,13 +46,8 @@ async def test_resolver_v2_partial_request(mocker, mock_info):
     })
     mocker.patch('app.graphql.resolvers.analyze_movie_v2.analyze_movie', mock_service)
 
-    # On mock 'is_field_requested' pour simuler une requête partielle
-    def mock_is_field_requested(info, field_name):
-        if field_name == "aiSummary":
-            return True
-        return False
-
-    mocker.patch('app.graphql.resolvers.analyze_movie_v2.is_field_requested', mock_is_field_requested)
+    # On mock 'requested_fields' pour simuler une requête partielle
+    mocker.patch('app.graphql.resolvers.analyze_movie_v2.requested_fields', return_value={"id", "aiSummary"})
 
     # 2. Appel du resolver
     from app.graphql.resolvers.analyze_movie_v2 import analyze_movie_by_id
@@ -66,7 +65,10 @@ async def test_resolver_v2_partial_request(mocker, mock_info):
         ai_opinion_summary=False,
         ai_best_genre=False,
         ai_tags=False,
-        llm=mock_info.context["llm"] # Vérifie que le LLM du contexte est bien passé
+        llm=mock_info.context["llm"], # Vérifie que le LLM du contexte est bien passé
+        movie_loader=mock_info.context["movie_loader"],
+        genre_loader=mock_info.context["genre_loader"],
+        mode=None
     )
 
 @pytest.mark.asyncio
@@ -88,7 +90,10 @@ async def test_resolver_v2_full_request(mocker, mock_info):
     mocker.patch('app.graphql.resolvers.analyze_movie_v2.analyze_movie', mock_service)
 
     # Simule une requête complète
-    mocker.patch('app.graphql.resolvers.analyze_movie_v2.is_field_requested', return_value=True)
+    mocker.patch(
+        'app.graphql.resolvers.analyze_movie_v2.requested_fields',
+        return_value={"id", "aiSummary", "aiOpinionSummary", "aiBestGenre", "aiTags"}
+    )
 
     # 2. Appel du resolver
     from app.graphql.resolvers.analyze_movie_v2 import analyze_movie_by_id
@@ -106,5 +111,8 @@ async def test_resolver_v2_full_request(mocker, mock_info):
         ai_opinion_summary=True,
         ai_best_genre=True,
         ai_tags=True,
-        llm=mock_info.context["llm"]
+        llm=mock_info.context["llm"],
+        movie_loader=mock_info.context["movie_loader"],
+        genre_loader=mock_info.context["genre_loader"],
+        mode=None
     )
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Tests du catalogue des genres gardé en mémoire (app/repositories/genre_repository.py)
+
+Objectif :
+1. Vérifier que la liste des genres n'est demandée qu'une fois à l'API tant qu'elle est fraîche.
+2. Vérifier qu'une copie périmée est servie immédiatement puis revalidée en tâche de fond.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.repositories.genre_repository import GenreRepository
+
+
+@pytest.fixture
+def mock_api_client(mocker):
+    responses = []
+    for labels in (["Drame"], ["Drame", "Comédie"]):
+        response = MagicMock()
+        response.json.return_value = [{"id": i, "label": label} for i, label in enumerate(labels, 1)]
+        responses.append(response)
+    client = AsyncMock()
+    client._request.side_effect = responses
+    mocker.patch('app.repositories.genre_repository.api_client', client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_fresh_snapshot_is_served_from_memory(mock_api_client):
+    repository = GenreRepository(refresh_interval=60)
+
+    await repository.list()
+    genres = await repository.list()
+
+    assert [g.label for g in genres] == ["Drame"]
+    mock_api_client._request.assert_called_once_with("GET", "/genres/")
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_is_revalidated_in_background(mock_api_client):
+    repository = GenreRepository(refresh_interval=60)
+    await repository.list()
+    repository._loaded_at -= 61  # la copie devient périmée
+
+    stale = await repository.list()
+    await asyncio.sleep(0)  # laisse la revalidation s'exécuter
+    fresh = await repository.list()
+
+    assert [g.label for g in stale] == ["Drame"]
+    assert [g.label for g in fresh] == ["Drame", "Comédie"]
+    assert mock_api_client._request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_survives_unavailable_api(mocker):
+    client = AsyncMock()
+    client._request.side_effect = Exception("API indisponible")
+    mocker.patch('app.repositories.genre_repository.api_client', client)
+    repository = GenreRepository(refresh_interval=60)
+
+    await repository.start_background_refresh()
+    await repository.stop_background_refresh()
+
+    client._request.assert_called_once()
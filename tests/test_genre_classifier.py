@@ -0,0 +1,99 @@
+"""
+Tests du choix du genre par embeddings (app/services/genre_classifier.py)
+
+Objectif :
+1. Vérifier que le genre est choisi sans LLM lorsque l'écart de similarité est suffisant.
+2. Vérifier que les cas ambigus passent par le LLM, dont la réponse est ramenée à un genre existant.
+3. Vérifier que les vecteurs des genres et des synopsis sont calculés une seule fois,
+   et que les appels d'embeddings passent par la passerelle LLM.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core.llm_gateway import LLMGateway
+from app.models.genre import Genre
+from app.services.genre_classifier import GenreClassifier, match_genre_label
+
+GENRES = [Genre(id=1, label="Science-Fiction"), Genre(id=2, label="Comédie"), Genre(id=3, label="Drame")]
+# Vocabulaire factice : une dimension par thème
+THEMES = ["espace", "rire", "larmes"]
+
+
+class KeywordEmbeddings:
+    """Embeddings factices : un vecteur par occurrence de thème (les genres sont associés à un thème)."""
+
+    LABEL_THEMES = {"Science-Fiction": "espace", "Comédie": "rire", "Drame": "larmes"}
+
+    def __init__(self):
+        self.documents = 0
+        self.queries = 0
+
+    def _embed(self, text):
+        for label, theme in self.LABEL_THEMES.items():
+            text = text.replace(label, theme)
+        return [float(text.count(theme)) for theme in THEMES]
+
+    async def aembed_documents(self, texts):
+        self.documents += len(texts)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text):
+        self.queries += 1
+        return self._embed(text)
+
+
+@pytest.fixture
+def classifier(mocker):
+    classifier = GenreClassifier(KeywordEmbeddings(), min_margin=0.2)
+    mocker.patch('app.services.movie_analyzer_v2.genre_classifier', classifier)
+    return classifier
+
+
+@pytest.fixture
+def llm():
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content="Le genre est : drame."))
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_confident_match_skips_the_llm(classifier, llm):
+    from app.services.movie_analyzer_v2 import get_ai_best_genre
+
+    first = await get_ai_best_genre(llm, "Un voyage dans l'espace, loin de l'espace connu.", GENRES)
+    second = await get_ai_best_genre(llm, "Des larmes et encore des larmes.", GENRES)
+
+    assert (first, second) == ("Science-Fiction", "Drame")
+    llm.ainvoke.assert_not_called()
+    assert classifier.embeddings.documents == len(GENRES)
+    assert classifier.stats()["confident"] == 2
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_case_falls_back_to_the_llm(classifier, llm):
+    from app.services.movie_analyzer_v2 import get_ai_best_genre
+
+    genre = await get_ai_best_genre(llm, "Du rire et des larmes.", GENRES)
+
+    assert genre == "Drame"
+    llm.ainvoke.assert_awaited_once()
+
+
+def test_llm_answer_is_constrained_to_existing_labels():
+    assert match_genre_label("science fiction", GENRES) == "Science-Fiction"
+    assert match_genre_label("Je dirais une comedie", GENRES) == "Comédie"
+    assert match_genre_label("Western", GENRES) is None
+
+
+@pytest.mark.asyncio
+async def test_synopsis_vectors_are_cached_and_calls_go_through_the_gateway():
+    gateway = LLMGateway(MagicMock(), max_concurrency=1, max_queue_size=10)
+    classifier = GenreClassifier(KeywordEmbeddings(), min_margin=0.2, gateway=gateway, max_queries=1)
+
+    for synopsis in ("Des larmes.", "Des larmes.", "Du rire.", "Des larmes."):
+        await classifier.classify(synopsis, GENRES)
+
+    # "Des larmes." est recalculé après éviction par "Du rire." (une seule entrée gardée)
+    assert classifier.embeddings.queries == 3
+    # Genres (une fois) et synopsis : chaque appel a pris une place de la passerelle
+    assert gateway.served == 4
@@ -0,0 +1,112 @@
+"""
+Tests du regroupement des prompts (app/core/llm_batcher.py)
+
+Objectif :
+1. Vérifier que les prompts d'une même fenêtre partent en une seule requête multi-prompts, bornée en taille,
+   qui n'occupe qu'une place de la passerelle LLM.
+2. Vérifier que chaque appelant reçoit sa propre réponse ou sa propre erreur.
+3. Vérifier le repli prompt par prompt si le serveur refuse les requêtes multi-prompts.
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app.core.llm_batcher import LLMBatcher, completions_batch
+from app.core.llm_gateway import LLMGateway
+
+
+@pytest.fixture
+def model():
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=lambda prompt: MagicMock(content=f"direct {prompt}"))
+    return model
+
+
+@pytest.fixture
+def complete_batch():
+    async def complete(prompts):
+        return [prompt.upper() for prompt in prompts]
+    return AsyncMock(side_effect=complete)
+
+
+@pytest.mark.asyncio
+async def test_prompts_in_window_share_one_request_and_one_slot(model, complete_batch):
+    gateway = LLMGateway(model, max_concurrency=1, max_queue_size=0)
+    batcher = LLMBatcher(gateway, complete_batch, window=0.01, max_batch_size=3)
+
+    results = await asyncio.gather(*[batcher.ainvoke(prompt) for prompt in ("a", "b", "c", "d", "e")])
+
+    assert [result.content for result in results] == ["A", "B", "C", "D", "E"]
+    # Lot plein à 3 prompts, puis les 2 autres à l'expiration de la fenêtre ; une seule place
+    # de passerelle (file nulle) suffit : chaque lot n'en prend qu'une
+    assert [call.args[0] for call in complete_batch.await_args_list] == [["a", "b", "c"], ["d", "e"]]
+    assert gateway.rejected == 0 and gateway.served == 2
+    assert batcher.stats()["avg_batch_size"] == 2.5
+    model.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_each_caller_gets_its_own_answer_or_error(model):
+    complete_batch = AsyncMock(side_effect=RuntimeError("serveur indisponible"))
+    batcher = LLMBatcher(LLMGateway(model, 4, 10), complete_batch, window=0.01, max_batch_size=8)
+
+    results = await asyncio.gather(batcher.ainvoke("a"), batcher.ainvoke("b"), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # Un prompt seul dans sa fenêtre passe par l'API de chat
+    assert (await batcher.ainvoke("c")).content == "direct c"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_is_removed_from_batch(model, complete_batch):
+    batcher = LLMBatcher(LLMGateway(model, 4, 10), complete_batch, window=0.01, max_batch_size=10)
+
+    cancelled = asyncio.create_task(batcher.ainvoke("a"))
+    kept = [asyncio.create_task(batcher.ainvoke(prompt)) for prompt in ("b", "c")]
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert [(await task).content for task in kept] == ["B", "C"]
+    assert complete_batch.await_args.args[0] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_unsupported_server_falls_back_to_single_prompts(model):
+    refused = openai.NotFoundError(
+        "not found", response=httpx.Response(404, request=httpx.Request("POST", "http://llm/v1/completions")), body=None
+    )
+    complete_batch = AsyncMock(side_effect=refused)
+    batcher = LLMBatcher(LLMGateway(model, 4, 10), complete_batch, window=0.01, max_batch_size=8)
+
+    results = await asyncio.gather(batcher.ainvoke("a"), batcher.ainvoke("b"))
+
+    assert [result.content for result in results] == ["direct a", "direct b"]
+    assert not batcher.enabled
+    await batcher.ainvoke("c")
+    complete_batch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_completions_batch_sends_a_prompt_list():
+    client = MagicMock()
+    client.completions.create = AsyncMock(return_value=SimpleNamespace(
+        usage=None,
+        choices=[SimpleNamespace(index=1, text=" deux"), SimpleNamespace(index=0, text=" un ")],
+    ))
+
+    texts = await completions_batch(client, "model-a", 0.3, max_tokens=64)(["1", "2"])
+
+    assert texts == ["un", "deux"]
+    client.completions.create.assert_awaited_once_with(model="model-a", prompt=["1", "2"], temperature=0.3, max_tokens=64)
+
+
+@pytest.mark.asyncio
+async def test_disabled_batcher_calls_gateway_directly(model, complete_batch):
+    batcher = LLMBatcher(LLMGateway(model, 4, 10), complete_batch, window=0, max_batch_size=8)
+
+    assert (await batcher.ainvoke("a")).content == "direct a"
+    complete_batch.assert_not_called()
@@ -0,0 +1,80 @@
+"""
+Tests du budget de temps des appels au LLM (app/services/movie_analyzer_v2.py)
+
+Objectif :
+1. Vérifier qu'un champ hors budget vaut null avec une erreur GraphQL,
+   sans perdre les champs déjà calculés.
+2. Vérifier qu'un appel au LLM en échec ne fait pas échouer toute l'analyse.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core.config import settings
+from app.models.movie import Movie
+from app.models.genre import Genre
+from app.models.person import Person
+
+
+@pytest.fixture
+def mock_movie(mocker):
+    movie = Movie(
+        id=1,
+        title="Inception",
+        year=2010,
+        synopsis="Un voleur qui vole des secrets...",
+        genre=Genre(id=1, label="Science-Fiction"),
+        director=Person(id=1, last_name="Nolan", first_name="Christopher"),
+        actors=[],
+        opinions=[]
+    )
+    movie_repo = AsyncMock()
+    movie_repo.find_by_id.return_value = movie
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', movie_repo)
+    return movie
+
+
+@pytest.mark.asyncio
+async def test_slow_field_times_out_without_losing_the_others(mocker, mock_movie):
+    from app.main import schema
+
+    mocker.patch.object(settings, "LLM_REQUEST_BUDGET", 0.05)
+
+    async def slow_tags(llm, title, synopsis):
+        await asyncio.sleep(1)
+        return ["trop", "tard"]
+
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', AsyncMock(return_value="Résumé IA"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_tags', slow_tags)
+
+    result = await schema.execute(
+        'query { analyzeMovie(movieId: "1") { id aiSummary aiTags } }',
+        context_value={"llm": MagicMock()},
+    )
+
+    assert result.data == {"analyzeMovie": {"id": "1", "aiSummary": "Résumé IA", "aiTags": None}}
+    assert len(result.errors) == 1
+    assert result.errors[0].path == ["analyzeMovie", "aiTags"]
+    assert result.errors[0].extensions["code"] == "LLMTimeoutBLLException"
+
+
+@pytest.mark.asyncio
+async def test_failing_llm_call_degrades_a_single_field(mocker, mock_movie):
+    from app.services.movie_analyzer_v2 import analyze_movie
+    from app.core.exceptions import LLMUnavailableBLLException
+
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', AsyncMock(return_value="Résumé IA"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_tags', AsyncMock(side_effect=ConnectionError("LLM injoignable")))
+
+    result = await analyze_movie(
+        movie_id="1",
+        ai_summary=True,
+        ai_opinion_summary=False,
+        ai_best_genre=False,
+        ai_tags=True,
+        llm=MagicMock()
+    )
+
+    assert result["aiSummary"] == "Résumé IA"
+    assert result["aiTags"] is None
+    assert isinstance(result["errors"]["aiTags"], LLMUnavailableBLLException)
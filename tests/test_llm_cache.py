@@ -0,0 +1,97 @@
+"""
+Tests du cache des réponses du LLM (app/core/llm_cache.py)
+
+Objectif :
+1. Vérifier qu'un même prompt n'est envoyé qu'une seule fois au modèle.
+2. Vérifier que la clé dépend du modèle, de la température et du prompt.
+3. Vérifier l'éviction LRU, l'expiration (TTL) et le niveau partagé SQLite (purge et taille bornée).
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core.llm_cache import (
+    CachedChatModel,
+    LLMResponseCache,
+    MemoryCacheTier,
+    SQLiteCacheTier,
+    make_cache_key,
+)
+
+
+@pytest.fixture
+def mock_model():
+    """Fixture pour un modèle de chat mocké."""
+    model = MagicMock()
+    mock_response = MagicMock()
+    mock_response.content = "Réponse du LLM"
+    model.ainvoke = AsyncMock(return_value=mock_response)
+    return model
+
+
+def test_cache_key_depends_on_model_temperature_and_prompt():
+    key = make_cache_key("model-a", 0.3, "prompt")
+    assert key == make_cache_key("model-a", 0.3, "prompt")
+    assert key != make_cache_key("model-b", 0.3, "prompt")
+    assert key != make_cache_key("model-a", 0.7, "prompt")
+    assert key != make_cache_key("model-a", 0.3, "autre prompt")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryCacheTier(max_entries=2, ttl=60)
+    tier.set("a", "1")
+    tier.set("b", "2")
+    tier.get("a")  # "a" devient le plus récent
+    tier.set("c", "3")
+
+    assert tier.get("a") == "1"
+    assert tier.get("b") is None
+    assert tier.get("c") == "3"
+
+
+def test_memory_tier_expires_entries():
+    tier = MemoryCacheTier(max_entries=2, ttl=-1)
+    tier.set("a", "1")
+    assert tier.get("a") is None
+    assert len(tier) == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_model_calls_llm_once(mock_model):
+    cache = LLMResponseCache(max_entries=10, ttl=60)
+    llm = CachedChatModel(mock_model, cache, model_name="model-a", temperature=0.3)
+
+    first = await llm.ainvoke("Résume ce film")
+    second = await llm.ainvoke("Résume ce film")
+
+    assert first.content == second.content == "Réponse du LLM"
+    mock_model.ainvoke.assert_called_once_with("Résume ce film")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_serves_other_processes(tmp_path, mock_model):
+    path = str(tmp_path / "llm_cache.sqlite")
+    worker_1 = LLMResponseCache(shared=SQLiteCacheTier(path, ttl=60))
+    worker_2 = LLMResponseCache(shared=SQLiteCacheTier(path, ttl=60))
+
+    await CachedChatModel(mock_model, worker_1, "model-a", 0.3).ainvoke("prompt")
+    response = await CachedChatModel(mock_model, worker_2, "model-a", 0.3).ainvoke("prompt")
+
+    assert response.content == "Réponse du LLM"
+    mock_model.ainvoke.assert_called_once()
+    assert worker_2.stats()["shared_hits"] == 1
+
+
+def test_shared_tier_purges_expired_and_oldest_entries(tmp_path, mocker):
+    tier = SQLiteCacheTier(str(tmp_path / "llm_cache.sqlite"), ttl=60, max_entries=3, purge_every=2)
+    clock = mocker.patch("app.core.llm_cache.time.time", return_value=1000.0)
+    tier._set("expirée", "x")
+    clock.return_value = 2000.0
+    for index in range(5):
+        clock.return_value += 1
+        tier._set(f"clé-{index}", "x")
+
+    keys = [row[0] for row in tier._connection.execute("SELECT key FROM llm_cache ORDER BY key")]
+    # 6 écritures : purge à la 6e, l'entrée expirée et les plus anciennes au-delà de 3 sont supprimées
+    assert keys == ["clé-2", "clé-3", "clé-4"]
@@ -0,0 +1,91 @@
+"""
+Tests de la passerelle vers le LLM (app/core/llm_gateway.py)
+
+Objectif :
+1. Vérifier que le nombre d'appels simultanés est borné.
+2. Vérifier que la file d'attente sert les appels interactifs avant les traitements par lot.
+3. Vérifier le rejet immédiat lorsque la file est pleine.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.core.exceptions import BLLException, LLMOverloadedBLLException
+from app.core.llm_gateway import LLMGateway, LLMPriority, llm_priority
+
+
+class BlockingModel:
+    """Modèle factice : chaque appel attend qu'on le libère."""
+
+    def __init__(self):
+        self.started = []
+        self.release = asyncio.Event()
+
+    async def ainvoke(self, prompt):
+        self.started.append(prompt)
+        await self.release.wait()
+        return MagicMock(content=prompt)
+
+
+async def invoke(gateway, prompt, priority=LLMPriority.INTERACTIVE):
+    llm_priority.set(priority)
+    return await gateway.ainvoke(prompt)
+
+
+@pytest.mark.asyncio
+async def test_gateway_bounds_concurrency_and_serves_by_priority():
+    model = BlockingModel()
+    gateway = LLMGateway(model, max_concurrency=1, max_queue_size=10)
+
+    first = asyncio.create_task(invoke(gateway, "premier"))
+    await asyncio.sleep(0)
+    batch = asyncio.create_task(invoke(gateway, "lot", LLMPriority.BATCH))
+    interactive = asyncio.create_task(invoke(gateway, "interactif"))
+    await asyncio.sleep(0)
+
+    assert model.started == ["premier"]
+    assert gateway.stats()["queue_depth"] == 2
+
+    model.release.set()
+    await asyncio.gather(first, batch, interactive)
+
+    assert model.started == ["premier", "interactif", "lot"]
+    assert gateway.stats()["in_flight"] == 0
+    assert gateway.stats()["served"] == 3
+
+
+@pytest.mark.asyncio
+async def test_gateway_rejects_when_queue_is_full():
+    model = BlockingModel()
+    gateway = LLMGateway(model, max_concurrency=1, max_queue_size=1)
+
+    running = asyncio.create_task(gateway.ainvoke("en cours"))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(gateway.ainvoke("en attente"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(LLMOverloadedBLLException) as exc_info:
+        await gateway.ainvoke("de trop")
+
+    assert isinstance(exc_info.value, BLLException)
+    assert gateway.stats()["rejected"] == 1
+    model.release.set()
+    await asyncio.gather(running, queued)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    model = BlockingModel()
+    gateway = LLMGateway(model, max_concurrency=1, max_queue_size=10)
+
+    running = asyncio.create_task(gateway.ainvoke("en cours"))
+    await asyncio.sleep(0)
+    abandoned = asyncio.create_task(gateway.ainvoke("abandonné"))
+    await asyncio.sleep(0)
+    abandoned.cancel()
+    model.release.set()
+    await running
+
+    assert (await gateway.ainvoke("suivant")).content == "suivant"
+    assert model.started == ["en cours", "suivant"]
+    assert gateway.stats()["in_flight"] == 0
@@ -0,0 +1,70 @@
+"""
+Tests de la journalisation structurée (app/core/logging_config.py)
+
+Objectif :
+1. Vérifier le format JSON (identifiant de requête, champs `extra`, troncature).
+2. Vérifier l'échantillonnage des logs sous WARNING.
+3. Vérifier que le service V2 n'écrit plus son résultat sur la sortie standard.
+"""
+
+import json
+import logging
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi.testclient import TestClient
+
+from app.core.logging_config import JsonFormatter, RequestIdFilter, SamplingFilter, request_id
+
+
+def make_record(level=logging.INFO, **extra):
+    record = logging.makeLogRecord({"name": "app.test", "levelno": level, "levelname": logging.getLevelName(level),
+                                    "msg": "Analyse du film %s", "args": ("1",), **extra})
+    RequestIdFilter().filter(record)
+    return record
+
+
+def test_json_formatter_truncates_payload_and_adds_request_id():
+    token = request_id.set("req-42")
+    try:
+        record = make_record(analysis={"aiSummary": "x" * 50})
+    finally:
+        request_id.reset(token)
+
+    entry = json.loads(JsonFormatter(max_length=20).format(record))
+
+    assert entry["message"] == "Analyse du film 1"
+    assert entry["request_id"] == "req-42"
+    assert entry["analysis"]["aiSummary"] == "x" * 20 + "… (+30 caractères)"
+
+
+def test_sampling_keeps_warnings_and_drops_sampled_out_requests():
+    sampling = SamplingFilter(rate=0)
+
+    assert not sampling.filter(make_record(logging.INFO))
+    assert sampling.filter(make_record(logging.WARNING))
+    assert SamplingFilter(rate=1).filter(make_record(logging.DEBUG))
+
+
+def test_request_id_is_echoed_in_response():
+    from app.main import app
+
+    response = TestClient(app).get("/", headers={"X-Request-ID": "abc"})
+
+    assert response.headers["X-Request-ID"] == "abc"
+
+
+@pytest.mark.asyncio
+async def test_analysis_is_not_printed(mocker, capsys):
+    from app.services.movie_analyzer_v2 import analyze_movie
+
+    movie_repo = AsyncMock()
+    movie_repo.find_by_id.return_value = MagicMock(synopsis="Un voleur...")
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', movie_repo)
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', AsyncMock(return_value="Résumé IA"))
+
+    await analyze_movie(
+        movie_id="1", ai_summary=True, ai_opinion_summary=False, ai_best_genre=False, ai_tags=False, llm=MagicMock()
+    )
+
+    assert "Résumé IA" not in capsys.readouterr().out
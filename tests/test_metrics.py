@@ -0,0 +1,92 @@
+"""
+Tests des métriques Prometheus (app/core/metrics.py, endpoint /metrics)
+
+Objectif :
+1. Vérifier que l'exécution d'une requête GraphQL alimente les histogrammes
+   de l'opération (noms d'opération bornés), du resolver et des tâches IA.
+2. Vérifier que /metrics expose aussi les statistiques des caches et de la passerelle LLM.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.core.metrics import route_template
+from app.models.movie import Movie
+from app.models.genre import Genre
+from app.models.person import Person
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_route_template_hides_identifiers():
+    assert route_template("/movies/42") == "/movies/{id}"
+    assert route_template("/movies/?skip=0") == "/movies/"
+
+
+@pytest.mark.asyncio
+async def test_graphql_execution_is_measured(mocker):
+    from app.main import schema
+    mocker.patch('app.graphql.extensions.settings.GRAPHQL_METRICS_OPERATION_NAMES', "Analyse, Catalogue")
+
+    movie_repo = AsyncMock()
+    movie_repo.find_by_id.return_value = Movie(
+        id=1, title="Inception", year=2010, synopsis="Un voleur...",
+        genre=Genre(id=1, label="Science-Fiction"),
+        director=Person(id=1, last_name="Nolan", first_name="Christopher"),
+        actors=[], opinions=[]
+    )
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', movie_repo)
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content="Résumé IA"))
+
+    operations = sample("graphql_operation_duration_seconds_count", operation_type="query", operation_name="Analyse")
+    resolvers = sample("graphql_resolver_duration_seconds_count", field="Query.analyzeMovie")
+    summaries = sample("llm_task_duration_seconds_count", task="get_ai_summary", outcome="ok")
+
+    result = await schema.execute(
+        'query Analyse { analyzeMovie(movieId: "1") { aiSummary } }',
+        context_value={"llm": llm},
+    )
+
+    assert result.errors is None
+    assert sample("graphql_operation_duration_seconds_count", operation_type="query", operation_name="Analyse") == operations + 1
+    assert sample("graphql_resolver_duration_seconds_count", field="Query.analyzeMovie") == resolvers + 1
+    assert sample("llm_task_duration_seconds_count", task="get_ai_summary", outcome="ok") == summaries + 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_operation_names_share_one_label(mocker):
+    from app.main import schema
+    mocker.patch('app.graphql.extensions.settings.GRAPHQL_METRICS_OPERATION_NAMES', "Analyse")
+    others = sample("graphql_operation_duration_seconds_count", operation_type="query", operation_name="other")
+
+    for index in range(3):
+        await schema.execute(f"query Nom{index} {{ __typename }}")
+
+    assert sample("graphql_operation_duration_seconds_count", operation_type="query", operation_name="other") == others + 3
+    assert sample("graphql_operation_duration_seconds_count", operation_type="query", operation_name="Nom0") == 0
+
+
+@pytest.mark.asyncio
+async def test_gateway_wait_is_measured():
+    from app.core.llm_gateway import LLMGateway
+    waits = sample("llm_gateway_wait_seconds_count", priority="interactive")
+
+    async with LLMGateway(MagicMock(), max_concurrency=1, max_queue_size=1).slot():
+        pass
+
+    assert sample("llm_gateway_wait_seconds_count", priority="interactive") == waits + 1
+
+
+def test_metrics_endpoint_exposes_component_stats():
+    from app.main import app
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert "llm_cache_hit_ratio" in response.text
+    assert "llm_in_flight" in response.text
+    assert "movie_api_cache_hit_ratio" in response.text
@@ -0,0 +1,116 @@
+"""
+Tests de la résilience des appels à l'API Movie (app/repositories/_base_client.py)
+
+Objectif :
+1. Vérifier qu'un GET est relancé sur une erreur transitoire.
+2. Vérifier que le disjoncteur s'ouvre après plusieurs échecs et échoue immédiatement.
+3. Vérifier qu'une requête couverte (hedged) répond à la place d'une requête lente.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import DALException
+from app.repositories._base_client import BaseClient
+
+
+def make_client(mocker, handler):
+    base_client = BaseClient(base_url="http://movie-api/api/v1")
+    mocker.patch.object(
+        base_client, "_create_client",
+        return_value=httpx.AsyncClient(base_url=base_client.base_url, transport=httpx.MockTransport(handler)),
+    )
+    return base_client
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(mocker):
+    mocker.patch.object(settings, "MOVIE_API_RETRY_BACKOFF_BASE", 0)
+
+
+@pytest.mark.asyncio
+async def test_get_is_retried_on_transient_errors(mocker):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connexion refusée", request=request)
+        if len(calls) == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"id": 1})
+
+    base_client = make_client(mocker, handler)
+
+    response = await base_client._request("GET", "/movies/1")
+
+    assert response.json() == {"id": 1}
+    assert len(calls) == 3
+    assert base_client.stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(mocker):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    base_client = make_client(mocker, handler)
+
+    with pytest.raises(DALException) as exc_info:
+        await base_client._request("GET", "/movies/404")
+
+    assert exc_info.value.status_code == 404
+    assert len(calls) == 1
+    assert base_client.stats()["circuits"]["movie-api"]["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_fails_fast(mocker):
+    mocker.patch.object(settings, "MOVIE_API_MAX_RETRIES", 0)
+    mocker.patch.object(settings, "MOVIE_API_CIRCUIT_FAILURE_THRESHOLD", 2)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    base_client = make_client(mocker, handler)
+
+    for _ in range(2):
+        with pytest.raises(DALException):
+            await base_client._request("GET", "/movies/1")
+    with pytest.raises(DALException) as exc_info:
+        await base_client._request("GET", "/movies/1")
+
+    assert exc_info.value.status_code == 503
+    assert len(calls) == 2
+    assert base_client.stats()["circuits"]["movie-api"] == {"state": "open", "consecutive_failures": 2, "rejected": 1}
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged(mocker):
+    mocker.patch.object(settings, "MOVIE_API_HEDGE_ENABLED", True)
+    mocker.patch.object(settings, "MOVIE_API_HEDGE_MIN_DELAY", 0.01)
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"call": len(calls)})
+
+    base_client = make_client(mocker, handler)
+    for _ in range(base_client.latency.min_samples):
+        base_client.latency.record(0.01)
+
+    response = await base_client._request("GET", "/movies/1")
+
+    assert response.json() == {"call": 2}
+    assert base_client.stats()["hedged"] == 1
+    assert base_client.stats()["hedge_wins"] == 1
@@ -0,0 +1,68 @@
+"""
+Tests du résumé incrémental des avis (get_ai_opinion_summary)
+
+Objectif :
+1. Vérifier que seuls les nouveaux avis sont soumis au LLM, avec le résumé précédent.
+2. Vérifier le recalcul complet au-delà du seuil de dérive, ou si des avis ont disparu ou été modifiés.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core.config import settings
+from app.models.member import Member
+from app.models.opinion import Opinion
+from app.services.movie_analyzer_v2 import get_ai_opinion_summary
+
+
+def make_opinions(*ids):
+    member = Member(id=1, login="alice")
+    return [Opinion(id=i, note=4, comment=f"Avis {i}", movie_id=7, member=member) for i in ids]
+
+
+@pytest.fixture
+def llm():
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=lambda prompt: MagicMock(content=f"Résumé {llm.ainvoke.await_count}"))
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_only_new_opinions_are_sent(llm):
+    await get_ai_opinion_summary(llm, "Inception", make_opinions(*range(1, 11)))
+    summary = await get_ai_opinion_summary(llm, "Inception", make_opinions(*range(1, 12)))
+    cached = await get_ai_opinion_summary(llm, "Inception", make_opinions(*range(1, 12)))
+
+    update_prompt = llm.ainvoke.await_args_list[1].args[0]
+    assert "Résumé actuel : Résumé 1" in update_prompt
+    assert "Avis 11" in update_prompt and "Avis 10" not in update_prompt
+    assert summary == cached == "Résumé 2"
+    assert llm.ainvoke.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_full_recompute_past_drift_threshold_or_on_removal(llm, mocker):
+    mocker.patch.object(settings, "OPINION_SUMMARY_MAX_DRIFT", 0.3)
+
+    await get_ai_opinion_summary(llm, "Inception", make_opinions(1, 2, 3))
+    await get_ai_opinion_summary(llm, "Inception", make_opinions(1, 2, 3, 4, 5))
+    await get_ai_opinion_summary(llm, "Inception", make_opinions(2, 3, 4, 5))
+
+    prompts = [call.args[0] for call in llm.ainvoke.await_args_list]
+    # 2 avis sur 5 n'ont pas été vus par le dernier recalcul complet : dérive trop forte
+    assert "Résumé actuel" not in prompts[1] and "Avis 1" in prompts[1]
+    # L'avis 1 a disparu : il ne peut pas être retiré d'un résumé, tout est recalculé
+    assert "Résumé actuel" not in prompts[2] and "Avis 1" not in prompts[2]
+
+
+@pytest.mark.asyncio
+async def test_edited_opinion_triggers_full_recompute(llm):
+    opinions = make_opinions(1, 2, 3)
+    await get_ai_opinion_summary(llm, "Inception", opinions)
+    opinions[1].comment = "Avis 2, finalement décevant"
+    opinions[2].note = 1
+
+    summary = await get_ai_opinion_summary(llm, "Inception", opinions)
+
+    prompt = llm.ainvoke.await_args_list[1].args[0]
+    assert summary == "Résumé 2"
+    assert "Résumé actuel" not in prompt and "finalement décevant" in prompt and "Note : 1/5" in prompt
@@ -0,0 +1,62 @@
+"""
+Tests des requêtes persistées (app/graphql/persisted_queries.py)
+
+Objectif :
+1. Vérifier le protocole APQ : empreinte inconnue, enregistrement, puis envoi de l'empreinte seule.
+2. Vérifier le support GET (cache CDN) et le mode liste blanche.
+"""
+
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.graphql.persisted_queries import PersistedQueryRouter, PersistedQueryStore, query_hash
+
+QUERY = "query Ping { __typename }"
+
+
+def persisted(sha256_hash):
+    return {"persistedQuery": {"version": 1, "sha256Hash": sha256_hash}}
+
+
+def make_client(store):
+    from app.main import schema
+    app = FastAPI()
+    app.include_router(PersistedQueryRouter(schema, store=store), prefix="/graphql")
+    return TestClient(app)
+
+
+def test_automatic_persisted_query_round_trip(mocker):
+    mocker.patch.object(settings, "GRAPHQL_GET_CACHE_MAX_AGE", 60)
+    client = make_client(PersistedQueryStore(max_entries=10))
+    sha256_hash = query_hash(QUERY)
+
+    unknown = client.post("/graphql", json={"extensions": persisted(sha256_hash)}).json()
+    assert unknown["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+    registered = client.post("/graphql", json={"query": QUERY, "extensions": persisted(sha256_hash)}).json()
+    assert registered == {"data": {"__typename": "Query"}}
+
+    response = client.get("/graphql", params={"extensions": json.dumps(persisted(sha256_hash))})
+    assert response.json() == {"data": {"__typename": "Query"}}
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+
+
+def test_hash_must_match_the_document():
+    client = make_client(PersistedQueryStore(max_entries=10))
+
+    response = client.post("/graphql", json={"query": QUERY, "extensions": persisted("0" * 64)}).json()
+
+    assert response["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_HASH_MISMATCH"
+
+
+def test_allowlist_mode_rejects_unknown_documents():
+    client = make_client(PersistedQueryStore(max_entries=10, allowlist={query_hash(QUERY): QUERY}))
+
+    allowed = client.post("/graphql", json={"extensions": persisted(query_hash(QUERY))}).json()
+    rejected = client.post("/graphql", json={"query": "{ __schema { types { name } } }"}).json()
+
+    assert allowed == {"data": {"__typename": "Query"}}
+    assert rejected["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_ALLOWED"
@@ -0,0 +1,150 @@
+"""
+Tests du module de prompts (app/services/prompts.py)
+
+Objectif :
+1. Vérifier l'estimation des jetons (repli sans tokenizer) et la troncature au budget.
+2. Vérifier les stratégies pour les longues listes d'avis : troncature, échantillon par note, map-reduce.
+3. Vérifier que la taille de chaque prompt est mesurée.
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from prometheus_client import REGISTRY
+from app.core.config import settings
+from app.core.llm_cache import CachedChatModel, LLMResponseCache
+from app.core.llm_gateway import LLMGateway
+from app.models.member import Member
+from app.models.opinion import Opinion
+from app.services import prompts
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokenizer(mocker):
+    """Estimation à 4 caractères par jeton : résultats identiques avec ou sans accès au tokenizer."""
+    mocker.patch.object(prompts, "_tokenizer", None)
+
+
+def make_opinions(notes):
+    member = Member(id=1, login="alice")
+    return [Opinion(id=i, note=note, comment="Très bon film, à revoir." * 3, movie_id=3, member=member)
+            for i, note in enumerate(notes)]
+
+
+def test_token_estimate_and_truncation():
+    assert prompts.count_tokens("a" * 10) == 3
+    assert prompts.truncate_to_tokens("a" * 40, 5) == "a" * 20 + "…"
+    assert prompts.truncate_to_tokens("court", 5) == "court"
+
+
+def test_stratified_sample_keeps_note_distribution():
+    opinions = make_opinions([5] * 60 + [1] * 20 + [3] * 20)
+
+    truncated = prompts.select_opinions(opinions, budget=500, strategy=prompts.OPINION_FIT_TRUNCATE)
+    stratified = prompts.select_opinions(opinions, budget=500, strategy=prompts.OPINION_FIT_STRATIFIED)
+
+    def notes(lines):
+        return Counter(line.split("Note : ")[1][0] for line in lines)
+
+    assert sum(prompts.count_tokens(line) + 1 for line in stratified) <= 500
+    assert set(notes(truncated)) == {"5"}
+    assert notes(stratified)["5"] == pytest.approx(3 * notes(stratified)["1"], abs=1)
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_summarizes_chunks_then_partial_summaries(mocker):
+    mocker.patch.object(settings, "OPINION_FIT_STRATEGY", prompts.OPINION_FIT_MAP_REDUCE)
+    mocker.patch.object(settings, "LLM_PROMPT_MAX_TOKENS", 400)
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content="Résumé partiel"))
+
+    from app.services.movie_analyzer_v2 import get_ai_opinion_summary
+    await get_ai_opinion_summary(llm, "Inception", make_opinions([4] * 30))
+
+    sent = [call.args[0] for call in llm.ainvoke.await_args_list]
+    assert len(sent) > 2
+    assert all(prompts.count_tokens(prompt) <= 400 for prompt in sent)
+    assert "Résumés partiels" in sent[-1]
+    assert sum(prompt.count("ID Opinion") for prompt in sent[:-1]) == 30
+
+
+def test_prompt_size_is_reported():
+    before = REGISTRY.get_sample_value("llm_prompt_tokens_count", {"task": "test"}) or 0
+
+    tokens = prompts.report_prompt("test", prompts.summary_prompt("Un voleur..."))
+
+    assert tokens > 0
+    assert REGISTRY.get_sample_value("llm_prompt_tokens_count", {"task": "test"}) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_reuses_unchanged_chunks(mocker):
+    mocker.patch.object(settings, "OPINION_FIT_STRATEGY", prompts.OPINION_FIT_MAP_REDUCE)
+    mocker.patch.object(settings, "LLM_PROMPT_MAX_TOKENS", 600)
+    mocker.patch.object(settings, "OPINION_SUMMARY_CHUNK_SIZE", 10)
+    mocker.patch.object(settings, "OPINION_SUMMARY_REDUCE_FANOUT", 2)
+    mocker.patch.object(settings, "OPINION_SUMMARY_MAX_DRIFT", 0)
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=lambda prompt: MagicMock(content=f"Résumé {model.ainvoke.await_count}"))
+    # Les résumés partiels inchangés sont servis par le cache des réponses du LLM
+    llm = CachedChatModel(model, LLMResponseCache(), "model-a", 0.3)
+
+    from app.services.movie_analyzer_v2 import get_ai_opinion_summary
+    await get_ai_opinion_summary(llm, "Inception", make_opinions([4] * 35))
+    # 4 paquets (10, 10, 10, 5), 2 réductions intermédiaires puis la réduction finale
+    assert model.ainvoke.await_count == 7
+
+    model.ainvoke.reset_mock()
+    await get_ai_opinion_summary(llm, "Inception", make_opinions([4] * 36))
+    # Seuls le dernier paquet, sa réduction intermédiaire et la réduction finale sont recalculés
+    sent = [call.args[0] for call in model.ainvoke.await_args_list]
+    assert len(sent) == 3
+    assert "ID Opinion = 35;" in sent[0] and "ID Opinion = 29;" not in sent[0]
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_does_not_overflow_the_gateway_queue(mocker):
+    """Plus de paquets que la file de la passerelle n'en accepte : aucun rejet, au plus N prompts en vol."""
+    mocker.patch.object(settings, "OPINION_FIT_STRATEGY", prompts.OPINION_FIT_MAP_REDUCE)
+    mocker.patch.object(settings, "LLM_PROMPT_MAX_TOKENS", 600)
+    mocker.patch.object(settings, "OPINION_SUMMARY_CHUNK_SIZE", 2)
+    mocker.patch.object(settings, "OPINION_SUMMARY_MAX_PARALLEL_CHUNKS", 3)
+    in_flight = peak = 0
+
+    async def ainvoke(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return MagicMock(content="Résumé partiel")
+
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=ainvoke)
+    gateway = LLMGateway(model, max_concurrency=2, max_queue_size=2)
+
+    from app.services.movie_analyzer_v2 import get_ai_opinion_summary
+    summary = await get_ai_opinion_summary(gateway, "Inception", make_opinions([4] * 40))
+
+    # 20 paquets pour 2 appels en cours et 2 places dans la file
+    assert summary == "Résumé partiel"
+    assert gateway.rejected == 0
+    assert peak <= 2 and model.ainvoke.await_count > 20
+
+
+def test_tokenizer_is_only_loaded_by_load_tokenizer(mocker):
+    """Aucun chargement paresseux dans la boucle : le tokenizer n'est utilisé qu'une fois chargé au démarrage."""
+    import tiktoken
+    encoding = MagicMock()
+    encoding.encode.return_value = [1, 2]
+    get_encoding = mocker.patch.object(tiktoken, "get_encoding", return_value=encoding)
+    mocker.patch.object(settings, "LLM_TOKENIZER_ENCODING", "o200k_base")
+
+    assert prompts.count_tokens("a" * 10) == 3
+    get_encoding.assert_not_called()
+
+    prompts.load_tokenizer()
+    assert prompts.count_tokens("a" * 10) == 2
+    get_encoding.assert_called_once_with("o200k_base")
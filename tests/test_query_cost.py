@@ -0,0 +1,96 @@
+"""
+Tests de la limitation du coût des requêtes GraphQL (app/graphql/query_cost.py)
+
+Objectif :
+1. Vérifier le calcul du coût : poids des champs IA, alias, fragments, directives et taille des lots.
+2. Vérifier qu'un document trop coûteux est refusé sans appeler le LLM.
+3. Vérifier le quota de coût par client, identifié par son adresse (X-Client-ID seulement derrière un proxy de confiance).
+"""
+
+import pytest
+from graphql import parse
+from unittest.mock import MagicMock
+from app.core.config import settings
+from app.graphql.query_cost import CostQuota, QueryCost
+
+
+def cost_of(query, variables=None):
+    return QueryCost(parse(query), None, variables)
+
+
+def test_cost_counts_aliases_fragments_and_directives():
+    query = """
+        query ($withTags: Boolean!) {
+            a: analyzeMovie(movieId: "1") { ...Resume }
+            b: analyzeMovie(movieId: "2") { ... on MovieAnalysis { aiBestGenre } aiTags @include(if: $withTags) }
+        }
+        fragment Resume on MovieAnalysis { id aiSummary }
+    """
+
+    # a : 1 + (1 + 10) ; b : 1 + 5 (aiTags exclu par la directive)
+    assert cost_of(query, {"withTags": False}).cost == 18
+    assert cost_of(query, {"withTags": True}).cost == 23
+    assert cost_of(query, {"withTags": True}).depth == 2
+
+
+def test_batch_cost_is_multiplied_by_the_number_of_ids():
+    query = "query ($ids: [ID!]!) { analyzeMovies(ids: $ids) { analysis { aiSummary } } }"
+
+    assert cost_of(query, {"ids": ["1", "2", "3"]}).cost == 3 * (1 + 1 + 10)
+
+
+@pytest.mark.asyncio
+async def test_expensive_document_is_rejected_before_execution(mocker):
+    from app.main import schema
+
+    mocker.patch.object(settings, "QUERY_MAX_COST", 100)
+    llm = MagicMock()
+    aliases = "\n".join(f'm{i}: analyzeMovie(movieId: "{i}") {{ aiSummary aiTags }}' for i in range(10))
+
+    result = await schema.execute(f"query {{ {aliases} }}", context_value={"llm": llm})
+
+    assert result.data is None
+    assert result.errors[0].extensions["code"] == "QueryTooExpensiveBLLException"
+    llm.ainvoke.assert_not_called()
+
+
+def test_quota_is_enforced_per_client():
+    quota = CostQuota(per_minute=60)
+
+    assert quota.consume("dashboard", 50) is None
+    assert quota.consume("dashboard", 50) == pytest.approx(40, abs=1)
+    assert quota.consume("frontend", 50) is None
+
+
+def test_client_is_read_from_forwarded_for_behind_trusted_proxies(mocker):
+    from app.graphql.extensions import _client_id
+
+    def request(host, forwarded_for=None, client_id=None):
+        headers = {}
+        if forwarded_for:
+            headers["X-Forwarded-For"] = forwarded_for
+        if client_id:
+            headers["X-Client-ID"] = client_id
+        return {"request": MagicMock(client=MagicMock(host=host), headers=headers)}
+
+    mocker.patch.object(settings, "QUERY_QUOTA_TRUSTED_PROXIES", "10.0.0.0/8")
+
+    # Derrière l'Ingress : chaque client a son propre quota
+    assert _client_id(request("10.42.0.7", "203.0.113.7")) == "203.0.113.7"
+    assert _client_id(request("10.42.0.7", "198.51.100.2")) == "198.51.100.2"
+    # Une adresse ajoutée à gauche par le client ne change pas son quota
+    assert _client_id(request("10.42.0.7", "1.2.3.4, 203.0.113.7")) == "203.0.113.7"
+    # En accès direct, les en-têtes choisis par le client sont ignorés
+    assert _client_id(request("203.0.113.7", "1.2.3.4", client_id="nouveau-client")) == "203.0.113.7"
+    assert _client_id({}) == "anonymous"
+
+
+def test_full_batch_fits_in_default_max_cost():
+    """Un lot de taille maximale demandant tous les champs n'est pas refusé par les valeurs par défaut."""
+    from app.core.config import Settings
+    defaults = {name: field.default for name, field in Settings.model_fields.items()}
+    ids = [str(i) for i in range(defaults["ANALYZE_MOVIES_MAX_IDS"])]
+    query = """query ($ids: [ID!]!) { analyzeMovies(ids: $ids) {
+        movieId error { code message } analysis { id aiSummary aiOpinionSummary aiBestGenre aiTags } } }"""
+
+    assert cost_of(query, {"ids": ids}).cost <= defaults["QUERY_MAX_COST"]
@@ -0,0 +1,108 @@
+"""
+Tests de l'analyse de la sélection GraphQL (app/graphql/resolvers/helper.py)
+
+Objectif :
+1. Vérifier que les champs IA demandés via des fragments (nommés ou en ligne) et des alias sont détectés.
+2. Vérifier que @skip / @include sont évalués avec les variables : aucun appel LLM pour un champ exclu.
+3. Vérifier que les API internes de graphql-core et Strawberry utilisées sont toujours disponibles.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+@pytest.fixture
+def mock_service(mocker):
+    service = AsyncMock(return_value={"id": "1", "errors": {}})
+    mocker.patch('app.graphql.resolvers.analyze_movie_v2.analyze_movie', service)
+    return service
+
+
+def requested_flags(service):
+    kwargs = service.call_args.kwargs
+    return {name: kwargs[name] for name in ("ai_summary", "ai_opinion_summary", "ai_best_genre", "ai_tags")}
+
+
+@pytest.mark.asyncio
+async def test_fragments_and_aliases_are_expanded(mock_service):
+    from app.main import schema
+
+    result = await schema.execute(
+        """
+        query {
+          analyzeMovie(movieId: "1") {
+            ...Resume
+            ... on MovieAnalysis { genre: aiBestGenre }
+          }
+        }
+        fragment Resume on MovieAnalysis { id aiSummary }
+        """,
+        context_value={"llm": MagicMock()},
+    )
+
+    assert result.errors is None
+    assert requested_flags(mock_service) == {
+        "ai_summary": True, "ai_opinion_summary": False, "ai_best_genre": True, "ai_tags": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_skip_and_include_use_variables(mock_service):
+    from app.main import schema
+
+    result = await schema.execute(
+        """
+        query ($withTags: Boolean!, $light: Boolean!) {
+          analyzeMovie(movieId: "1") {
+            id
+            aiTags @include(if: $withTags)
+            aiOpinionSummary @skip(if: $light)
+            ... @skip(if: $light) { aiSummary }
+          }
+        }
+        """,
+        variable_values={"withTags": False, "light": True},
+        context_value={"llm": MagicMock()},
+    )
+
+    assert result.errors is None
+    assert not any(requested_flags(mock_service).values())
+
+
+@pytest.mark.asyncio
+async def test_batch_selection_is_read_under_analysis(mocker):
+    from app.main import schema
+    service = AsyncMock(return_value=[])
+    mocker.patch('app.graphql.resolvers.analyze_movies.analyze_movies', service)
+
+    await schema.execute(
+        """
+        query {
+          analyzeMovies(ids: ["1"]) {
+            a: analysis { aiSummary }
+            b: analysis { ...Tags }
+          }
+        }
+        fragment Tags on MovieAnalysis { aiTags }
+        """,
+        context_value={"llm": MagicMock()},
+    )
+
+    assert requested_flags(service) == {
+        "ai_summary": True, "ai_opinion_summary": False, "ai_best_genre": False, "ai_tags": True,
+    }
+
+
+def test_internal_graphql_apis_are_still_available():
+    """Échoue dès qu'une montée de version casse les API internes sur lesquelles repose requested_fields."""
+    import dataclasses
+    import inspect
+    from graphql import GraphQLResolveInfo
+    from graphql.execution.collect_fields import collect_sub_fields
+    from strawberry.types.info import Info
+
+    assert list(inspect.signature(collect_sub_fields).parameters) == [
+        "schema", "fragments", "variable_values", "return_type", "field_nodes"
+    ]
+    assert "_raw_info" in {field.name for field in dataclasses.fields(Info)}
+    assert {"field_nodes", "return_type", "schema", "fragments", "variable_values"} <= set(GraphQLResolveInfo._fields)
@@ -0,0 +1,108 @@
+"""
+Tests du regroupement des appels identiques (app/core/single_flight.py)
+
+Objectif :
+1. Vérifier que des analyses identiques simultanées ne déclenchent qu'un seul jeu d'appels au LLM.
+2. Vérifier la gestion des annulations : le calcul continue tant qu'un appelant l'attend.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core.llm_cache import CachedChatModel, LLMResponseCache
+from app.core.single_flight import CoalescedChatModel, SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyses_share_one_computation(mocker):
+    from app.services.movie_analyzer_v2 import analyze_movie
+
+    movie_repo = AsyncMock()
+    movie_repo.find_by_id.return_value = MagicMock(synopsis="Un voleur...")
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', movie_repo)
+
+    async def summary(llm, synopsis):
+        await asyncio.sleep(0.01)
+        return "Résumé IA"
+
+    mock_summary = AsyncMock(side_effect=summary)
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', mock_summary)
+    llm = MagicMock()
+
+    results = await asyncio.gather(*[
+        analyze_movie(movie_id="1", ai_summary=True, ai_opinion_summary=False, ai_best_genre=False,
+                      ai_tags=False, llm=llm)
+        for _ in range(20)
+    ])
+
+    assert all(result["aiSummary"] == "Résumé IA" for result in results)
+    assert results[0] is not results[1]
+    movie_repo.find_by_id.assert_called_once()
+    mock_summary.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_in_flight_reach_the_model_once():
+    async def ainvoke(prompt):
+        await asyncio.sleep(0.01)
+        return MagicMock(content="Réponse")
+
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=ainvoke)
+    llm = CachedChatModel(model, LLMResponseCache(max_entries=10, ttl=60), model_name="m", temperature=0)
+
+    responses = await asyncio.gather(llm.ainvoke("prompt"), llm.ainvoke("prompt"), llm.ainvoke("autre"))
+
+    assert [response.content for response in responses] == ["Réponse"] * 3
+    assert model.ainvoke.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_are_coalesced_without_cache():
+    async def ainvoke(prompt):
+        await asyncio.sleep(0.01)
+        return MagicMock(content=f"Réponse {prompt}")
+
+    model = MagicMock()
+    model.ainvoke = AsyncMock(side_effect=ainvoke)
+    llm = CoalescedChatModel(model)
+
+    responses = await asyncio.gather(*[llm.ainvoke("prompt") for _ in range(5)], llm.ainvoke("autre"))
+
+    assert [response.content for response in responses] == ["Réponse prompt"] * 5 + ["Réponse autre"]
+    assert model.ainvoke.await_count == 2
+    assert llm.in_flight.stats()["shared"] == 4
+
+
+@pytest.mark.asyncio
+async def test_work_is_cancelled_only_when_every_caller_is():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await release.wait()
+            return "ok"
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    first = asyncio.create_task(flights.do("key", work))
+    second = asyncio.create_task(flights.do("key", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not cancelled.is_set()
+    release.set()
+    assert await second == "ok"
+
+    third = asyncio.create_task(flights.do("other", work))
+    release.clear()
+    await asyncio.sleep(0)
+    third.cancel()
+    await asyncio.sleep(0.01)
+    assert cancelled.is_set()
+    assert flights.stats()["in_flight"] == 0
@@ -0,0 +1,118 @@
+"""
+Tests de l'abonnement `analyzeMovie` (analyse incrémentale)
+
+Objectif :
+1. Vérifier que chaque champ IA est envoyé dès qu'il est prêt, sans attendre le plus lent.
+2. Vérifier que les résumés peuvent être transmis au fil de leur génération (stream_tokens).
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.models.movie import Movie
+from app.models.genre import Genre
+from app.models.person import Person
+
+
+@pytest.fixture
+def mock_movie():
+    return Movie(
+        id=1,
+        title="Inception",
+        year=2010,
+        synopsis="Un voleur qui vole des secrets...",
+        genre=Genre(id=1, label="Science-Fiction"),
+        director=Person(id=1, last_name="Nolan", first_name="Christopher"),
+        actors=[],
+        opinions=[]
+    )
+
+
+@pytest.fixture
+def mock_movie_repo(mocker, mock_movie):
+    repo = AsyncMock()
+    repo.find_by_id.return_value = mock_movie
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', repo)
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_fastest_field_first(mocker, mock_movie_repo):
+    tags_released = asyncio.Event()
+
+    async def slow_tags(llm, title, synopsis):
+        await tags_released.wait()
+        return ["rêve", "casse"]
+
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', AsyncMock(return_value="Résumé IA"))
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_tags', slow_tags)
+
+    from app.services.movie_analyzer_v2 import analyze_movie_stream
+    stream = analyze_movie_stream(
+        movie_id="1",
+        ai_summary=True,
+        ai_opinion_summary=False,
+        ai_best_genre=False,
+        ai_tags=True,
+        llm=MagicMock()
+    )
+
+    first = await anext(stream)
+    second = await anext(stream)
+    tags_released.set()
+    third = await anext(stream)
+
+    assert first["aiSummary"] is None and first["aiTags"] is None
+    assert second["aiSummary"] == "Résumé IA" and second["aiTags"] is None
+    assert third["aiTags"] == ["rêve", "casse"]
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+
+
+@pytest.mark.asyncio
+async def test_subscription_streams_summary_tokens(mock_movie_repo):
+    from app.main import schema
+
+    async def astream(prompt):
+        for token in ["Un ", "voleur ", "de rêves."]:
+            yield MagicMock(content=token)
+
+    llm = MagicMock()
+    llm.astream = astream
+
+    subscription = await schema.subscribe(
+        'subscription { analyzeMovie(movieId: "1", streamTokens: true) { id aiSummary } }',
+        context_value={"llm": llm},
+    )
+    summaries = [result.data["analyzeMovie"]["aiSummary"] async for result in subscription]
+
+    assert summaries == [None, "Un", "Un voleur", "Un voleur de rêves."]
+
+
+@pytest.mark.asyncio
+async def test_failed_field_is_null_and_stream_continues(mocker, mock_movie_repo):
+    from app.main import schema
+    tags_released = asyncio.Event()
+
+    async def failing_summary(llm, synopsis):
+        raise RuntimeError("LLM indisponible")
+
+    async def slow_tags(llm, title, synopsis):
+        await tags_released.wait()
+        return ["rêve"]
+
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_summary', failing_summary)
+    mocker.patch('app.services.movie_analyzer_v2.get_ai_tags', slow_tags)
+
+    subscription = await schema.subscribe(
+        'subscription { analyzeMovie(movieId: "1") { id aiSummary aiTags } }',
+        context_value={"llm": MagicMock()},
+    )
+    results = []
+    async for result in subscription:
+        results.append(result)
+        tags_released.set()
+
+    assert results[1].data["analyzeMovie"]["aiSummary"] is None
+    assert results[1].errors[0].path == ["analyzeMovie", "aiSummary"]
+    assert results[-1].data["analyzeMovie"]["aiTags"] == ["rêve"]
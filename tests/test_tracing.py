@@ -0,0 +1,107 @@
+"""
+Tests des traces OpenTelemetry (app/core/tracing.py)
+
+Objectif :
+1. Vérifier que les appels à l'API Movie produisent un span et propagent le contexte (traceparent).
+2. Vérifier que le service V2 et les appels au LLM produisent leurs spans.
+3. Vérifier que l'exporteur fichier écrit des spans au format OTLP/JSON.
+"""
+
+import json
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app.core.tracing import OTLPJsonFileSpanExporter, tracer
+
+_exporter = InMemorySpanExporter()
+
+
+@pytest.fixture
+def spans():
+    # Le fournisseur global ne peut être installé qu'une fois par processus
+    if not isinstance(trace.get_tracer_provider(), TracerProvider):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(_exporter))
+        trace.set_tracer_provider(provider)
+    _exporter.clear()
+    return _exporter
+
+
+@pytest.mark.asyncio
+async def test_movie_api_call_is_traced_and_propagated(mocker, spans):
+    from app.repositories._base_client import BaseClient
+
+    received = []
+
+    def handler(request):
+        received.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={})
+
+    base_client = BaseClient(base_url="http://movie-api/api/v1")
+    mocker.patch.object(
+        base_client, "_create_client",
+        return_value=httpx.AsyncClient(base_url=base_client.base_url, transport=httpx.MockTransport(handler)),
+    )
+
+    with tracer.start_as_current_span("parent") as parent:
+        await base_client._request("GET", "/movies/42")
+
+    client_span = next(span for span in spans.get_finished_spans() if span.name == "Movie API GET /movies/{id}")
+    assert client_span.parent.span_id == parent.get_span_context().span_id
+    assert client_span.attributes["http.response.status_code"] == "200"
+    trace_id = format(parent.get_span_context().trace_id, "032x")
+    assert received[0].split("-")[1] == trace_id
+
+
+@pytest.mark.asyncio
+async def test_analysis_and_llm_calls_are_traced(mocker, spans):
+    from app.core.llm_cache import CachedChatModel, LLMResponseCache
+    from app.models.movie import Movie
+    from app.models.genre import Genre
+    from app.models.person import Person
+    from app.services.movie_analyzer_v2 import analyze_movie
+
+    movie_repo = AsyncMock()
+    movie_repo.find_by_id.return_value = Movie(
+        id=1, title="Inception", year=2010, synopsis="Un voleur...",
+        genre=Genre(id=1, label="Science-Fiction"),
+        director=Person(id=1, last_name="Nolan", first_name="Christopher"),
+        actors=[], opinions=[]
+    )
+    mocker.patch('app.services.movie_analyzer_v2.movie_repository', movie_repo)
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=MagicMock(content="Résumé IA"))
+    llm = CachedChatModel(model, LLMResponseCache(), model_name="test", temperature=0)
+
+    await analyze_movie(
+        movie_id="1", ai_summary=True, ai_opinion_summary=False, ai_best_genre=False, ai_tags=False, llm=llm
+    )
+
+    finished = {span.name: span for span in spans.get_finished_spans()}
+    assert finished["analyze_movie"].attributes["movie.id"] == "1"
+    assert finished["llm.ainvoke"].attributes["llm.cache_hit"] is False
+    assert finished["llm.ainvoke"].context.trace_id == finished["analyze_movie"].context.trace_id
+
+
+def test_otlp_file_exporter_writes_json_lines(tmp_path, spans):
+    with tracer.start_as_current_span("parent"):
+        with tracer.start_as_current_span("exporté") as span:
+            pass
+    path = tmp_path / "traces.jsonl"
+
+    OTLPJsonFileSpanExporter(str(path)).export(spans.get_finished_spans())
+
+    payload = json.loads(path.read_text(encoding="utf-8").splitlines()[0])
+    exported = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert exported[0]["name"] == "exporté"
+    # Format OTLP/JSON : identifiants en hexadécimal, énumérations en entiers
+    assert exported[0]["traceId"] == format(span.get_span_context().trace_id, "032x")
+    assert exported[0]["spanId"] == format(span.get_span_context().span_id, "016x")
+    assert exported[0]["parentSpanId"] == format(span.parent.span_id, "016x")
+    assert exported[0]["kind"] == 1